@@ -0,0 +1,79 @@
+"""Frame lag of inline ``cap.read()`` versus :class:`LatestFrameGrabber`.
+
+A local video file replayed at its nominal frame rate stands in for the
+drone stream; the consumer spends ``WORK`` seconds on every frame, like a
+detection request. With inline reads the consumer falls further behind the
+stream on every iteration; the grabber always hands out a recent frame.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_capture
+"""
+
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from modules.capture import LatestFrameGrabber
+
+FPS = 30
+FRAMES = 300
+WORK = 0.1
+ITERATIONS = 20
+
+
+def write_video(path: str) -> None:
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), FPS, (320, 240))
+    for i in range(FRAMES):
+        frame = np.zeros((240, 320, 3), np.uint8)
+        # Frame number in the first two pixels.
+        frame[:8, :16] = [i % 256, i // 256, 0]
+        writer.write(frame)
+    writer.release()
+
+
+def frame_number(frame: np.ndarray) -> int:
+    block = frame[2:6, 2:6].reshape(-1, 3).mean(axis=0)
+    return round(block[0]) + 256 * round(block[1])
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stream.avi")
+        write_video(path)
+
+        capture = cv2.VideoCapture(path)
+        start = time.monotonic()
+        lags = []
+        for _ in range(ITERATIONS):
+            _, frame = capture.read()
+            live = (time.monotonic() - start) * FPS
+            lags.append(live - frame_number(frame))
+            time.sleep(WORK)
+        capture.release()
+        print(
+            f"inline cap.read():   lag after {ITERATIONS} frames "
+            f"{lags[-1] / FPS * 1e3:6.0f} ms"
+        )
+
+        with LatestFrameGrabber(path, pace=True) as grabber:
+            grabber.read(timeout=5.0)
+            start = time.monotonic()
+            lags = []
+            for _ in range(ITERATIONS):
+                frame, _ = grabber.read(timeout=5.0)
+                live = (time.monotonic() - start) * FPS
+                lags.append(live - frame_number(frame))
+                time.sleep(WORK)
+            stats = grabber.stats()
+        print(
+            f"LatestFrameGrabber:  lag after {ITERATIONS} frames "
+            f"{lags[-1] / FPS * 1e3:6.0f} ms, drop rate {stats.drop_rate:.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
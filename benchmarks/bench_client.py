@@ -0,0 +1,103 @@
+"""Serial ``requests.post`` calls versus the pooled concurrent client.
+
+A stand-in server parses uploads like the real one and answers after a
+fixed model latency. The same batch of detection calls is sent the old way
+(one ``requests.post`` and one connection per call, in sequence), with
+:class:`jemdzem.client.JemdzemClient` in sequence and with the client
+submitting all calls at once under its concurrency cap.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_client
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import cv2
+import numpy as np
+import requests
+import uvicorn
+from fastapi import FastAPI, Request
+
+from jemdzem.client import JemdzemClient
+from jemdzem.request_formats import parse_image_request
+
+CALLS = 24
+MODEL_LATENCY = 0.2
+
+app = FastAPI()
+
+
+@app.post("/single-detect")
+async def single_detect(request: Request):
+    await parse_image_request(request)
+    await asyncio.sleep(MODEL_LATENCY)
+    return []
+
+
+def serve() -> tuple[uvicorn.Server, str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def with_requests(url: str, image: bytes) -> None:
+    for _ in range(CALLS):
+        requests.post(
+            f"{url}/single-detect?model_name=model",
+            headers={"X-API-Key": "key"},
+            files=[("file", ("image.png", image, "image/png"))],
+            data={"labels": json.dumps(["pipe"]), "descriptions": json.dumps(["d"])},
+        ).raise_for_status()
+
+
+async def with_client(url: str, image: bytes, concurrent: bool) -> dict:
+    async with JemdzemClient(base_url=url, max_concurrency=4) as client:
+        calls = [client.single_detect(image, ["pipe"], ["d"]) for _ in range(CALLS)]
+        if concurrent:
+            await asyncio.gather(*calls)
+        else:
+            for call in calls:
+                await call
+        return client.timing_summary()["/single-detect"]
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    frame = (rng.random((1080, 1920, 3)) * 255).astype(np.uint8)
+    image = cv2.imencode(".jpg", frame)[1].tobytes()
+    server, url = serve()
+    try:
+        start = time.perf_counter()
+        with_requests(url, image)
+        print(f"{'requests.post, serial:':35s}{time.perf_counter() - start:5.2f} s")
+
+        for concurrent in (False, True):
+            start = time.perf_counter()
+            summary = asyncio.run(with_client(url, image, concurrent))
+            name = "concurrent (cap 4)" if concurrent else "serial"
+            print(
+                f"{f'JemdzemClient, {name}:':35s}{time.perf_counter() - start:5.2f} s"
+                f" (mean call {summary['mean_elapsed'] * 1e3:.0f} ms,"
+                f" mean queued {summary['mean_queued'] * 1e3:.0f} ms)"
+            )
+    finally:
+        server.should_exit = True
+    print(
+        f"{CALLS} calls, {len(image) / 1e6:.1f} MB each, {MODEL_LATENCY} s model latency"
+    )
+
+
+if __name__ == "__main__":
+    main()
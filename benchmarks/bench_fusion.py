@@ -0,0 +1,57 @@
+"""Per-frame cost of :class:`modules.fusion.ObjectMap` as the map grows.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_fusion
+"""
+
+import time
+
+import numpy as np
+
+from modules.fusion import ObjectMap
+from modules.get_coordinates import calculate_new_coordinates_batch
+
+ORIGIN = (50.272639, 18.670972)
+FRAME = 50
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    for size in (1_000, 10_000, 100_000):
+        side = 20 * np.sqrt(size)
+        objects = rng.uniform(0, side, (size, 2))
+        fusion = ObjectMap(radius=3.0)
+        coordinates = calculate_new_coordinates_batch(*ORIGIN, objects, mode="fast")
+        fusion.update(coordinates[:, 0], coordinates[:, 1], ["barrell"] * size)
+
+        frames = []
+        for _ in range(200):
+            # One frame sees a 60 m patch: some known objects, some new ones.
+            corner = rng.uniform(0, side - 60, 2)
+            inside = np.all((objects >= corner) & (objects < corner + 60), axis=1)
+            seen = objects[inside]
+            detections = np.concatenate(
+                (
+                    seen + rng.normal(0, 0.5, seen.shape),
+                    corner + rng.uniform(0, 60, (5, 2)),
+                )
+            )[:FRAME]
+            frames.append(
+                calculate_new_coordinates_batch(*ORIGIN, detections, mode="fast")
+            )
+
+        start = time.perf_counter()
+        for timestamp, coordinates in enumerate(frames):
+            fusion.update(
+                coordinates[:, 0],
+                coordinates[:, 1],
+                ["barrell"] * len(coordinates),
+                timestamp=timestamp,
+            )
+        elapsed = (time.perf_counter() - start) / len(frames)
+        print(f"{size:>7} objects: {elapsed * 1e3:6.2f} ms per frame")
+
+
+if __name__ == "__main__":
+    main()
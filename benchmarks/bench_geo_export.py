@@ -0,0 +1,50 @@
+"""Time and peak memory of the streaming exporters for large detection sets.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_geo_export
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from modules.geo_export import export_points
+
+N = 200_000
+
+
+def records(n: int):
+    for i in range(n):
+        yield {"label": "barrell" if i % 2 else "person", "frame": i // 20}
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    lat = 50.27 + rng.uniform(-0.01, 0.01, N)
+    lng = 18.67 + rng.uniform(-0.01, 0.01, N)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in (".geojson", ".kml", ".csv"):
+            path = os.path.join(directory, "points" + extension)
+            start = time.perf_counter()
+            export_points(path, lat, lng, records(N))
+            elapsed = time.perf_counter() - start
+
+            # Traced separately: tracemalloc slows the export down.
+            tracemalloc.start()
+            export_points(path, lat, lng, records(N))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{extension:>8}: {N:,} points in {elapsed:5.2f} s, "
+                f"file {os.path.getsize(path) / 2**20:6.1f} MiB, "
+                f"peak Python memory {peak / 2**20:5.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Compare per-point and batch versions of the ``get_coordinates`` helpers.
+
+Also compares ``translate_batch`` with lookups in the ``CameraRegistry`` tables.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_get_coordinates
+"""
+
+import time
+
+import numpy as np
+
+from modules.camera import CameraRegistry
+from modules.georeferencer import FrameTelemetry, GeoReferencer
+from modules.get_coordinates import (
+    calculate_new_coordinates,
+    calculate_new_coordinates_batch,
+    d_m_s_to_degrees,
+    d_m_s_to_degrees_batch,
+    degrees_to_d_m_s,
+    degrees_to_d_m_s_batch,
+    translate,
+    translate_batch,
+)
+from modules.projection import GroundProjector, TerrainGrid
+
+
+def load_camera() -> tuple[np.ndarray, np.ndarray]:
+    calibration = np.load("camera_dependencies/Yuneec.npz")
+    return calibration["camMatrix"], calibration["distCoef"]
+
+
+def bench_translate() -> None:
+    camera_matrix, dist_coeffs = load_camera()
+    rng = np.random.default_rng(0)
+    altitude, angle = 50.0, 0.3
+
+    for n in (10, 1_000, 100_000):
+        pixels = rng.random((n, 2)) * [275.0, 173.0]
+
+        start = time.perf_counter()
+        for x, y in pixels:
+            translate(x, y, altitude, camera_matrix, dist_coeffs, angle)
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        translate_batch(pixels, altitude, camera_matrix, dist_coeffs, angle)
+        batch = time.perf_counter() - start
+
+        print(
+            f"N={n:>7}: translate {scalar * 1e3:9.2f} ms, "
+            f"translate_batch {batch * 1e3:7.3f} ms, speedup {scalar / batch:7.1f}x"
+        )
+
+
+def bench_geodesic() -> None:
+    rng = np.random.default_rng(0)
+    lat, lng = 50.2727, 18.6709
+
+    for n in (10, 1_000, 100_000):
+        deltas = rng.uniform(-50.0, 50.0, (n, 2))
+        timings = {}
+
+        start = time.perf_counter()
+        for dx, dy in deltas:
+            calculate_new_coordinates(lat, lng, dx, dy)
+        timings["per point"] = time.perf_counter() - start
+
+        for mode in ("exact", "fast"):
+            start = time.perf_counter()
+            calculate_new_coordinates_batch(lat, lng, deltas, mode=mode)
+            timings[mode] = time.perf_counter() - start
+
+        print(
+            f"N={n:>7}: "
+            + ", ".join(
+                f"{name} {n / seconds:12,.0f} points/s"
+                for name, seconds in timings.items()
+            )
+        )
+
+
+def bench_dms() -> None:
+    rng = np.random.default_rng(0)
+
+    for n in (10, 1_000, 100_000):
+        degrees = rng.uniform(-180.0, 180.0, n)
+
+        start = time.perf_counter()
+        for deg in degrees.tolist():
+            d_m_s_to_degrees(*degrees_to_d_m_s(deg))
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        d_m_s_to_degrees_batch(*degrees_to_d_m_s_batch(degrees))
+        batch = time.perf_counter() - start
+
+        print(
+            f"N={n:>7}: DMS round trip {scalar * 1e3:9.2f} ms, "
+            f"batch {batch * 1e3:7.3f} ms, speedup {scalar / batch:7.1f}x"
+        )
+
+
+def bench_camera_registry() -> None:
+    width, height = 5472, 3648
+
+    for step in (1, 4, 16):
+        registry = CameraRegistry(max_cache_bytes=1 << 30, lut_step=step)
+        registry.load("yuneec", "camera_dependencies/Yuneec.npz")
+        camera = registry.get("yuneec", (width, height))
+
+        start = time.perf_counter()
+        camera.ground_grid(50.0, 0.3)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        camera.ground_grid(50.0, 0.3)
+        warm = time.perf_counter() - start
+
+        print(
+            f"20 MP frame, lut_step={step:>2}: first {cold * 1e3:8.1f} ms, "
+            f"cached {warm * 1e3:7.1f} ms, table {registry.cache.nbytes / 1e6:6.1f} MB"
+        )
+
+
+def bench_projection() -> None:
+    camera_matrix, dist_coeffs = load_camera()
+    rng = np.random.default_rng(0)
+    terrain = TerrainGrid(
+        rng.uniform(200.0, 260.0, (1000, 1000)), (50.28, 18.66), (2e-5, 3e-5)
+    )
+    projectors = {
+        "plane": GroundProjector(camera_matrix, dist_coeffs),
+        "terrain": GroundProjector(camera_matrix, dist_coeffs, terrain),
+    }
+
+    for n in (1_000, 100_000):
+        pixels = rng.random((n, 2)) * [275.0, 173.0]
+        timings = []
+        for name, projector in projectors.items():
+            start = time.perf_counter()
+            projector.project(pixels, 300.0, 0.3, -1.2, 0.05, 50.2727, 18.6709)
+            timings.append(f"{name} {(time.perf_counter() - start) * 1e3:8.2f} ms")
+        print(f"N={n:>7}: " + ", ".join(timings))
+
+
+def bench_georeferencer() -> None:
+    camera_matrix, dist_coeffs = load_camera()
+    rng = np.random.default_rng(0)
+    telemetry = FrameTelemetry(50.2727, 18.6709, 30.0, heading=20.0)
+    georeferencer = GeoReferencer(camera_matrix, dist_coeffs)
+
+    for n in (100, 5_000):
+        centres = rng.random((n, 2)) * [275.0, 173.0]
+
+        start = time.perf_counter()
+        for x, y in centres:
+            dx, dy = translate(x, y, 30.0, camera_matrix, dist_coeffs, 0.349)
+            calculate_new_coordinates(telemetry.lat, telemetry.lng, dx, dy)
+        per_detection = time.perf_counter() - start
+
+        start = time.perf_counter()
+        georeferencer.frame(telemetry).to_wgs84(centres)
+        per_frame = time.perf_counter() - start
+
+        print(
+            f"N={n:>7}: per detection {per_detection * 1e3:8.2f} ms, "
+            f"GeoReferencer frame {per_frame * 1e3:6.3f} ms"
+        )
+
+
+def main() -> None:
+    bench_translate()
+    bench_camera_registry()
+    bench_projection()
+    bench_georeferencer()
+    bench_geodesic()
+    bench_dms()
+
+
+if __name__ == "__main__":
+    main()
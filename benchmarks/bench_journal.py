@@ -0,0 +1,115 @@
+"""Time the detection loop spends reporting, synchronous versus journalled.
+
+Points are reported over a simulated uplink with a fixed round trip
+(:class:`inspekcja.raporting.publisher.InMemoryReference` behind a sleep).
+The synchronous path sends every point with :class:`PointPublisher` in the
+loop. The journalled path records it with :class:`ReportJournal`, which
+sends it from a background thread. A second run drops the uplink for part
+of the mission to show that the loop does not stall and that the backlog
+drains after the link returns.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_journal
+"""
+
+import os
+import statistics
+import tempfile
+import time
+
+from inspekcja.raporting.journal import ReportJournal
+from inspekcja.raporting.publisher import InMemoryReference, PointPublisher
+
+POINTS = 200
+ROUND_TRIP = 0.05
+
+
+class Uplink:
+    def __init__(self) -> None:
+        self.root = InMemoryReference()
+        self.down_until = 0.0
+
+    def _call(self) -> None:
+        if time.monotonic() < self.down_until:
+            time.sleep(ROUND_TRIP)
+            raise ConnectionError("no uplink")
+        time.sleep(ROUND_TRIP)
+
+    def child(self, path):
+        self._call()
+        return self.root.child(path)
+
+    def update(self, value):
+        self._call()
+        self.root.update(value)
+
+
+def point(i: int) -> dict:
+    return {
+        "type": "barrel",
+        "gps_coords": [50.27, 18.67 + i * 1e-5],
+        "image": "x" * 5000,
+    }
+
+
+def percentiles(samples: list[float]) -> str:
+    cuts = statistics.quantiles(samples, n=100)
+    return f"p50 {cuts[49] * 1e6:8.0f} us, p99 {cuts[98] * 1e6:8.0f} us"
+
+
+def synchronous() -> None:
+    publisher = PointPublisher(Uplink())
+    samples = []
+    for i in range(POINTS):
+        start = time.perf_counter()
+        publisher.append(point(i))
+        samples.append(time.perf_counter() - start)
+    print(f"{'synchronous:':24s}{percentiles(samples)}, loop {sum(samples):6.2f} s")
+
+
+def journalled(folder: str, outage: float) -> None:
+    uplink = Uplink()
+    journal = ReportJournal(
+        os.path.join(folder, f"journal-{outage}.sqlite3"),
+        PointPublisher(uplink),
+        backoff=0.05,
+        max_backoff=0.2,
+    ).start()
+    uplink.down_until = time.monotonic() + outage
+    samples = []
+    peak = 0
+    for i in range(POINTS):
+        start = time.perf_counter()
+        journal.record_point(point(i))
+        samples.append(time.perf_counter() - start)
+        if i % 20 == 0:
+            peak = max(peak, journal.backlog())
+        time.sleep(0.005)  # the rest of the detection loop
+    loop_end = time.perf_counter()
+    while journal.backlog():
+        time.sleep(0.01)
+    drained = time.perf_counter() - loop_end
+    stats = journal.stats()
+    journal.close()
+    assert len(uplink.root.child("points").get()) == POINTS
+    name = f"journal, {outage:.0f} s outage:"
+    print(
+        f"{name:24s}{percentiles(samples)}, loop {sum(samples):6.2f} s,"
+        f" peak backlog {peak}, drained {drained:.2f} s after the loop,"
+        f" {stats['failures']} failed sends"
+    )
+
+
+def main() -> None:
+    print(
+        f"{POINTS} points, {ROUND_TRIP * 1e3:.0f} ms round trip; time per report call:"
+    )
+    synchronous()
+    with tempfile.TemporaryDirectory() as folder:
+        journalled(folder, 0.0)
+        journalled(folder, 1.0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Cost of keyframe scoring and the share of frames it lets through.
+
+A synthetic flight pans over textured ground at 2 m/frame with every third
+frame motion blurred. The selection is compared with sending every frame
+to the model.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_keyframes
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from modules.keyframes import KeyframeSelector
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    noise = (rng.random((2400, 9000)) * 255).astype(np.uint8)
+    world = cv2.cvtColor(cv2.GaussianBlur(noise, (0, 0), 2), cv2.COLOR_GRAY2BGR)
+
+    for width, height in ((1280, 720), (1920, 1080), (3840, 2160)):
+        frame = np.ascontiguousarray(world[:height, :width])
+        selector = KeyframeSelector()
+        selector.consider(frame)
+        start = time.perf_counter()
+        for _ in range(50):
+            selector.consider(frame)
+        elapsed = (time.perf_counter() - start) / 50
+        print(f"{width}x{height}: {elapsed * 1e3:5.2f} ms per frame")
+
+    selector = KeyframeSelector()
+    frames = 0
+    for i, x in enumerate(range(0, 9000 - 1920, 40)):
+        frame = world[600 : 600 + 1080, x : x + 1920]
+        if i % 3 == 0:
+            frame = cv2.blur(frame, (25, 1))
+        selector.consider(frame)
+        frames += 1
+    report = selector.report()
+    print(
+        f"flight of {frames} frames: {report['counts']['selected']} sent to the "
+        f"model ({report['selected_fraction']:.1%}), rejected {report['counts']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""End-to-end time of the detect_all steps, in sequence versus concurrently.
+
+The steps of ``inspekcja/detect_all.py`` (markers, two labelled detections,
+person detection, two questions) are sent to an in-process stand-in server
+that parses the uploads like the real one and answers after a fixed model
+latency per endpoint. The sequential run encodes the frame and the
+reference image for every call, as the script used to; the mission runner
+prepares them once and runs all steps at once.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_mission
+"""
+
+import asyncio
+import time
+
+import cv2
+import httpx
+import numpy as np
+from fastapi import FastAPI, Request
+
+from jemdzem.client import JemdzemClient
+from jemdzem.mission import MissionRunner, MissionTask
+from jemdzem.request_formats import parse_image_request
+
+LATENCY = {"/single-detect": 0.6, "/qa": 0.4}
+LABELS = ["barrell", "palette"]
+QUESTIONS = ["How many people are wearing helmets?", "Are there yellow graffiti?"]
+
+app = FastAPI()
+
+
+@app.post("/single-detect")
+async def single_detect(request: Request):
+    await parse_image_request(request)
+    await asyncio.sleep(LATENCY["/single-detect"])
+    return []
+
+
+@app.post("/qa")
+async def qa(request: Request):
+    await parse_image_request(request)
+    await asyncio.sleep(LATENCY["/qa"])
+    return {"answer": "no"}
+
+
+def markers(image: np.ndarray) -> list:
+    """Stand-in for the local ArUco step."""
+
+    dictionary = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_50)
+    corners, _, _ = cv2.aruco.ArucoDetector(dictionary).detectMarkers(image)
+    return list(corners)
+
+
+def client() -> JemdzemClient:
+    return JemdzemClient(
+        base_url="http://bench",
+        max_concurrency=6,
+        transport=httpx.ASGITransport(app=app),
+    )
+
+
+async def sequential(image: np.ndarray, ref: np.ndarray) -> float:
+    start = time.perf_counter()
+    async with client() as api:
+        await asyncio.to_thread(markers, image)
+        for label in LABELS:
+            await api.single_detect(image, [label], ["d"], refs={label: ref})
+        await api.single_detect(image, ["person"], ["d"])
+        for question in QUESTIONS:
+            await api.qa(image, question)
+    return time.perf_counter() - start
+
+
+async def concurrent(image: np.ndarray, ref: np.ndarray) -> float:
+    def detect(label: str, with_ref: bool):
+        async def run(ctx):
+            refs = {label: ctx.refs[label]} if with_ref else None
+            return await ctx.client.single_detect(ctx.encoded, [label], ["d"], refs)
+
+        return run
+
+    def ask(question: str):
+        async def run(ctx):
+            return await ctx.client.qa(ctx.encoded, question)
+
+        return run
+
+    tasks = [
+        MissionTask("aruco", lambda ctx: markers(ctx.image)),
+        *(MissionTask(label, detect(label, True)) for label in LABELS),
+        MissionTask("person", detect("person", False)),
+        *(MissionTask(question, ask(question)) for question in QUESTIONS),
+    ]
+    async with client() as api:
+        runner = MissionRunner(api, max_concurrency=6)
+        report = await runner.run(image, tasks, {label: ref for label in LABELS})
+    assert not report.failed, report.failed
+    return report.elapsed
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    image = cv2.GaussianBlur(
+        (rng.random((2160, 3840, 3)) * 255).astype(np.uint8), (0, 0), 2
+    )
+    ref = image[:400, :400].copy()
+    model_time = 3 * LATENCY["/single-detect"] + 2 * LATENCY["/qa"]
+    print(f"6 steps, {model_time:.1f} s of model latency in total, 3840x2160 frame")
+    print(f"sequential:     {asyncio.run(sequential(image, ref)):5.2f} s")
+    print(f"mission runner: {asyncio.run(concurrent(image, ref)):5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
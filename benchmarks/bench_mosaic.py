@@ -0,0 +1,66 @@
+"""Time mosaicking a synthetic survey serially and with a process pool.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_mosaic
+"""
+
+import os
+import resource
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from modules.georeferencer import FrameTelemetry
+from modules.mosaic import MosaicGrid, build_mosaic
+
+FRAMES = 24
+WIDTH, HEIGHT = 1920, 1080
+CAMERA_MATRIX = np.array([[1400.0, 0, 960.0], [0, 1400.0, 540.0], [0, 0, 1]])
+DIST_COEFFS = np.array([-0.02, 0.01, 0.0, 0.0, 0.0])
+
+
+def make_frames(folder: str) -> list[tuple[str, FrameTelemetry]]:
+    """Two survey lines of nadir frames over a random texture."""
+    rng = np.random.default_rng(0)
+    grid = MosaicGrid(50.2727, 18.6709)
+    frames = []
+    for i in range(FRAMES):
+        image = cv2.resize(
+            rng.integers(0, 255, (HEIGHT // 16, WIDTH // 16, 3), dtype=np.uint8),
+            (WIDTH, HEIGHT),
+        )
+        path = os.path.join(folder, f"frame_{i:03d}.jpg")
+        cv2.imwrite(path, image)
+        line, step = divmod(i, FRAMES // 2)
+        lat, lng = grid.to_wgs84(step * 12.0, line * -20.0)
+        frames.append((path, FrameTelemetry(lat, lng, 40.0, heading=90.0)))
+    return frames
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        frames = make_frames(tmp)
+        for workers in (0, os.cpu_count()):
+            start = time.perf_counter()
+            index = build_mosaic(
+                frames,
+                os.path.join(tmp, f"mosaic_{workers}"),
+                CAMERA_MATRIX,
+                DIST_COEFFS,
+                (WIDTH, HEIGHT),
+                gsd=0.03,
+                workers=workers,
+            )
+            print(
+                f"workers={workers}: {FRAMES} frames in "
+                f"{time.perf_counter() - start:.2f} s, {len(index['tiles'])} tiles"
+            )
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS of the parent process: {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
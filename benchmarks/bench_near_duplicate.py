@@ -0,0 +1,69 @@
+"""Hit rate and cost of near-duplicate result reuse for a hovering drone.
+
+Consecutive frames of a hover differ by sensor noise, JPEG artefacts and a
+pixel or two of drift. An exact hash of the upload never repeats; the
+perceptual hashes do.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_near_duplicate
+"""
+
+import hashlib
+import time
+
+import cv2
+import numpy as np
+
+from jemdzem.near_duplicate import NearDuplicateCache, image_hashes
+
+FRAMES = 100
+
+
+def hover(rng: np.random.Generator, scene: np.ndarray, drift: float) -> np.ndarray:
+    dx, dy = rng.normal(0, drift, 2)
+    shifted = cv2.warpAffine(
+        scene, np.float32([[1, 0, dx], [0, 1, dy]]), scene.shape[1::-1]
+    )
+    noisy = np.clip(shifted + rng.normal(0, 4, scene.shape), 0, 255).astype(np.uint8)
+    _, encoded = cv2.imencode(".jpg", noisy, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return encoded
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    noise = (rng.random((270, 480)) * 255).astype(np.uint8)
+    scene = cv2.resize(cv2.GaussianBlur(noise, (0, 0), 6), (1920, 1080))
+    scene = cv2.cvtColor(
+        cv2.normalize(scene, None, 0, 255, cv2.NORM_MINMAX), cv2.COLOR_GRAY2BGR
+    )
+
+    for drift in (1.0, 5.0, 20.0):
+        cache = NearDuplicateCache()
+        seen: set[bytes] = set()
+        exact_hits = 0
+        hashing = 0.0
+        for _ in range(FRAMES):
+            encoded = hover(rng, scene, drift)
+            digest = hashlib.blake2b(encoded).digest()
+            exact_hits += digest in seen
+            seen.add(digest)
+
+            image = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+            start = time.perf_counter()
+            hashes = image_hashes(image)
+            hit, _ = cache.lookup("detect", hashes)
+            hashing += time.perf_counter() - start
+            if not hit:
+                cache.store("detect", hashes, [])
+        stats = cache.stats()
+        print(
+            f"drift {drift:4.1f} px: exact-hash hits {exact_hits}/{FRAMES}, "
+            f"perceptual hits {stats['hits']}/{FRAMES} "
+            f"({stats['hit_rate']:.0%} model calls saved), "
+            f"{hashing / FRAMES * 1e3:.2f} ms per frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
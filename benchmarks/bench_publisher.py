@@ -0,0 +1,81 @@
+"""Read-modify-write of the whole point list versus batched appends.
+
+A mission of reported detections, each with a thumbnail, is published to
+:class:`inspekcja.raporting.publisher.InMemoryReference` the old way
+(download the root, append, upload the whole list), with
+:class:`PointPublisher` one point at a time and with one batch per frame.
+Time is modelled from the counted requests and bytes for a drone uplink.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_publisher
+"""
+
+import time
+
+from inspekcja.raporting.publisher import InMemoryReference, PointPublisher
+
+POINTS = 300
+PER_FRAME = 6
+THUMBNAIL = 5_000
+ROUND_TRIP = 0.08
+BANDWIDTH = 1e6
+
+
+def point(i: int) -> dict:
+    return {
+        "type": "barrel",
+        "gps_coords": [50.27 + i * 1e-5, 18.67],
+        "detection_time": "2025-06-01T12:00:00",
+        "description": "Wykryto obiekt typu barrell",
+        "image": "x" * THUMBNAIL,
+    }
+
+
+def read_modify_write(root: InMemoryReference) -> None:
+    for i in range(POINTS):
+        data = root.get()
+        points = data.get("points", []) if data else []
+        points.append(point(i))
+        root.update({"points": points})
+
+
+def one_by_one(root: InMemoryReference) -> None:
+    publisher = PointPublisher(root)
+    for i in range(POINTS):
+        publisher.append(point(i))
+
+
+def per_frame(root: InMemoryReference) -> None:
+    publisher = PointPublisher(root)
+    for start in range(0, POINTS, PER_FRAME):
+        with publisher.batch():
+            for i in range(start, start + PER_FRAME):
+                publisher.append(point(i))
+
+
+def main() -> None:
+    print(
+        f"{POINTS} points with {THUMBNAIL / 1e3:.0f} kB thumbnails,"
+        f" {ROUND_TRIP * 1e3:.0f} ms round trip, {BANDWIDTH / 1e6:.0f} MB/s"
+    )
+    for name, publish in [
+        ("read-modify-write", read_modify_write),
+        ("publisher, per point", one_by_one),
+        (f"publisher, {PER_FRAME} per frame", per_frame),
+    ]:
+        root = InMemoryReference()
+        start = time.perf_counter()
+        publish(root)
+        local = time.perf_counter() - start
+        assert len(root.child("points").get()) == POINTS
+        modelled = root.requests * ROUND_TRIP + root.transferred / BANDWIDTH
+        print(
+            f"{name + ':':28s}{root.requests:5d} requests"
+            f" {root.transferred / 1e6:8.1f} MB {modelled:8.1f} s modelled"
+            f" ({local * 1e3:.0f} ms local)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Start-up cost of the reporting module, eager versus lazy initialisation.
+
+Each measurement runs in a fresh interpreter. "Eager" imports
+``raporting.push_point`` and then does what its import used to do: derive
+the key (100 000 PBKDF2 iterations), decrypt the service account and
+initialise ``firebase_admin``. The last step is skipped when
+``firebase_admin`` is not installed, so the eager figure is then a lower
+bound. "Lazy" is the import alone, as it is now. The cost of the first
+report on the ``memory`` backend and of a cached key derivation is shown
+as well.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_reporting_startup
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+INSPEKCJA = os.path.join(os.path.dirname(__file__), "..", "inspekcja")
+RUNS = 5
+
+PRELUDE = """
+import sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import raporting.push_point as push_point
+"""
+
+EAGER = """
+push_point.decrypt_config(push_point.KEY_FILE)
+try:
+    from raporting.backends import firebase_reference
+    firebase_reference(push_point.KEY_FILE, push_point.KEY_PASSWORD, push_point.SALT)
+except ImportError:
+    pass
+print(time.perf_counter() - start)
+"""
+
+LAZY = """
+print(time.perf_counter() - start)
+"""
+
+FIRST_REPORT = """
+imported = time.perf_counter()
+push_point.configure("memory")
+push_point.answer("yes")
+push_point.journal().flush()
+print(time.perf_counter() - imported)
+"""
+
+CACHED_KEY = """
+push_point.derive_key(push_point.KEY_PASSWORD, push_point.SALT)
+again = time.perf_counter()
+push_point.derive_key(push_point.KEY_PASSWORD, push_point.SALT)
+print(time.perf_counter() - again)
+"""
+
+
+def measure(body: str) -> float:
+    code = PRELUDE.format(path=os.path.abspath(INSPEKCJA)) + body
+    samples = []
+    for _ in range(RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.split()[-1]))
+    return statistics.median(samples)
+
+
+def main() -> None:
+    try:
+        import firebase_admin  # noqa: F401
+    except ImportError:  # pragma: no cover - optional dependency
+        print("firebase_admin is not installed: eager start-up without its init")
+    eager = measure(EAGER)
+    lazy = measure(LAZY)
+    print(f"median of {RUNS} fresh interpreters:")
+    print(f"{'eager import + init:':28s}{eager * 1e3:8.1f} ms")
+    print(f"{'lazy import:':28s}{lazy * 1e3:8.1f} ms")
+    print(f"{'first report (memory):':28s}{measure(FIRST_REPORT) * 1e3:8.1f} ms")
+    print(f"{'cached key derivation:':28s}{measure(CACHED_KEY) * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
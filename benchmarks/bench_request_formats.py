@@ -0,0 +1,95 @@
+"""Compare server-side parse overhead of the supported request formats.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_request_formats
+
+Only reading the body into encoded image bytes is timed; decoding the image
+costs the same for every format.
+"""
+
+import base64
+import json
+import statistics
+import time
+
+import cv2
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from jemdzem.request_formats import read_image_request
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+REPEATS = 10
+
+app = FastAPI()
+
+
+@app.post("/parse")
+async def parse(request: Request):
+    start = time.perf_counter()
+    payload = await read_image_request(request)
+    return {"seconds": time.perf_counter() - start, "bytes": payload.image.size}
+
+
+def make_image(width: int = 5472, height: int = 3648) -> bytes:
+    """Return a 20 MP JPEG with some texture, similar to a drone photo."""
+    rng = np.random.default_rng(0)
+    image = cv2.resize(
+        rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8),
+        (width, height),
+    )
+    return cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def main() -> None:
+    client = TestClient(app)
+    image = make_image()
+    labels = ["pipe", "barrel"]
+    descriptions = ["orange pipes", "blue barrels"]
+
+    requests = {
+        "multipart": {
+            "files": {"file": ("image.jpg", image, "image/jpeg")},
+            "data": {
+                "labels": json.dumps(labels),
+                "descriptions": json.dumps(descriptions),
+            },
+        },
+        "raw image/jpeg": {
+            "params": {"labels": labels, "descriptions": descriptions},
+            "headers": {"Content-Type": "image/jpeg"},
+            "content": image,
+        },
+        "json + base64": {
+            "json": {
+                "image": base64.b64encode(image).decode(),
+                "labels": labels,
+                "descriptions": descriptions,
+            }
+        },
+    }
+    if msgpack is not None:
+        requests["msgpack"] = {
+            "headers": {"Content-Type": "application/msgpack"},
+            "content": msgpack.packb(
+                {"image": image, "labels": labels, "descriptions": descriptions}
+            ),
+        }
+
+    print(f"image: {len(image) / 1e6:.1f} MB JPEG, {REPEATS} repeats")
+    for name, kwargs in requests.items():
+        seconds = [
+            client.post("/parse", **kwargs).json()["seconds"] for _ in range(REPEATS)
+        ]
+        print(f"{name:>16}: median {statistics.median(seconds) * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare encoding cost of the detection response formats.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_responses
+"""
+
+import statistics
+import time
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from jemdzem.responses import dumps_json, msgpack, orjson, to_columnar
+
+REPEATS = 20
+LABELS = ["pipe", "powerpole", "barrell", "palette", "person", "car"]
+
+
+def make_detections(n: int) -> list[dict]:
+    rng = np.random.default_rng(0)
+    boxes = rng.random((n, 4)).tolist()
+    return [
+        {"label": LABELS[i % len(LABELS)], "x": x, "y": y, "width": w, "height": h}
+        for i, (x, y, w, h) in enumerate(boxes)
+    ]
+
+
+def timed(fn, detections: list[dict]) -> tuple[float, int]:
+    seconds = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        body = fn(detections)
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds), len(body)
+
+
+def main() -> None:
+    encoders = {
+        "rows JSONResponse": lambda d: JSONResponse(content=d).body,
+        "columnar json": lambda d: dumps_json(to_columnar(d)),
+    }
+    if msgpack is not None:
+        encoders["columnar msgpack"] = lambda d: msgpack.packb(to_columnar(d))
+    print(f"orjson available: {orjson is not None}")
+
+    for n in (100, 10_000, 100_000):
+        detections = make_detections(n)
+        print(f"{n} boxes")
+        for name, fn in encoders.items():
+            seconds, size = timed(fn, detections)
+            print(f"{name:>20}: {seconds * 1e3:8.2f} ms {size / 1e3:9.1f} kB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare radius checks and matching against the all-pairs Python loops.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_spatial_index
+"""
+
+import math
+import time
+
+import numpy as np
+
+from modules.spatial_index import GridIndex, match
+
+
+def is_far_enough(x, y, reference_points, min_distance=70):
+    """The former per-detection check of ``inspekcja/detect_all.py``."""
+    return all(
+        math.hypot(x - rx, y - ry) >= min_distance for rx, ry in reference_points
+    )
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    for n in (100, 2_000, 20_000):
+        expected = rng.uniform(0, 50 * math.sqrt(n), (n, 2))
+        detections = expected + rng.normal(0, 5, expected.shape)
+
+        start = time.perf_counter()
+        refs = expected.tolist()
+        for x, y in detections[: min(n, 2_000)].tolist():
+            is_far_enough(x, y, refs, 10)
+        loop = (time.perf_counter() - start) * n / min(n, 2_000)
+
+        start = time.perf_counter()
+        index = GridIndex(10)
+        index.insert(expected)
+        index.nearest(detections, 10)
+        grid = time.perf_counter() - start
+
+        start = time.perf_counter()
+        match(detections, expected, 10, "greedy")
+        greedy = time.perf_counter() - start
+
+        line = (
+            f"N={n:>6}: all-pairs loop {loop * 1e3:10.1f} ms, grid nearest "
+            f"{grid * 1e3:7.1f} ms, greedy match {greedy * 1e3:7.1f} ms"
+        )
+        start = time.perf_counter()
+        match(detections, expected, 10, "hungarian")
+        line += f", hungarian {(time.perf_counter() - start) * 1e3:8.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Load an hour-long 50 Hz flight log and georeference video frames from it.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_telemetry
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from modules.telemetry import TelemetryLog
+
+RATE = 50
+SECONDS = 3600
+FPS = 30
+
+
+def write_csv(path: str) -> None:
+    rng = np.random.default_rng(0)
+    n = RATE * SECONDS
+    t = np.arange(n) / RATE
+    lat = 50.27 + np.cumsum(rng.normal(0, 1e-7, n))
+    lng = 18.67 + np.cumsum(rng.normal(0, 1e-7, n))
+    altitude = 30 + np.cumsum(rng.normal(0, 0.01, n))
+    heading = np.mod(np.cumsum(rng.normal(0, 0.5, n)), 360)
+    np.savetxt(
+        path,
+        np.column_stack((t, lat, lng, altitude, heading)),
+        delimiter=",",
+        header="time,lat,lng,altitude,heading",
+        comments="",
+        fmt="%.7f",
+    )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "flight.csv")
+        write_csv(path)
+
+        start = time.perf_counter()
+        log = TelemetryLog.load(path)
+        print(f"loaded {len(log)} samples in {time.perf_counter() - start:.2f} s")
+
+    frames = np.arange(0, SECONDS, 1 / FPS)
+
+    start = time.perf_counter()
+    for t in frames[:10_000]:
+        log.frame(t)
+    per_frame = (time.perf_counter() - start) / 10_000 * len(frames)
+
+    start = time.perf_counter()
+    log.interpolate(frames)
+    batch = time.perf_counter() - start
+
+    print(
+        f"{len(frames)} frames: one frame() call each {per_frame:.2f} s (estimated), "
+        f"one interpolate() call {batch * 1e3:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Detection thumbnails through a temporary file versus in memory.
+
+The old reporting path wrote every crop of a frame to a PNG in
+``temp_detections/``, read it back with ``cv2.imread`` and made the
+thumbnail one detection at a time. The new path makes the thumbnails
+straight from the crops, either one by one or as one batch on
+:class:`inspekcja.raporting.thumbnails.ThumbnailPool`.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_thumbnails
+"""
+
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from inspekcja.raporting.thumbnails import ThumbnailPool, crop_boxes, thumbnail
+
+DETECTIONS = 12
+REPEATS = 10
+
+
+def via_disk(image: np.ndarray, boxes: list, folder: str) -> list[str]:
+    result = []
+    for x, y, width, height in boxes:
+        path = os.path.join(folder, f"detection_{x}_{y}.png")
+        cv2.imwrite(path, image[y : y + height, x : x + width])
+        result.append(thumbnail(cv2.imread(path)))
+    return result
+
+
+def in_memory(image: np.ndarray, boxes: list) -> list[str]:
+    return [thumbnail(crop) for crop in crop_boxes(image, boxes)]
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(*args)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    image = cv2.GaussianBlur(
+        (rng.random((2160, 3840, 3)) * 255).astype(np.uint8), (0, 0), 2
+    )
+    sizes = rng.integers(150, 600, (DETECTIONS, 2))
+    corners = rng.integers(0, (3840, 2160), (DETECTIONS, 2)) % ((3840, 2160) - sizes)
+    boxes = [(int(x), int(y), int(w), int(h)) for (x, y), (w, h) in zip(corners, sizes)]
+
+    with tempfile.TemporaryDirectory() as folder, ThumbnailPool(4) as pool:
+        assert via_disk(image, boxes, folder) == pool.thumbnails(
+            crop_boxes(image, boxes)
+        )
+        disk = timed(via_disk, image, boxes, folder)
+        memory = timed(in_memory, image, boxes)
+        batch = timed(lambda: pool.thumbnails(crop_boxes(image, boxes)))
+
+    print(f"{DETECTIONS} detections of 150-600 px in a 3840x2160 frame, per frame:")
+    print(f"{'PNG file round trip:':28s}{disk * 1e3:7.1f} ms")
+    print(f"{'in memory, one by one:':28s}{memory * 1e3:7.1f} ms")
+    print(f"{f'in memory, pool of {pool.max_workers}:':28s}{batch * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
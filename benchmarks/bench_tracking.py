@@ -0,0 +1,148 @@
+"""Model calls saved by tracking boxes between detections.
+
+A synthetic flight is written to an MJPG file: the camera pans over
+textured ground with a few objects painted on it, so the true box of every
+object is known in every frame. The stand-in model returns those boxes;
+the benchmark reports how many frames went to the model, the accuracy
+(IoU) of the tracked boxes and the tracking cost per frame. ``max_age 0``
+sends every frame to the model.
+
+A recorded video can be passed instead. Without ground truth the stand-in
+model then returns a fixed grid of boxes and only the cost and the share
+of frames sent to the model are reported.
+
+Run from the repository root with::
+
+    uv run python -m benchmarks.bench_tracking [video]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from modules.tracking import BoxTracker, iou, track_frames
+
+SIZE = (1280, 720)
+FRAMES = 300
+STEP = (3, 1)
+OBJECTS = [
+    ("barrell", (700, 300, 120, 120)),
+    ("palette", (1100, 500, 200, 140)),
+    ("pipe", (1500, 250, 300, 60)),
+]
+
+
+def synthetic_video(path: str) -> list[list[dict]]:
+    """Write the flight to ``path`` and return the true boxes of every frame."""
+
+    rng = np.random.default_rng(0)
+    height = SIZE[1] + STEP[1] * FRAMES
+    width = SIZE[0] + STEP[0] * FRAMES
+    noise = (rng.random((height, width)) * 255).astype(np.uint8)
+    world = cv2.cvtColor(cv2.GaussianBlur(noise, (0, 0), 2), cv2.COLOR_GRAY2BGR)
+    for i, (_, (x, y, w, h)) in enumerate(OBJECTS):
+        patch = world[y : y + h, x : x + w].astype(np.int16)
+        color = np.array([(0, 80, 200), (40, 160, 40), (200, 120, 0)][i])
+        world[y : y + h, x : x + w] = np.clip(patch // 2 + color, 0, 255)
+
+    truth = []
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, SIZE)
+    for i in range(FRAMES):
+        dx, dy = STEP[0] * i, STEP[1] * i
+        writer.write(np.ascontiguousarray(world[dy : dy + SIZE[1], dx : dx + SIZE[0]]))
+        boxes = []
+        for label, (x, y, w, h) in OBJECTS:
+            x0, y0 = max(x - dx, 0), max(y - dy, 0)
+            x1, y1 = min(x - dx + w, SIZE[0]), min(y - dy + h, SIZE[1])
+            if x1 - x0 > w / 2 and y1 - y0 > h / 2:
+                boxes.append(
+                    {
+                        "label": label,
+                        "x": x0 / SIZE[0],
+                        "y": y0 / SIZE[1],
+                        "width": (x1 - x0) / SIZE[0],
+                        "height": (y1 - y0) / SIZE[1],
+                    }
+                )
+        truth.append(boxes)
+    writer.release()
+    return truth
+
+
+def grid_boxes(frame: np.ndarray) -> list[dict]:
+    return [
+        {"label": "cell", "x": x, "y": y, "width": 0.15, "height": 0.15}
+        for x in (0.15, 0.45, 0.75)
+        for y in (0.15, 0.45, 0.75)
+    ]
+
+
+def box_of(detection: dict) -> tuple[float, float, float, float]:
+    return tuple(detection[key] for key in ("x", "y", "width", "height"))
+
+
+def frames_of(path: str):
+    capture = cv2.VideoCapture(path)
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                return
+            yield frame
+    finally:
+        capture.release()
+
+
+def run(path: str, truth: list[list[dict]] | None, max_age: int) -> None:
+    index = 0
+
+    def detect(frame: np.ndarray) -> list[dict]:
+        return truth[index] if truth is not None else grid_boxes(frame)
+
+    tracker = BoxTracker(max_age=max_age)
+    overlaps = []
+    elapsed = 0.0
+    for frame in frames_of(path):
+        start = time.perf_counter()
+        _, tracks, detected = next(track_frames([frame], detect, tracker))
+        if not detected:
+            elapsed += time.perf_counter() - start
+        if truth is not None:
+            expected = {box["label"]: box for box in truth[index]}
+            overlaps += [
+                iou(track.box, box_of(expected[track.label]))
+                for track in tracks
+                if track.label in expected
+            ]
+        index += 1
+
+    tracked = tracker.frames - tracker.detections
+    line = (
+        f"max_age {max_age:3d}: {tracker.detections:3d}/{tracker.frames} frames "
+        f"to the model ({tracker.detection_fraction:.1%}), "
+        f"{elapsed / max(tracked, 1) * 1e3:.2f} ms per tracked frame"
+    )
+    if overlaps:
+        line += f", mean IoU {np.mean(overlaps):.3f}, min IoU {np.min(overlaps):.3f}"
+    print(line)
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        for max_age in (0, 10, 30, 60):
+            run(sys.argv[1], None, max_age)
+        return
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "flight.avi")
+        truth = synthetic_video(path)
+        for max_age in (0, 10, 30, 60):
+            run(path, truth, max_age)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,28 @@
 """Example script calling the ``/multi-detect`` API and visualising results."""
 
-import requests
+import asyncio
 import matplotlib.pyplot as plt
 import cv2
 import os
-import json
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from jemdzem.client import JemdzemClient
 
-if __name__ == "__main__":
-    image = cv2.imread(os.path.join(os.path.dirname(__file__), "detect.jpeg"))
 
-    _, img_encoded = cv2.imencode(".png", image)
-    img_bytes = img_encoded.tobytes()
+async def detect(image):
+    async with JemdzemClient(model_name="gemini-2.0-flash") as client:
+        return await client.multi_detect(
+            image,
+            ["man", "woman", "car", "keys"],
+            ["A man", "A woman", "A car", "Keys, car keys or a keychain"],
+        )
+
 
-    data = {
-        "labels": json.dumps(["man", "woman", "car", "keys"]),
-        "descriptions": json.dumps(
-            ["A man", "A woman", "A car", "Keys, car keys or a keychain"]
-        ),
-    }
+if __name__ == "__main__":
+    image = cv2.imread(os.path.join(os.path.dirname(__file__), "detect.jpeg"))
 
-    response = requests.post(
-        "http://localhost:8000/multi-detect",
-        headers={"X-API-Key": "tym_razem_to_musi_poleciec"},
-        files={"file": ("image.png", img_bytes, "image/png")},
-        data=data,
-    )
-    detections = response.json()
+    detections = asyncio.run(detect(image))
     for detection in detections:
         x = int(detection["x"] * image.shape[1])
         y = int(detection["y"] * image.shape[0])
@@ -1,20 +1,20 @@
 """Example script calling the ``/qa`` API."""
 
-import requests
+import asyncio
 import cv2
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from jemdzem.client import JemdzemClient
+
+
+async def ask(image, question):
+    async with JemdzemClient(model_name="gemini-2.0-flash") as client:
+        return await client.qa(image, question)
 
 
 if __name__ == "__main__":
     image = cv2.imread(os.path.join(os.path.dirname(__file__), "detect.jpeg"))
 
-    _, img_encoded = cv2.imencode(".png", image)
-    img_bytes = img_encoded.tobytes()
-
-    response = requests.post(
-        "http://localhost:8000/qa",
-        headers={"X-API-Key": "tym_razem_to_musi_poleciec"},
-        files={"file": ("image.png", img_bytes, "image/png")},
-        data={"question": "How many people are in the image?"},
-    )
-    print(response.json())
+    print({"answer": asyncio.run(ask(image, "How many people are in the image?"))})
@@ -1,38 +1,27 @@
 """Example script calling the ``/single-detect`` API and visualising results."""
 
-import requests
+import asyncio
 import matplotlib.pyplot as plt
 import cv2
 import os
-import json
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from jemdzem.client import JemdzemClient
 
-if __name__ == "__main__":
-    image = cv2.imread(os.path.join(os.path.dirname(__file__), "detect.jpeg"))
 
-    _, img_encoded = cv2.imencode(".png", image)
-    img_bytes = img_encoded.tobytes()
-
-    ref_image = cv2.imread(os.path.join(os.path.dirname(__file__), "keys.png"))
+async def detect(image, ref_image):
+    async with JemdzemClient() as client:
+        return await client.single_detect(
+            image, ["woman", "keys"], ["a woman", "car keys"], refs={"keys": ref_image}
+        )
 
-    _, ref_img_encoded = cv2.imencode(".png", ref_image)
-    ref_img_bytes = ref_img_encoded.tobytes()
 
-    data = {
-        "labels": json.dumps(["woman", "keys"]),
-        "descriptions": json.dumps(["a woman", "car keys"]),
-    }
+if __name__ == "__main__":
+    image = cv2.imread(os.path.join(os.path.dirname(__file__), "detect.jpeg"))
+    ref_image = cv2.imread(os.path.join(os.path.dirname(__file__), "keys.png"))
 
-    response = requests.post(
-        "http://localhost:8000/single-detect?model_name=gemini-2.5-flash-preview-04-17",
-        headers={"X-API-Key": "tym_razem_to_musi_poleciec"},
-        files=[
-            ("file", ("image.png", img_bytes, "image/png")),
-            ("ref_file", ("keys.png", ref_img_bytes, "image/png")),
-        ],
-        data=data,
-    )
-    detections = response.json()
+    detections = asyncio.run(detect(image, ref_image))
     for detection in detections:
         x = int(detection["x"] * image.shape[1])
         y = int(detection["y"] * image.shape[0])
@@ -1,36 +1,37 @@
-"""Example script calling the ``/single-detect`` API and visualising results."""
+"""Live preview of the drone stream with frame age and drop statistics."""
 
-import matplotlib.pyplot as plt
-import cv2
 import os
-import json
 import sys
 
+import cv2
 
-if __name__ == "__main__":
-    objects = ["person"]
-
-    stream_url = 'rtsp://192.168.241.1/live'
-
-    # Open the video stream
-    cap = cv2.VideoCapture(stream_url)
-
-    if not cap.isOpened():
-        print("Failed to connect to the drone stream.")
-        exit()
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("Failed to grab frame.")
-            break
-
-        # Display the frame
-        cv2.imshow("Drone Feed", frame)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modules.capture import LatestFrameGrabber
 
-        # Exit on 'q' key
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+if __name__ == "__main__":
+    # Adres strumienia lub plik wideo do testów offline
+    stream_url = sys.argv[1] if len(sys.argv) > 1 else 'rtsp://192.168.241.1/live'
+
+    with LatestFrameGrabber(stream_url, pace=os.path.isfile(stream_url)) as grabber:
+        while True:
+            try:
+                frame, _ = grabber.read(timeout=5.0)
+            except TimeoutError:
+                print("Failed to grab frame.")
+                break
+
+            stats = grabber.stats()
+            cv2.putText(
+                frame,
+                f"age {stats.frame_age * 1e3:.0f} ms, dropped {stats.drop_rate:.0%}, reconnects {stats.reconnects}",
+                (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2,
+            )
+
+            # Display the frame
+            cv2.imshow("Drone Feed", frame)
+
+            # Exit on 'q' key
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
 
-    cap.release()
     cv2.destroyAllWindows()
@@ -1,12 +1,19 @@
 """Example script calling the ``/single-detect`` API and visualising results."""
 
-import requests
+import asyncio
 import matplotlib.pyplot as plt
 import cv2
 import os
-import json
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from jemdzem.client import JemdzemClient
+
+
+async def detect(image, labels, descriptions, refs):
+    async with JemdzemClient() as client:
+        return await client.single_detect(image, labels, descriptions, refs=refs)
+
 
 if __name__ == "__main__":
     objects = ["pipe", "powerpole"]
@@ -17,41 +24,19 @@ if __name__ == "__main__":
     ]
 
     image = cv2.imread(os.path.join(os.path.dirname(__file__), sys.argv[1]))
-    _, img_encoded = cv2.imencode(".png", image)
-    img_bytes = img_encoded.tobytes()
-
-    pictures = [("file", ("image.png", img_bytes, "image/png"))]
-
-    i = 0
-    for path in filepaths:
-        ref_image = cv2.imread(os.path.join(os.path.dirname(__file__), path))
 
-        _, ref_img_encoded = cv2.imencode(".png", ref_image)
-        ref_img_bytes = ref_img_encoded.tobytes()
-        name = "ref_file" + str(i)
-        pictures.append((name, (path, ref_img_bytes, "image/png")))
-        i += 1
+    # Obraz referencyjny przypisany do etykiety o tym samym indeksie
+    refs = {
+        label: cv2.imread(os.path.join(os.path.dirname(__file__), path))
+        for label, path in zip(objects, filepaths)
+    }
 
     descriptions = [
         "find all oragne pipes",
         "find all blue barrells",
     ]
 
-    data = {
-        "labels": json.dumps(objects),
-        "descriptions": json.dumps(descriptions),
-    }
-
-    response = requests.post(
-        "http://localhost:8000/single-detect?model_name=gemini-2.5-flash-preview-04-17",
-        headers={"X-API-Key": "tym_razem_to_musi_poleciec"},
-        files=pictures,
-        data=data,
-    )
-
-    print(response)
-
-    detections = response.json()
+    detections = asyncio.run(detect(image, objects, descriptions, refs))
     for detection in detections:
         x = int(detection["x"] * image.shape[1])
         y = int(detection["y"] * image.shape[0])
@@ -1,91 +1,172 @@
-import requests
-import matplotlib.pyplot as plt
-import cv2
-import os
+import argparse
+import asyncio
+import datetime
 import json
+import os
 import sys
-import datetime
-import math
+import time
 
+import cv2
+import matplotlib.pyplot as plt
 import raporting.push_point as push_point
-from aruco_detection import detect_and_draw_aruco, ARUCO_DICTS
-
-
-def pixel_to_gps(x, y, img_width, img_height):
-    lat_top, lat_bottom = 50.272778, 50.272500
-    lon_left, lon_right = 18.670833, 18.671111
-    lon = lon_left + (x / img_width) * (lon_right - lon_left)
-    lat = lat_top + (y / img_height) * (lat_bottom - lat_top)
-    return lat, lon
-
-
-def distance(p1, p2):
-    return math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
-
+from aruco_detection import ARUCO_DICTS, detect_and_draw_aruco
+from raporting import backends
+from raporting.thumbnails import ThumbnailPool, crop_boxes
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from jemdzem.client import JemdzemClient
+from jemdzem.mission import MissionRunner, MissionTask
+from modules.camera import CameraRegistry
+from modules.capture import LatestFrameGrabber
+from modules.fusion import ObjectMap
+from modules.geo_export import export_points
+from modules.georeferencer import FrameTelemetry, GeoReferencer
+from modules.keyframes import KeyframeSelector, iter_keyframes
+from modules.spatial_index import match
+
+# Detekcje bliżej niż tyle pikseli od punktu referencyjnego to znane obiekty
+MIN_DISTANCE = 70
+
+
+def frame_georeferencer(image, args):
+    """Build the pixel -> GPS transform of ``image`` from the flight telemetry."""
+    registry = CameraRegistry()
+    registry.load("yuneec", os.path.join(os.path.dirname(__file__), "..", "camera_dependencies", "Yuneec.npz"))
+    camera = registry.get("yuneec", (image.shape[1], image.shape[0]))
+    telemetry = FrameTelemetry(args.lat, args.lng, args.altitude, args.heading, args.pitch)
+    return GeoReferencer(camera.camera_matrix, camera.dist_coeffs).frame(telemetry)
+
+
+def to_pixels(detection, image):
+    return (
+        int(detection["x"] * image.shape[1]),
+        int(detection["y"] * image.shape[0]),
+        int(detection["width"] * image.shape[1]),
+        int(detection["height"] * image.shape[0]),
+    )
 
-def is_far_enough(x, y, reference_points, min_distance=70):
-    return all(distance((x, y), ref) >= min_distance for ref in reference_points)
 
+def new_objects(object_map, detections, gps, frame_time):
+    """Fuse detections into the mission map; return indices of never seen objects."""
+    if not detections:
+        return set()
+    lat, lon = zip(*gps)
+    changed = object_map.update(lat, lon, [d["label"] for d in detections], timestamp=frame_time)
+    new_ids = {obj.object_id for obj in changed if obj.observations == 1}
+    return {i for i, object_id in enumerate(object_map.last_ids.tolist()) if object_id in new_ids}
+
+
+def report_new(detections, boxes, gps, image, thumbnails, crops_folder=None):
+    """Push detections to Firebase, with thumbnails made in one batch from in-memory crops."""
+    crops = crop_boxes(image, boxes)
+    # Wszystkie punkty klatki w jednej aktualizacji bazy
+    with push_point.batch():
+        for detection, (x, y, _, _), (lat, lon), crop, image_b64 in zip(detections, boxes, gps, crops, thumbnails.thumbnails(crops)):
+            # Wycinki na dysk tylko do logu misji, zapisywane w tle
+            if crops_folder and crop.size:
+                thumbnails.save(os.path.join(crops_folder, f"detection_{detection['label']}_{x}_{y}.png"), crop)
+            push_point.push_detection_to_firebase(detection, (lat, lon), image_b64=image_b64)
+
+
+def detect_and_annotate(detections, image, canvas, label, frame, object_map, frame_time, thumbnails, reference_points=None, color=(255, 255, 255), crops_folder=None):
+    boxes = [to_pixels(detection, image) for detection in detections]
+    gps = frame.centres(boxes)
+
+    # Parowanie detekcji z punktami referencyjnymi (jeden do jednego)
+    known, missing = set(), []
+    if reference_points:
+        pairs, _, missing = match([box[:2] for box in boxes], reference_points, MIN_DISTANCE)
+        known = set(pairs[:, 0].tolist())
+    unknown = [i for i in range(len(detections)) if i not in known]
+    new = {unknown[i] for i in new_objects(object_map, [detections[i] for i in unknown], [gps[i] for i in unknown], frame_time)}
+
+    reported = []
+    for i, (x, y, width, height) in enumerate(boxes):
+        if i in known:
+            print(f"Skipped {label} at ({x}, {y}) - matches a reference point")
+            continue
+        if i not in new:
+            print(f"Skipped {label} at ({x}, {y}) - already on the mission map")
+            continue
+        reported.append(i)
 
-def detect_and_annotate(image, img_bytes, ref_image_path, label, description, reference_points=None, color=(255, 255, 255), temp_folder=None, output_folder=None):
-    pictures = [("file", ("image.png", img_bytes, "image/png"))]
+        cv2.rectangle(canvas, (x, y), (x + width, y + height), color, 8)
+        cv2.putText(canvas, label, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 2, color, 8)
 
-    ref_image = cv2.imread(ref_image_path)
-    _, ref_img_encoded = cv2.imencode(".png", ref_image)
-    ref_img_bytes = ref_img_encoded.tobytes()
-    pictures.append(("ref_file", (os.path.basename(ref_image_path), ref_img_bytes, "image/png")))
+    report_new([detections[i] for i in reported], [boxes[i] for i in reported], [gps[i] for i in reported], image, thumbnails, crops_folder)
 
-    data = {
-        "labels": json.dumps([label]),
-        "descriptions": json.dumps([description]),
-    }
+    # Wysyłka informacji o brakujących obiektach
+    if len(missing):
+        msg = f"Missing {len(missing)} {label}(s)"
+        print(msg)
+        push_point.answer_missing(label, msg)
 
-    response = requests.post(
-        "http://localhost:8000/single-detect?model_name=gemini-2.5-flash-preview-04-17",
-        headers={"X-API-Key": "tym_razem_to_musi_poleciec"},
-        files=pictures,
-        data=data,
-    )
 
-    print(response)
-    if not response.ok:
-        print(f"Detection for {label} failed.")
-        return
+def annotate_people(detections, image, canvas, frame, object_map, frame_time, color_map, thumbnails, output_folder, crops_folder=None):
+    person_detections = []
+    boxes = [to_pixels(detection, image) for detection in detections]
+    gps = frame.centres(boxes)
+    new = new_objects(object_map, detections, gps, frame_time)
+    for detection, (x, y, width, height), (lat, lon) in zip(detections, boxes, gps):
+        person_detections.append({
+            "label": detection["label"],
+            "bbox_px": [x, y, width, height],
+            "gps": {"lat": lat, "lon": lon}
+        })
 
-    detections = response.json()
-    accepted_detections = 0
+        color = color_map.get(detection["label"], (255, 255, 255))
+        cv2.rectangle(canvas, (x, y), (x + width, y + height), color, 8)
+        cv2.putText(canvas, detection["label"], (x, y), cv2.FONT_HERSHEY_SIMPLEX, 2, color, 8)
 
-    for detection in detections:
-        x = int(detection["x"] * image.shape[1])
-        y = int(detection["y"] * image.shape[0])
-        width = int(detection["width"] * image.shape[1])
-        height = int(detection["height"] * image.shape[0])
+    reported = sorted(new)
+    report_new([detections[i] for i in reported], [boxes[i] for i in reported], [gps[i] for i in reported], image, thumbnails, crops_folder)
 
-        if reference_points and not is_far_enough(x, y, reference_points):
-            print(f"Skipped {label} at ({x}, {y}) - too close to reference point")
-            continue
+    with open(os.path.join(output_folder, "person_detections.json"), "w") as f:
+        json.dump(person_detections, f, indent=2)
 
-        lat, lon = pixel_to_gps(x, y, image.shape[1], image.shape[0])
-        temp_path = os.path.join(temp_folder, f"detection_{label}_{x}_{y}.png")
-        cropped_image = image[y:y+height, x:x+width]
-        cv2.imwrite(temp_path, cropped_image)
-        push_point.push_detection_to_firebase(detection, (lat, lon), temp_path)
 
-        cv2.rectangle(image, (x, y), (x + width, y + height), color, 8)
-        cv2.putText(image, label, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 2, color, 8)
+def save_answer(answer, filename, output_folder):
+    push_point.answer(answer)
+    with open(os.path.join(output_folder, filename), "w") as f:
+        json.dump({"answer": answer}, f, indent=2)
 
-        accepted_detections += 1
 
-    # Wysyłka informacji o brakujących obiektach
-    if reference_points and accepted_detections < len(reference_points):
-        missing_count = len(reference_points) - accepted_detections
-        msg = f"Missing {missing_count} {label}(s)"
-        print(msg)
-        push_point.answer_missing(label, msg)
+async def run_mission(image, tasks, refs):
+    """Run all steps over the frame concurrently."""
+    async with JemdzemClient() as client:
+        report = await MissionRunner(client, max_concurrency=6).run(image, tasks, refs)
+        print(f"API timings: {json.dumps(client.timing_summary(), indent=2)}")
+    for task in report.tasks:
+        status = f"failed: {task.error}" if task.error else "ok"
+        print(f"{task.name:>10}: {task.elapsed:6.2f} s ({status})")
+    print(f"Mission steps done in {report.elapsed:.2f} s")
+    return report
 
 
 if __name__ == "__main__":
-    push_point.clear_points()
+    # Domyślna telemetria: środek dawnego prostokąta lat/lon
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lat", type=float, default=50.272639)
+    parser.add_argument("--lng", type=float, default=18.670972)
+    parser.add_argument("--altitude", type=float, default=30.0, help="metres above ground")
+    parser.add_argument("--heading", type=float, default=0.0, help="degrees from north")
+    parser.add_argument("--pitch", type=float, default=-90.0, help="gimbal pitch in degrees")
+    parser.add_argument("--map", default=os.path.join(os.path.dirname(__file__), "mission_map.json"), help="fused object map kept between runs")
+    parser.add_argument("--keyframe-wait", type=float, default=5.0, help="seconds to wait for a sharp frame")
+    parser.add_argument("--new-mission", action="store_true", help="forget the objects of previous runs")
+    parser.add_argument("--save-crops", action="store_true", help="also write detection crops to the mission log")
+    parser.add_argument("--reporting", choices=backends.BACKENDS, help="reporting backend (default: $RAPORTING_BACKEND or firebase)")
+    args = parser.parse_args()
+    if args.reporting:
+        push_point.configure(args.reporting)
+    mission_start = time.perf_counter()
+
+    # Mapa obiektów z poprzednich przelotów, żeby nie dublować punktów
+    if os.path.exists(args.map) and not args.new_mission:
+        object_map = ObjectMap.load(args.map)
+    else:
+        object_map = ObjectMap()
+        push_point.clear_points()
 
     # Punkty referencyjne
     barrells = [(170, 140), (210, 580), (830, 180)]
@@ -99,23 +180,27 @@ if __name__ == "__main__":
     os.makedirs(output_folder, exist_ok=True)
 
     stream_url = 'rtsp://192.168.241.1/live'
-    cap = cv2.VideoCapture(stream_url)
-
-    if not cap.isOpened():
-        print("Failed to connect to the drone stream.")
-        exit()
-
-    ret, image = cap.read()
-    if not ret:
-        print("Failed to grab frame.")
-        exit()
+    # Pierwsza ostra, dobrze naświetlona klatka (najnowsza, nie z bufora)
+    selector = KeyframeSelector()
+    with LatestFrameGrabber(stream_url) as grabber:
+        try:
+            image, frame_time = grabber.read(timeout=10.0)
+            for image, frame_time, score in iter_keyframes(grabber, selector, duration=args.keyframe_wait):
+                break
+            else:
+                print("No sharp frame found, using the latest one.")
+        except TimeoutError:
+            print("Failed to grab frame from the drone stream.")
+            exit()
+    with open(os.path.join(output_folder, "keyframes.json"), "w") as f:
+        json.dump(selector.report(), f, indent=2)
 
     print("Connected to drone stream")
 
-    detect_and_draw_aruco(image, ARUCO_DICTS, pixel_to_gps, push_point, output_folder, temp_folder)
+    frame = frame_georeferencer(image, args)
 
-    _, img_encoded = cv2.imencode(".png", image)
-    img_bytes = img_encoded.tobytes()
+    def pixel_to_gps(x, y, img_width, img_height):
+        return tuple(frame.to_wgs84([[x, y]])[0])
 
     color_map = {
         "pipe": (0, 255, 0),
@@ -138,62 +223,6 @@ if __name__ == "__main__":
         # "pipe": None  # nie trzeba wpisywać, jeśli brak
     }
 
-    for label, description, ref_path in detections_info:
-        reference_points = reference_points_map.get(label)  # None jeśli nie istnieje
-        detect_and_annotate(
-            image=image,
-            img_bytes=img_bytes,
-            ref_image_path=os.path.join(base_path, ref_path),
-            label=label,
-            description=description,
-            reference_points=reference_points,
-            color=color_map.get(label, (255, 255, 255)),
-            temp_folder=temp_folder,
-            output_folder=output_folder
-        )
-
-    # Person detection
-    person_data = {
-        "labels": json.dumps(["person"]),
-        "descriptions": json.dumps(["find all people and manequins"]),
-    }
-
-    response = requests.post(
-        "http://localhost:8000/single-detect?model_name=gemini-2.5-flash-preview-04-17",
-        headers={"X-API-Key": "tym_razem_to_musi_poleciec"},
-        files=[("file", ("image.png", img_bytes, "image/png"))],
-        data=person_data,
-    )
-
-    person_detections = []
-    if response.ok:
-        for detection in response.json():
-            x = int(detection["x"] * image.shape[1])
-            y = int(detection["y"] * image.shape[0])
-            width = int(detection["width"] * image.shape[1])
-            height = int(detection["height"] * image.shape[0])
-            lat, lon = pixel_to_gps(x, y, image.shape[1], image.shape[0])
-
-            person_detections.append({
-                "label": detection["label"],
-                "bbox_px": [x, y, width, height],
-                "gps": {"lat": lat, "lon": lon}
-            })
-
-            color = color_map.get(detection["label"], (255, 255, 255))
-            cv2.rectangle(image, (x, y), (x + width, y + height), color, 8)
-            cv2.putText(image, detection["label"], (x, y), cv2.FONT_HERSHEY_SIMPLEX, 2, color, 8)
-
-            temp_path = os.path.join(temp_folder, f"detection_{detection['label']}_{x}_{y}.png")
-            cropped_image = image[y:y+height, x:x+width]
-            cv2.imwrite(temp_path, cropped_image)
-            push_point.push_detection_to_firebase(detection, (lat, lon), temp_path)
-
-        with open(os.path.join(output_folder, "person_detections.json"), "w") as f:
-            json.dump(person_detections, f, indent=2)
-
-    cv2.imwrite(os.path.join(output_folder, "plot_people.png"), image)
-
     # QA Outfit
     qa_questions = [
         (
@@ -206,18 +235,90 @@ if __name__ == "__main__":
         )
     ]
 
-    for filename, question in qa_questions:
-        qa_response = requests.post(
-            "http://localhost:8000/qa",
-            headers={"X-API-Key": "tym_razem_to_musi_poleciec"},
-            files={"file": ("image.png", img_bytes, "image/png")},
-            data={"question": question},
+    def label_task(label, description):
+        async def run(ctx):
+            return await ctx.client.single_detect(ctx.encoded, [label], [description], refs={label: ctx.refs[label]})
+
+        def commit(ctx, detections):
+            detect_and_annotate(
+                detections=detections,
+                image=ctx.image,
+                canvas=ctx.canvas,
+                label=label,
+                frame=frame,
+                object_map=object_map,
+                frame_time=frame_time,
+                reference_points=reference_points_map.get(label),  # None jeśli nie istnieje
+                color=color_map.get(label, (255, 255, 255)),
+                thumbnails=thumbnails,
+                crops_folder=crops_folder,
+            )
+
+        return MissionTask(label, run, commit)
+
+    def qa_task(filename, question):
+        async def run(ctx):
+            return await ctx.client.qa(ctx.encoded, question, model_name="gemini-2.0-flash")
+
+        return MissionTask(filename, run, lambda ctx, answer: save_answer(answer, filename, output_folder))
+
+    def aruco_task():
+        def run(ctx):
+            # Detekcja na czystej klatce; znaczniki rysowane na prywatnej kopii
+            marked = ctx.image.copy()
+            detect_and_draw_aruco(marked, ARUCO_DICTS, pixel_to_gps, push_point, output_folder, temp_folder)
+            return marked
+
+        def commit(ctx, marked):
+            # Na wspólny obraz przenosimy tylko piksele narysowanych znaczników
+            drawn = cv2.absdiff(marked, ctx.image).any(axis=2)
+            ctx.canvas[drawn] = marked[drawn]
+
+        return MissionTask("aruco", run, commit)
+
+    async def detect_people(ctx):
+        return await ctx.client.single_detect(ctx.encoded, ["person"], ["find all people and manequins"])
+
+    # Niezależne kroki misji na jednej klatce, wykonywane równolegle.
+    # Kroki run tylko czytają klatkę, po wspólnym obrazie rysują kroki commit.
+    tasks = [
+        aruco_task(),
+        *(label_task(label, description) for label, description, _ in detections_info),
+        MissionTask(
+            "person",
+            detect_people,
+            lambda ctx, detections: annotate_people(detections, ctx.image, ctx.canvas, frame, object_map, frame_time, color_map, thumbnails, output_folder, crops_folder),
+        ),
+        *(qa_task(filename, question) for filename, question in qa_questions),
+    ]
+    # Obrazy referencyjne wczytane i zakodowane raz
+    refs = {label: cv2.imread(os.path.join(base_path, ref_path)) for label, _, ref_path in detections_info}
+
+    # Miniatury detekcji robione w pamięci, paczkami na puli wątków
+    crops_folder = os.path.join(output_folder, "crops") if args.save_crops else None
+    with ThumbnailPool() as thumbnails:
+        report = asyncio.run(run_mission(image, tasks, refs))
+
+    cv2.imwrite(os.path.join(output_folder, "plot_people.png"), report.context.canvas)
+    object_map.save(args.map)
+    # Raport wszystkich obiektów z mapy misji
+    objects = object_map.objects
+    for extension in (".geojson", ".kml", ".csv"):
+        export_points(
+            os.path.join(output_folder, "objects" + extension),
+            [obj.lat for obj in objects],
+            [obj.lng for obj in objects],
+            [{"label": obj.label, "observations": obj.observations, "confidence": obj.confidence} for obj in objects],
         )
-        result = qa_response.json()
-        if "answer" in result:
-            push_point.answer(result["answer"])
-        with open(os.path.join(output_folder, filename), "w") as f:
-            json.dump(result, f, indent=2)
-
     push_point.generate_points()
-    print(f"\nMission complete. Results saved in: {output_folder}")
+
+    # Czas całej misji (od połączenia ze strumieniem) w logu wszystkich przelotów
+    total = time.perf_counter() - mission_start
+    # Zaległe raporty wysyłane jeszcze do 10 s, reszta zostaje w dzienniku na następny start
+    reporting = push_point.backlog()
+    reporting["unsent_at_exit"] = push_point.close(timeout=10.0)
+    print(f"Reporting backlog: {reporting['backlog']} at mission end, {reporting['unsent_at_exit']} left for the next run")
+    with open(os.path.join(output_folder, "mission_report.json"), "w") as f:
+        json.dump(report.to_dict() | {"total": total, "reporting": reporting}, f, indent=2)
+    report.append_to(os.path.join(base_path, "mission_logs", "missions.jsonl"), total=total, reporting=reporting, output_folder=output_folder)
+    print(f"\nMission complete in {total:.1f} s. Results saved in: {output_folder}")
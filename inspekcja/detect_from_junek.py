@@ -1,74 +1,86 @@
 """Example script calling the ``/single-detect`` API and visualising results."""
 
-import requests
+import asyncio
 import matplotlib.pyplot as plt
 import cv2
 import os
-import json
 import sys
+import argparse
 import raporting.push_point as push_point
+from raporting.thumbnails import ThumbnailPool, crop_boxes
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from jemdzem.client import JemdzemClient
+from modules.camera import CameraRegistry
+from modules.capture import LatestFrameGrabber
+from modules.georeferencer import FrameTelemetry, GeoReferencer
+
+
+async def detect_and_ask(image, labels, descriptions, refs, question):
+    # Detekcja i pytanie lecą równolegle, oba jako zgłoszenia alarmowe
+    async with JemdzemClient(priority="emergency") as client:
+        return await asyncio.gather(
+            client.single_detect(image, labels, descriptions, refs=refs),
+            client.qa(image, question),
+        )
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lat", type=float, default=50.272639)
+    parser.add_argument("--lng", type=float, default=18.670972)
+    parser.add_argument("--altitude", type=float, default=30.0, help="metres above ground")
+    parser.add_argument("--heading", type=float, default=0.0, help="degrees from north")
+    parser.add_argument("--pitch", type=float, default=-90.0, help="gimbal pitch in degrees")
+    args = parser.parse_args()
+
     ### ZMIANY RAPORTOWANIE ###
     push_point.clear_points()
-    temp_folder = os.path.join(os.path.dirname(__file__), "temp_detections")
-    os.makedirs(temp_folder, exist_ok=True)
     ### KONIEC ZMIAN ###
     objects = ["person"]
 
     stream_url = 'rtsp://192.168.241.1/live'
 
-    # Open the video stream
-    cap = cv2.VideoCapture(stream_url)
+    # Open the video stream and take its newest frame
+    with LatestFrameGrabber(stream_url) as grabber:
+        try:
+            image, _ = grabber.read(timeout=10.0)
+        except TimeoutError:
+            print("Failed to grab frame from the drone stream.")
+            exit()
 
-    if not cap.isOpened():
-        print("Failed to connect to the drone stream.")
-        exit()
-
-    ret, image = cap.read()
-    if not ret:
-        print("Failed to grab frame.")
-        exit()
+    registry = CameraRegistry()
+    registry.load("yuneec", os.path.join(os.path.dirname(__file__), "..", "camera_dependencies", "Yuneec.npz"))
+    camera = registry.get("yuneec", (image.shape[1], image.shape[0]))
+    telemetry = FrameTelemetry(args.lat, args.lng, args.altitude, args.heading, args.pitch)
+    frame = GeoReferencer(camera.camera_matrix, camera.dist_coeffs).frame(telemetry)
 
     filepaths = ["inspekcja/czerwona_kamza.png"]
 
     #image = cv2.imread(os.path.join(os.path.dirname(__file__), sys.argv[1]))
-    _, img_encoded = cv2.imencode(".png", image)
-    img_bytes = img_encoded.tobytes()
-
-    pictures = [("file", ("image.png", img_bytes, "image/png"))]
-
-    i = 0
-    for path in filepaths:
-        ref_image = cv2.imread(os.path.join(os.path.dirname(__file__), path))
-
-        _, ref_img_encoded = cv2.imencode(".png", ref_image)
-        ref_img_bytes = ref_img_encoded.tobytes()
-        name = "ref_file" + str(i)
-        pictures.append((name, (path, ref_img_bytes, "image/png")))
-        i += 1
+    refs = {
+        label: cv2.imread(os.path.join(os.path.dirname(__file__), path))
+        for label, path in zip(objects, filepaths)
+    }
 
     descriptions = ["find all people"]
 
-    data = {
-        "labels": json.dumps(objects),
-        "descriptions": json.dumps(descriptions),
-    }
-
-    response = requests.post(
-        "http://localhost:8000/single-detect?model_name=gemini-2.5-flash-preview-04-17",
-        headers={"X-API-Key": "tym_razem_to_musi_poleciec"},
-        files=pictures,
-        data=data,
+    detections, answer = asyncio.run(
+        detect_and_ask(image, objects, descriptions, refs, "Is there yellow emengency light?")
     )
-
-    print(response)
-    detections = response.json()
-    for detection in detections:
-        x = int(detection["x"] * image.shape[1])
-        y = int(detection["y"] * image.shape[0])
-        width = int(detection["width"] * image.shape[1])
-        height = int(detection["height"] * image.shape[0])
+    boxes = [
+        (
+            int(detection["x"] * image.shape[1]),
+            int(detection["y"] * image.shape[0]),
+            int(detection["width"] * image.shape[1]),
+            int(detection["height"] * image.shape[0]),
+        )
+        for detection in detections
+    ]
+    # Miniatury z wycinków w pamięci, zanim ramki zostaną narysowane na obrazie
+    with ThumbnailPool() as pool:
+        thumbnails = pool.thumbnails(crop_boxes(image, boxes))
+    for detection, (x, y, width, height), (lat, lon), image_b64 in zip(detections, boxes, frame.centres(boxes), thumbnails):
         color = {
             "pipe": (0, 255, 0),
             "powerpole": (255, 0, 255),
@@ -78,7 +90,7 @@ if __name__ == "__main__":
             "car": (0, 0, 255),
         }[detection["label"]]
 	### ZMIANY RAPORTOWANIE ###
-        push_point.push_detection_to_firebase(detection, (y,x), temp_folder)
+        push_point.push_detection_to_firebase(detection, (lat, lon), image_b64=image_b64)
         ### KONIEC ZMIAN ###
         cv2.rectangle(image, (x, y), (x + width, y + height), color, 8)
         cv2.putText(
@@ -88,13 +100,5 @@ if __name__ == "__main__":
     plt.axis("off")
     plt.savefig("plot.png")
 
-    response = requests.post(
-        "http://localhost:8000/qa",
-        headers={"X-API-Key": "tym_razem_to_musi_poleciec"},
-        files={"file": ("image.png", img_bytes, "image/png")},
-        data={
-            "question": "Is there yellow emengency light?"
-        },
-    )
-    print(response.json())
+    print({"answer": answer})
     push_point.generate_points()
@@ -0,0 +1,147 @@
+"""Database backends of the mission reports, initialised on first use.
+
+Importing the reporting module used to derive the key of the encrypted
+service account (100 000 PBKDF2 iterations), decrypt it and initialise
+``firebase_admin``, on every script start, even for runs that never
+report. Here nothing happens until the first report is sent:
+
+* ``firebase`` gives a :class:`LazyReference` that initialises the app,
+  once per process, when the reference is first used (by the background
+  flusher of the journal, not the detection loop);
+* ``memory`` gives an :class:`~.publisher.InMemoryReference`, for local runs
+  and tests;
+* ``offline`` gives ``None``: reports stay in the journal until a later run
+  with a database backend sends them.
+
+The derived key is cached in the memory of the process, never on disk. A
+key derived beforehand can be passed in ``RAPORTING_KEY`` (hex) to skip the
+derivation altogether.
+"""
+
+import functools
+import json
+import os
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from .publisher import InMemoryReference
+
+BACKEND_ENV = "RAPORTING_BACKEND"
+KEY_ENV = "RAPORTING_KEY"
+BACKENDS = ("firebase", "memory", "offline")
+DATABASE_URL = "https://droniada-2025-default-rtdb.europe-west1.firebasedatabase.app"
+KDF_ITERATIONS = 100_000
+
+
+@functools.lru_cache(maxsize=4)
+def derive_key(password: bytes, salt: bytes, iterations: int = KDF_ITERATIONS) -> bytes:
+    """Derive the AES key of ``password`` with PBKDF2-SHA256, once per process."""
+
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(), length=32, salt=salt, iterations=iterations
+    )
+    return kdf.derive(password)
+
+
+def load_key(password: bytes, salt: bytes) -> bytes:
+    """Return the pre-derived key from ``RAPORTING_KEY`` or derive it."""
+
+    pre_derived = os.environ.get(KEY_ENV)
+    if pre_derived:
+        key = bytes.fromhex(pre_derived)
+        if len(key) != 32:
+            raise ValueError(f"{KEY_ENV} must hold a 32 byte key in hex")
+        return key
+    return derive_key(password, salt)
+
+
+def decrypt_file_to_bytes(input_path: str, key: bytes) -> bytes:
+    """Decrypt an AES-CBC file whose first 16 bytes are the IV."""
+
+    from cryptography.hazmat.primitives import padding
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    with open(input_path, "rb") as file:
+        iv = file.read(16)
+        ciphertext = file.read()
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+    padded = decryptor.update(ciphertext) + decryptor.finalize()
+    unpadder = padding.PKCS7(128).unpadder()
+    return unpadder.update(padded) + unpadder.finalize()
+
+
+def decrypt_config(path: str, password: bytes, salt: bytes) -> dict:
+    """Decrypt the JSON service account in ``path``."""
+
+    return json.loads(decrypt_file_to_bytes(path, load_key(password, salt)))
+
+
+class LazyReference:
+    """Database reference created by ``factory`` when it is first used.
+
+    Attribute access (``child``, ``get``, ``update``, …) is forwarded to the
+    created reference. If the factory fails, the next use tries again.
+    """
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+        self._ref: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialised(self) -> bool:
+        return self._ref is not None
+
+    def resolve(self) -> Any:
+        """Return the reference, creating it on the first call."""
+
+        if self._ref is None:
+            with self._lock:
+                if self._ref is None:
+                    self._ref = self._factory()
+        return self._ref
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+
+def firebase_reference(
+    key_file: str, password: bytes, salt: bytes, url: str = DATABASE_URL
+) -> Any:
+    """Initialise ``firebase_admin`` once per process; return the root reference."""
+
+    import firebase_admin
+    from firebase_admin import credentials, db
+
+    try:
+        firebase_admin.get_app()
+    except ValueError:
+        config = decrypt_config(key_file, password, salt)
+        firebase_admin.initialize_app(
+            credentials.Certificate(config), {"databaseURL": url}
+        )
+    return db.reference("/")
+
+
+def open_backend(name: str, key_file: str, password: bytes, salt: bytes) -> Any:
+    """Return the root reference of backend ``name``, or ``None`` for ``offline``.
+
+    Raises:
+        ValueError: If ``name`` is not one of :data:`BACKENDS`.
+    """
+
+    if name == "firebase":
+        return LazyReference(
+            functools.partial(firebase_reference, key_file, password, salt)
+        )
+    if name == "memory":
+        return InMemoryReference()
+    if name == "offline":
+        return None
+    raise ValueError(f"Unknown reporting backend {name!r}, expected one of {BACKENDS}")
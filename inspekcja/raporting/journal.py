@@ -0,0 +1,363 @@
+"""Offline-first reporting: a local journal flushed to the database in the background.
+
+Reporting calls used to be synchronous network calls in the middle of the
+detection loop, so a slow or lost uplink stalled the mission.
+:class:`ReportJournal` instead appends every report (a point, an update of
+fields, clearing the points) to a local SQLite journal, which takes tens of
+microseconds. A background thread sends the journal to a
+:class:`~.publisher.PointPublisher` in order, in batches, retrying with
+exponential backoff while the uplink is down::
+
+    journal = ReportJournal("reporting.sqlite3", publisher)
+    journal.start()
+    with journal.batch():
+        journal.record_point(point)
+        journal.record_update({"missing/barrel": "Missing 1 barrel(s)"})
+    print(journal.stats())
+    journal.close(timeout=10.0)
+
+Guarantees:
+
+* Entries are sent in the order they were recorded; a failed batch is
+  retried before anything recorded later.
+* Every entry has an idempotency key; recording a key again is ignored.
+* A point is sent under a path reserved once and stored with the entry, so
+  resending it after a lost acknowledgement or a restart overwrites it
+  instead of adding a copy.
+* Entries not sent before :meth:`ReportJournal.close` stay in the journal
+  and are sent by the next process that starts it.
+"""
+
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .publisher import PointPublisher
+
+POINT = "point"
+UPDATE = "update"
+CLEAR = "clear"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    path TEXT,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    sent REAL
+);
+CREATE INDEX IF NOT EXISTS journal_unsent ON journal (seq) WHERE sent IS NULL;
+"""
+
+
+@dataclass(frozen=True)
+class Entry:
+    """One journalled report."""
+
+    seq: int
+    key: str
+    kind: str
+    payload: Any
+    path: str | None
+
+
+class ReportJournal:
+    """Durable local journal of reports with a background flusher.
+
+    Args:
+        path: SQLite file of the journal, ``":memory:"`` for tests.
+        publisher: Destination of the reports.
+        max_batch: Entries sent in one database update at most.
+        interval: Seconds between checks for new entries when idle.
+        backoff: First retry delay in seconds after a failed batch; it
+            doubles with every further failure.
+        max_backoff: Longest retry delay in seconds.
+        keep: Seconds sent entries stay in the journal; older ones are
+            removed by :meth:`start`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        publisher: PointPublisher,
+        max_batch: int = 100,
+        interval: float = 1.0,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        keep: float = 7 * 24 * 3600,
+    ) -> None:
+        self.path = path
+        self.publisher = publisher
+        self.max_batch = max_batch
+        self.interval = interval
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.keep = keep
+        self.sent = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self._consecutive_failures = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # Durable against a crash of the process; fsync only at checkpoints
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._deadline = 0.0
+        self._depth = 0
+        self._resumed = False
+        self._closed = False
+        self._close_on_exit = False
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "ReportJournal":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _record(self, kind: str, payload: Any, key: str | None) -> str:
+        key = key or uuid.uuid4().hex
+        data = json.dumps(payload, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO journal (key, kind, payload, created)"
+                " VALUES (?, ?, ?, ?)",
+                (key, kind, data, time.time()),
+            )
+            if self._depth == 0:
+                self._wake.set()
+        return key
+
+    def record_point(self, point: Mapping[str, Any], key: str | None = None) -> str:
+        """Journal a new point; return its idempotency key."""
+
+        return self._record(POINT, dict(point), key)
+
+    def record_update(self, fields: Mapping[str, Any], key: str | None = None) -> str:
+        """Journal an update of ``fields`` (paths relative to the report root)."""
+
+        return self._record(UPDATE, dict(fields), key)
+
+    def record_clear(self, key: str | None = None) -> str:
+        """Journal removing all points."""
+
+        return self._record(CLEAR, None, key)
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator["ReportJournal"]:
+        """Hold the flusher back until the entries recorded inside are all in.
+
+        Reports of one frame then go out in one database update.
+        """
+
+        with self._lock:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._wake.set()
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def backlog(self) -> int:
+        """Number of entries not sent yet."""
+
+        return self._query("SELECT COUNT(*) FROM journal WHERE sent IS NULL")[0][0]
+
+    def stats(self) -> dict:
+        """Backlog size, age of the oldest unsent entry and flush counters."""
+
+        backlog, oldest = self._query(
+            "SELECT COUNT(*), MIN(created) FROM journal WHERE sent IS NULL"
+        )[0]
+        return {
+            "backlog": backlog,
+            "oldest_age": time.time() - oldest if oldest is not None else 0.0,
+            "sent": self.sent,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+    def _pending(self) -> list[Entry]:
+        rows = self._query(
+            "SELECT seq, key, kind, payload, path FROM journal"
+            " WHERE sent IS NULL ORDER BY seq LIMIT ?",
+            (self.max_batch,),
+        )
+        return [
+            Entry(seq, key, kind, json.loads(payload), path)
+            for seq, key, kind, payload, path in rows
+        ]
+
+    def _mark_sent(self, entries: list[Entry]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE journal SET sent = ? WHERE seq = ?",
+                [(now, entry.seq) for entry in entries],
+            )
+        self.sent += len(entries)
+
+    def _send(self, entries: list[Entry]) -> None:
+        with self.publisher.batch():
+            for entry in entries:
+                if entry.kind == POINT:
+                    path = entry.path
+                    if path is None:
+                        # Stored before sending, so a resend reuses the path
+                        path = self.publisher.reserve()
+                        with self._lock:
+                            self._db.execute(
+                                "UPDATE journal SET path = ? WHERE seq = ?",
+                                (path, entry.seq),
+                            )
+                    self.publisher.append(entry.payload, key=path)
+                else:
+                    self.publisher.update(entry.payload)
+
+    def flush_once(self) -> int:
+        """Send the oldest unsent entries in order; return how many were sent.
+
+        Runs of points and updates go out as one update each; clearing the
+        points is sent on its own, as it cannot share an update with new
+        points. Raises the error of a failed send, leaving the entries in
+        the journal.
+        """
+
+        with self._flush_lock:
+            if not self._resumed:
+                self._resume_numbering()
+                self._resumed = True
+            entries = self._pending()
+            if not entries:
+                return 0
+            if entries[0].kind == CLEAR:
+                entries = entries[:1]
+            else:
+                clears = [i for i, entry in enumerate(entries) if entry.kind == CLEAR]
+                entries = entries[: clears[0]] if clears else entries
+            try:
+                if entries[0].kind == CLEAR:
+                    self.publisher.clear()
+                else:
+                    self._send(entries)
+            except Exception:
+                with self._lock:
+                    self._db.executemany(
+                        "UPDATE journal SET attempts = attempts + 1 WHERE seq = ?",
+                        [(entry.seq,) for entry in entries],
+                    )
+                raise
+            self._mark_sent(entries)
+            return len(entries)
+
+    def flush(self) -> int:
+        """Send the whole backlog now; return the number of entries sent."""
+
+        total = 0
+        while sent := self.flush_once():
+            total += sent
+        return total
+
+    def _resume_numbering(self) -> None:
+        # Points reserved by an earlier process but not acknowledged keep
+        # their paths; new points must be numbered after them.
+        rows = self._query(
+            "SELECT path FROM journal WHERE sent IS NULL AND path IS NOT NULL"
+        )
+        indices = [int(path.rsplit("/", 1)[1]) for (path,) in rows]
+        if indices:
+            self.publisher.advance(max(indices) + 1)
+
+    def _run(self) -> None:
+        try:
+            self._flush_until_stopped()
+        finally:
+            with self._lock:
+                if self._close_on_exit:
+                    self._db.close()
+
+    def _flush_until_stopped(self) -> None:
+        delay = 0.0
+        while True:
+            if self._stop.is_set():
+                delay = min(delay, max(self._deadline - time.monotonic(), 0.0))
+            self._wake.wait(delay)
+            self._wake.clear()
+            try:
+                self.flush()
+            # Any error of the backend (network, auth, quota) is retried.
+            except Exception as exc:  # noqa: BLE001
+                self.failures += 1
+                self._consecutive_failures += 1
+                self.last_error = repr(exc)
+                delay = min(
+                    self.backoff * 2 ** (self._consecutive_failures - 1),
+                    self.max_backoff,
+                )
+                if self._stop.is_set() and time.monotonic() >= self._deadline:
+                    return
+                continue
+            self._consecutive_failures = 0
+            delay = self.interval
+            if self._stop.is_set():
+                return
+
+    def start(self) -> "ReportJournal":
+        """Remove old sent entries and start the background flusher."""
+
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM journal WHERE sent IS NOT NULL AND sent < ?",
+                (time.time() - self.keep,),
+            )
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="report-journal", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self, timeout: float = 10.0) -> int:
+        """Flush for at most ``timeout`` seconds, stop and return the backlog.
+
+        Entries left are kept in the journal for the next run. A send still
+        blocked at the deadline is left to finish in the background; the
+        flusher then records it and closes the database itself. Closing
+        again returns 0.
+        """
+
+        if self._closed:
+            return 0
+        if self._thread is not None:
+            self._deadline = time.monotonic() + timeout
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout + 1.0)
+        backlog = self.backlog()
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._close_on_exit = True
+            else:
+                self._db.close()
+            self._thread = None
+            self._closed = True
+        return backlog
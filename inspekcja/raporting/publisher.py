@@ -0,0 +1,300 @@
+"""Append-only, batched publishing of mission points to the Realtime Database.
+
+Publishing a point used to download the whole database root, append the
+point to the ``points`` list and upload the whole list again, so every push
+cost O(points) in transfer and a mission O(points²). :class:`PointPublisher`
+writes every point under its own index key (``points/0``, ``points/1``, …)
+with a multi-path update, so a push costs O(1) and readers still see a
+list. Points and other fields (``generate``, ``answer``, ``missing/…``)
+queued within :meth:`PointPublisher.batch` go out as a single update::
+
+    publisher = PointPublisher(db.reference("/"))
+    with publisher.batch():
+        for point in points:
+            publisher.append(point)
+    publisher.update({"generate": True})
+
+:class:`InMemoryReference` is a local stand-in for
+``firebase_admin.db.Reference`` that also counts requests and transferred
+bytes, for tests and benchmarks.
+"""
+
+import contextlib
+import itertools
+import json
+import threading
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":"))) if value is not None else 0
+
+
+def _split(path: str) -> list[str]:
+    return [part for part in path.split("/") if part]
+
+
+def _to_tree(value: Any) -> Any:
+    # The database stores lists as children keyed by index
+    if isinstance(value, list):
+        value = {str(i): item for i, item in enumerate(value)}
+    if isinstance(value, dict):
+        tree = {str(k): _to_tree(v) for k, v in value.items() if v is not None}
+        return tree or None
+    return value
+
+
+def _from_tree(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    if value and all(key.isdigit() for key in value):
+        # Like the database, mostly dense integer keys read back as a list
+        size = max(int(key) for key in value) + 1
+        if len(value) * 2 > size:
+            items = [None] * size
+            for key, item in value.items():
+                items[int(key)] = _from_tree(item)
+            return items
+    return {key: _from_tree(item) for key, item in value.items()}
+
+
+class InMemoryReference:
+    """Local stand-in for a ``firebase_admin.db.Reference``.
+
+    Supports the calls the reporting scripts use: ``child``, ``get`` (also
+    ``shallow``), ``set``, ``update`` (multi-path) and ``delete``. All
+    references derived from one root share its data and its ``requests``
+    and ``transferred`` counters.
+    """
+
+    def __init__(
+        self, data: Any = None, path: str = "/", _root: dict | None = None
+    ) -> None:
+        self._parts = _split(path)
+        if _root is None:
+            _root = {
+                "data": _to_tree(data),
+                "requests": 0,
+                "transferred": 0,
+                "lock": threading.RLock(),
+            }
+        self._root = _root
+        self._lock = _root["lock"]
+
+    @property
+    def path(self) -> str:
+        return "/" + "/".join(self._parts)
+
+    @property
+    def key(self) -> str | None:
+        return self._parts[-1] if self._parts else None
+
+    @property
+    def requests(self) -> int:
+        return self._root["requests"]
+
+    @property
+    def transferred(self) -> int:
+        return self._root["transferred"]
+
+    def child(self, path: str) -> "InMemoryReference":
+        return InMemoryReference(
+            path="/".join(self._parts + _split(path)), _root=self._root
+        )
+
+    def _count(self, size: int) -> None:
+        self._root["requests"] += 1
+        self._root["transferred"] += size
+
+    def _read(self, parts: list[str]) -> Any:
+        node = self._root["data"]
+        for part in parts:
+            if not isinstance(node, dict):
+                return None
+            node = node.get(part)
+        return node
+
+    def _write(self, parts: list[str], value: Any) -> None:
+        if not parts:
+            self._root["data"] = _to_tree(value)
+            return
+        if not isinstance(self._root["data"], dict):
+            self._root["data"] = {}
+        node, trail = self._root["data"], []
+        for part in parts[:-1]:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            trail.append((node, part))
+            node = node[part]
+        value = _to_tree(value)
+        if value is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = value
+        # Empty parents disappear, as in the database
+        for parent, part in reversed(trail):
+            if parent[part]:
+                break
+            del parent[part]
+
+    def get(self, shallow: bool = False) -> Any:
+        with self._lock:
+            value = self._read(self._parts)
+            if shallow and isinstance(value, dict):
+                value = dict.fromkeys(value, True)
+            else:
+                value = _from_tree(value)
+            self._count(_size(value))
+            return value
+
+    def set(self, value: Any) -> None:
+        with self._lock:
+            self._count(_size(value))
+            self._write(self._parts, value)
+
+    def update(self, value: Mapping[str, Any]) -> None:
+        if not value:
+            raise ValueError("Update must not be empty")
+        paths = sorted("/".join(_split(path)) + "/" for path in value)
+        for parent, path in itertools.pairwise(paths):
+            if path.startswith(parent):
+                raise ValueError(f"Path {parent} is an ancestor of {path}")
+        with self._lock:
+            self._count(_size(dict(value)))
+            for path, item in value.items():
+                self._write(self._parts + _split(path), item)
+
+    def delete(self) -> None:
+        self.set(None)
+
+
+def _next_index(children: Any) -> int:
+    if not children:
+        return 0
+    if isinstance(children, list):
+        return len(children)
+    return max((int(key) + 1 for key in children if str(key).isdigit()), default=0)
+
+
+class PointPublisher:
+    """Publish points and fields of the mission report in batched updates.
+
+    Args:
+        ref: Database reference of the report root.
+        path: Child of ``ref`` holding the points.
+        max_batch: Queued points that trigger a flush inside a batch.
+    """
+
+    def __init__(self, ref: Any, path: str = "points", max_batch: int = 100) -> None:
+        self.ref = ref
+        self.path = path.strip("/")
+        self.max_batch = max_batch
+        self._pending: dict[str, Any] = {}
+        self._queued_points = 0
+        self._next: int | None = None
+        self._depth = 0
+        self._lock = threading.RLock()
+
+    @property
+    def pending(self) -> int:
+        """Number of queued paths not yet sent."""
+
+        return len(self._pending)
+
+    def _index(self) -> int:
+        if self._next is None:
+            # One shallow read of the existing keys, only the first time
+            self._next = _next_index(self.ref.child(self.path).get(shallow=True))
+        return self._next
+
+    def reserve(self) -> str:
+        """Return the path of the next point and advance the numbering."""
+
+        with self._lock:
+            index = self._index()
+            self._next = index + 1
+            return f"{self.path}/{index}"
+
+    def advance(self, index: int) -> None:
+        """Make sure the next reserved point index is at least ``index``."""
+
+        with self._lock:
+            self._next = max(self._index(), index)
+
+    def append(self, point: Mapping[str, Any], key: str | None = None) -> str:
+        """Queue ``point`` and return its path.
+
+        The point goes under the next index key, or under ``key`` reserved
+        earlier with :meth:`reserve`; sending it again under the same key
+        overwrites it instead of adding a copy. Outside :meth:`batch` the
+        point is sent at once.
+        """
+
+        with self._lock:
+            if key is None:
+                key = self.reserve()
+            self._pending[key] = dict(point)
+            self._queued_points += 1
+            if self._depth == 0 or self._queued_points >= self.max_batch:
+                self.flush()
+            return key
+
+    def update(self, fields: Mapping[str, Any]) -> None:
+        """Queue ``fields`` (paths relative to ``ref``) with the points.
+
+        Outside :meth:`batch` they are sent at once, after queued points.
+        """
+
+        with self._lock:
+            for path, value in fields.items():
+                self._pending[path.strip("/")] = value
+            if self._depth == 0:
+                self.flush()
+
+    def clear(self) -> None:
+        """Remove all points, dropping queued ones, and restart numbering.
+
+        Sent at once, also inside :meth:`batch`: a multi-path update cannot
+        remove ``points`` and write ``points/0`` together.
+        """
+
+        with self._lock:
+            self._pending = {
+                path: value
+                for path, value in self._pending.items()
+                if path != self.path and not path.startswith(self.path + "/")
+            }
+            self._queued_points = 0
+            self._pending[self.path] = None
+            self._next = 0
+            self.flush()
+
+    def flush(self) -> int:
+        """Send everything queued in one multi-path update; return its size."""
+
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending = self._pending
+            self.ref.update(pending)
+            self._pending = {}
+            self._queued_points = 0
+            return len(pending)
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator["PointPublisher"]:
+        """Group the appends and updates made inside into one update.
+
+        Batches may nest; the outermost one flushes on exit.
+        """
+
+        with self._lock:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.flush()
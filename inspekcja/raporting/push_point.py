@@ -1,89 +1,113 @@
+import argparse
+import atexit
+import datetime
 import os
 import sys
-import json
-import base64
-import argparse
-import firebase_admin
+import threading
+
 import cv2
-from firebase_admin import credentials, db, firestore
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.primitives import padding, hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.backends import default_backend
-import datetime
+
+if not __package__:
+    # Uruchomiony jako skrypt (python inspekcja/raporting/push_point.py):
+    # importy względne wymagają pakietu raporting (PEP 366)
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    __package__ = 'raporting'
+
+from . import backends
+from .journal import ReportJournal
+from .publisher import PointPublisher
+from .thumbnails import thumbnail
 
 # Klucz szyfrowania (w produkcji powinien być bezpiecznie przechowywany)
 KEY_PASSWORD = b'testowehaslo'
 SALT = b'firebase_salt_1234'
-backend = default_backend()
+KEY_FILE = os.path.join(os.path.dirname(__file__), 'firebase_key.json.enc')
+JOURNAL_PATH = os.path.join(os.path.dirname(__file__), 'report_journal.sqlite3')
+JOURNAL_ENV = 'RAPORTING_JOURNAL'
 
 def derive_key(password, salt):
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-        backend=backend
-    )
-    return kdf.derive(password)
+    """Klucz z hasła (PBKDF2), liczony raz na proces."""
+    return backends.derive_key(password, salt)
 
 def decrypt_file_to_bytes(input_path, password, salt):
-    key = derive_key(password, salt)
-    with open(input_path, 'rb') as f:
-        iv = f.read(16)
-        ct = f.read()
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=backend)
-    decryptor = cipher.decryptor()
-    padded_data = decryptor.update(ct) + decryptor.finalize()
-    unpadder = padding.PKCS7(128).unpadder()
-    data = unpadder.update(padded_data) + unpadder.finalize()
-    return data
+    return backends.decrypt_file_to_bytes(input_path, backends.load_key(password, salt))
 
 def decrypt_config(encrypted_file):
     """Odszyfrowuje plik konfiguracyjny."""
-    return json.loads(decrypt_file_to_bytes(encrypted_file, KEY_PASSWORD, SALT).decode("utf-8"))
+    return backends.decrypt_config(encrypted_file, KEY_PASSWORD, SALT)
+
+# Raportowanie startuje przy pierwszym użyciu, nie przy imporcie
+_journal = None
+_journal_lock = threading.RLock()
+
+def configure(backend=None, reference=None, journal_path=None):
+    """Wybiera backend raportowania i uruchamia dziennik.
+
+    ``backend`` to ``firebase``, ``memory`` albo ``offline`` (domyślnie
+    ``RAPORTING_BACKEND`` lub ``firebase``); ``reference`` podaje własną
+    referencję bazy zamiast backendu. Firebase inicjalizuje się dopiero przy
+    pierwszej wysyłce, w wątku w tle; przy ``offline`` wpisy czekają w
+    dzienniku na następne uruchomienie z bazą.
+    """
+    global _journal
+    with _journal_lock:
+        if _journal is not None:
+            _journal.close()
+        backend = backend or os.environ.get(backends.BACKEND_ENV, 'firebase')
+        if reference is None:
+            reference = backends.open_backend(backend, KEY_FILE, KEY_PASSWORD, SALT)
+        if journal_path is None:
+            # Lokalny backend w pamięci nie potrzebuje trwałego dziennika
+            default = ':memory:' if backend == 'memory' else JOURNAL_PATH
+            journal_path = os.environ.get(JOURNAL_ENV, default)
+        _journal = ReportJournal(journal_path, PointPublisher(reference))
+        if reference is not None:
+            _journal.start()
+        return _journal
+
+def journal():
+    """Dziennik raportów, tworzony przy pierwszym użyciu."""
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                configure()
+    return _journal
 
 def image_to_base64(image_path):
-    """Konwertuje plik obrazu na base64 z kompresją do 64x64 px."""
-    # Wczytaj obraz
+    """Konwertuje plik obrazu na base64 z kompresją do 128x128 px."""
     image = cv2.imread(image_path)
     if image is None:
         raise ValueError(f"Nie można wczytać obrazu: {image_path}")
-    
-    # Zmień rozmiar do 64x64 px (mały rozmiar dla Firebase)
-    resized_image = cv2.resize(image, (128, 128))
-    
-    # Kompresuj jako JPEG z umiarkowaną kompresją (jakość = 65)
-    encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 65]
-    success, encoded_img = cv2.imencode('.jpg', resized_image, encode_param)
-    
-    if not success:
-        raise ValueError("Nie można skompresować obrazu")
-    
-    # Konwertuj na base64
-    return base64.b64encode(encoded_img.tobytes()).decode('utf-8')
+    return thumbnail(image)
 
 def push_point_to_db(point_dict):
-    """Dodaje punkt do bazy Firebase i ustawia generate na true."""
-    # Pobierz referencję do bazy
-    ref = db.reference('/')
-    
-    # Pobierz aktualne punkty
-    data = ref.get()
-    points = data.get('points', []) if data else []
-    
-    # Dodaj nowy punkt
-    points.append(point_dict)
-    ref.update({'points': points})
+    """Zapisuje punkt w lokalnym dzienniku; wątek w tle dopisze go pod points/<n>."""
+    journal().record_point(point_dict)
 
 def clear_points():
-    ref = db.reference('/')
-    ref.update({'points': []})
+    journal().record_clear()
 
 def generate_points():
-    ref = db.reference('/')
-    ref.update({'generate': True})
+    journal().record_update({'generate': True})
+
+def batch():
+    """Grupuje wysyłki wewnątrz bloku ``with`` w jedną aktualizację bazy."""
+    return journal().batch()
+
+def backlog():
+    """Stan dziennika: liczba niewysłanych wpisów, wiek najstarszego, błędy."""
+    return journal().stats()
+
+def close(timeout=10.0):
+    """Wysyła zaległe wpisy przez najwyżej ``timeout`` s; resztę wyśle następne uruchomienie."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            return 0
+        remaining, _journal = _journal.close(timeout), None
+        return remaining
+
+atexit.register(close)
 
 DETECTION_LABEL_MAP = {
     "pipe": "pipe",
@@ -94,8 +118,13 @@ DETECTION_LABEL_MAP = {
     "car": "car"
 }
 
-def push_detection_to_firebase(detection, gps_coords, image_path=None):
-    """Wysyła detekcję do Firebase za pomocą push_point.py."""
+def push_detection_to_firebase(detection, gps_coords, image_path=None, crop=None, image_b64=None):
+    """Wysyła detekcję do Firebase.
+
+    Miniaturę można podać gotową (``image_b64``, np. z ``ThumbnailPool``),
+    jako wycinek w pamięci (``crop``: tablica BGR albo zakodowane bajty)
+    lub jako ścieżkę do pliku (``image_path``).
+    """
     label = detection["label"]
     firebase_type = DETECTION_LABEL_MAP.get(label, label)  # domyślnie infrastructure
     point_dict = {
@@ -104,21 +133,23 @@ def push_detection_to_firebase(detection, gps_coords, image_path=None):
         'detection_time': datetime.datetime.now().isoformat(),
         'description': detection.get('description', f'Wykryto obiekt typu {label}')
     }
-    if image_path:
+    if image_b64 is None and (crop is not None or image_path):
         try:
-            image_b64 = image_to_base64(image_path)
-            print(f"Skompresowany obraz base64 length: {len(image_b64)}")
-            point_dict['image'] = image_b64
+            image_b64 = thumbnail(crop) if crop is not None else image_to_base64(image_path)
         except Exception as e:
             print(f"Błąd kompresji obrazu: {e}")
             # Kontynuuj bez obrazu
+    if image_b64:
+        print(f"Skompresowany obraz base64 length: {len(image_b64)}")
+        point_dict['image'] = image_b64
     push_point_to_db(point_dict)
 
 def answer(tekst):
-    ref = db.reference('/')
-    # Pobierz aktualne punkty
-    data = ref.get()
-    ref.update({'answer': tekst})
+    journal().record_update({'answer': tekst})
+
+def answer_missing(label, tekst):
+    """Zapisuje informację o brakujących obiektach danego typu."""
+    journal().record_update({f'missing/{DETECTION_LABEL_MAP.get(label, label)}': tekst})
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Dodaj punkt do bazy Firebase.')
@@ -138,10 +169,3 @@ if __name__ == '__main__':
         point_dict['image'] = image_to_base64(args.image)
     
     push_point_to_db(point_dict)
-
-# Inicjalizacja Firebase przy starcie skryptu
-config = decrypt_config(os.path.join(os.path.dirname(__file__), 'firebase_key.json.enc'))
-cred = credentials.Certificate(config)
-firebase_admin.initialize_app(cred, {
-    'databaseURL': 'https://droniada-2025-default-rtdb.europe-west1.firebasedatabase.app'
-})
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""In-memory thumbnails of detection crops for the Firebase reports.
+
+Every reported detection carries a small JPEG of its crop, base64 encoded.
+:func:`thumbnail` makes it straight from the crop in memory, either a BGR
+array (a slice of the captured frame) or encoded image bytes, instead of
+writing the crop to disk and reading it back.
+
+:class:`ThumbnailPool` makes the thumbnails of all detections of a frame at
+once on a worker pool; OpenCV releases the GIL while resizing and encoding,
+so the crops are processed in parallel. Writing the crops to the mission
+log is optional and happens in the background::
+
+    with ThumbnailPool() as pool:
+        crops = crop_boxes(image, boxes)
+        for crop, image_b64 in zip(crops, pool.thumbnails(crops)):
+            pool.save(os.path.join(crops_folder, "pipe.png"), crop)
+"""
+
+import base64
+import os
+from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+THUMBNAIL_SIZE = (128, 128)
+JPEG_QUALITY = 65
+
+Crop = np.ndarray | bytes
+
+
+def decode_crop(crop: Crop) -> np.ndarray:
+    """Return ``crop`` as a BGR array, decoding encoded image bytes."""
+
+    if isinstance(crop, np.ndarray):
+        image = crop
+    else:
+        image = cv2.imdecode(np.frombuffer(crop, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Cannot decode the crop")
+    if image.size == 0:
+        raise ValueError("Empty crop")
+    return image
+
+
+def thumbnail(
+    crop: Crop, size: tuple[int, int] = THUMBNAIL_SIZE, quality: int = JPEG_QUALITY
+) -> str:
+    """Return the base64 encoded JPEG thumbnail of ``crop``.
+
+    Args:
+        crop: BGR array or encoded image bytes.
+        size: Thumbnail ``(width, height)`` in pixels.
+        quality: JPEG quality, 0-100.
+    """
+
+    resized = cv2.resize(decode_crop(crop), size)
+    success, encoded = cv2.imencode(
+        ".jpg", resized, [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+    )
+    if not success:
+        raise ValueError("Cannot encode the thumbnail")
+    return base64.b64encode(encoded.tobytes()).decode("ascii")
+
+
+def crop_boxes(
+    image: np.ndarray, boxes: Sequence[tuple[int, int, int, int]]
+) -> list[np.ndarray]:
+    """Return views of ``image`` inside pixel ``(x, y, width, height)`` boxes.
+
+    Boxes are clipped to the image, so a box partly outside the frame gives
+    the visible part and a box fully outside gives an empty array.
+    """
+
+    height, width = image.shape[:2]
+    crops = []
+    for x, y, w, h in boxes:
+        x0, y0 = min(max(x, 0), width), min(max(y, 0), height)
+        x1, y1 = min(max(x + w, x0), width), min(max(y + h, y0), height)
+        crops.append(image[y0:y1, x0:x1])
+    return crops
+
+
+def _write(path: str, crop: Crop) -> None:
+    if isinstance(crop, np.ndarray):
+        if not cv2.imwrite(path, crop):
+            raise OSError(f"Cannot write {path}")
+    else:
+        with open(path, "wb") as file:
+            file.write(crop)
+
+
+class ThumbnailPool:
+    """Worker pool making thumbnails in batches and writing crops in the background.
+
+    Args:
+        max_workers: Worker threads shared by thumbnails and disk writes;
+            by default one per CPU, at most 4. With one worker, thumbnails
+            are made in the calling thread.
+        size: Thumbnail ``(width, height)`` in pixels.
+        quality: JPEG quality of the thumbnails.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        size: tuple[int, int] = THUMBNAIL_SIZE,
+        quality: int = JPEG_QUALITY,
+    ) -> None:
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.size = size
+        self.quality = quality
+        self._executor = ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix="thumbnail"
+        )
+        self._writes: list[Future] = []
+
+    def __enter__(self) -> "ThumbnailPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _thumbnail(self, crop: Crop) -> str | None:
+        try:
+            return thumbnail(crop, self.size, self.quality)
+        except (ValueError, cv2.error) as e:
+            print(f"Błąd kompresji obrazu: {e}")
+            return None
+
+    def thumbnails(self, crops: Sequence[Crop]) -> list[str | None]:
+        """Return the thumbnails of ``crops`` in order, made in parallel.
+
+        A crop that cannot be decoded or is empty gives ``None``, so the
+        detection can still be reported without an image.
+        """
+
+        if len(crops) < 2 or self.max_workers == 1:
+            return [self._thumbnail(crop) for crop in crops]
+        return list(self._executor.map(self._thumbnail, crops))
+
+    def save(self, path: str, crop: Crop) -> Future:
+        """Write ``crop`` to ``path`` in the background.
+
+        Arrays are copied first, so the caller may reuse the frame at once.
+        Errors are raised by the returned future and by :meth:`flush`.
+        """
+
+        if isinstance(crop, np.ndarray):
+            crop = crop.copy()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        future = self._executor.submit(_write, path, crop)
+        self._writes.append(future)
+        return future
+
+    def flush(self) -> None:
+        """Wait for all pending writes and raise the first error."""
+
+        writes, self._writes = self._writes, []
+        for future in writes:
+            future.result()
+
+    def close(self) -> None:
+        """Wait for pending writes and stop the workers."""
+
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
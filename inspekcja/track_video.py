@@ -0,0 +1,99 @@
+"""Live preview with boxes tracked between ``/multi-detect`` calls."""
+
+import asyncio
+import os
+import sys
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from jemdzem.client import JemdzemClient, JemdzemError
+from modules.capture import LatestFrameGrabber
+from modules.tracking import BoxTracker
+
+LABELS = ["pipe", "barrell", "palette"]
+DESCRIPTIONS = [
+    "find all orange pipes",
+    "find all blue barrells",
+    "find all wooden palettes",
+]
+COLORS = {"pipe": (0, 255, 0), "barrell": (255, 255, 0), "palette": (0, 255, 255)}
+
+
+async def detect(client, frame):
+    try:
+        return await client.multi_detect(frame, LABELS, DESCRIPTIONS)
+    except JemdzemError as error:
+        print(f"Detection failed: {error}")
+        return []
+
+
+def draw(frame, tracks, detection_fraction):
+    for track in tracks:
+        x, y, width, height = track.box
+        x, width = int(x * frame.shape[1]), int(width * frame.shape[1])
+        y, height = int(y * frame.shape[0]), int(height * frame.shape[0])
+        color = COLORS.get(track.label, (255, 255, 255))
+        cv2.rectangle(frame, (x, y), (x + width, y + height), color, 2)
+        cv2.putText(
+            frame,
+            f"{track.label} #{track.track_id} {track.confidence:.0%}",
+            (x, y - 5),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            color,
+            2,
+        )
+    cv2.putText(
+        frame,
+        f"model calls {detection_fraction:.1%} of frames",
+        (10, 30),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.8,
+        (0, 255, 0),
+        2,
+    )
+
+
+async def main(stream_url):
+    # Model co 30 klatek albo gdy śledzenie traci pewność. Detekcja działa w tle,
+    # a w tym czasie śledzimy kolejne klatki; wynik doganiamy do bieżącej klatki.
+    tracker = BoxTracker(max_age=30)
+    pending = None
+    async with JemdzemClient(max_concurrency=1) as client:
+        with LatestFrameGrabber(stream_url, pace=os.path.isfile(stream_url)) as grabber:
+            try:
+                while True:
+                    try:
+                        frame, _ = await asyncio.to_thread(grabber.read, timeout=5.0)
+                    except TimeoutError:
+                        print("Failed to grab frame.")
+                        break
+
+                    if pending is None and tracker.needs_detection:
+                        detected_frame = frame.copy()
+                        pending = asyncio.create_task(detect(client, detected_frame))
+
+                    if pending is not None and pending.done():
+                        tracks = tracker.seed(detected_frame, pending.result(), frame)
+                        pending = None
+                    elif tracker.detections:
+                        tracks = tracker.update(frame)
+                    else:
+                        tracks = []
+
+                    draw(frame, tracks, tracker.detection_fraction)
+                    cv2.imshow("Tracking", frame)
+                    if cv2.waitKey(1) & 0xFF == ord("q"):
+                        break
+            finally:
+                if pending is not None:
+                    pending.cancel()
+
+
+if __name__ == "__main__":
+    # Adres strumienia lub plik wideo do testów offline
+    stream_url = sys.argv[1] if len(sys.argv) > 1 else "rtsp://192.168.241.1/live"
+
+    asyncio.run(main(stream_url))
+    cv2.destroyAllWindows()
@@ -58,6 +58,32 @@ class GeminiMultiDetector:
     ) -> list[dict]:
         """Return detections for ``image`` for each ``label``/``description`` pair."""
 
+        resp = client.models.generate_content(
+            model=model_name,
+            contents=self._contents(image, labels, descriptions),
+            config=types.GenerateContentConfig(response_mime_type="text/plain"),
+        )
+        return self._parse(resp)
+
+    async def adetect(
+        self,
+        image: np.ndarray,
+        labels: list[str],
+        descriptions: list[str],
+        model_name: str,
+    ) -> list[dict]:
+        """Asynchronous variant of :meth:`detect` that can be cancelled."""
+
+        resp = await client.aio.models.generate_content(
+            model=model_name,
+            contents=self._contents(image, labels, descriptions),
+            config=types.GenerateContentConfig(response_mime_type="text/plain"),
+        )
+        return self._parse(resp)
+
+    def _contents(
+        self, image: np.ndarray, labels: list[str], descriptions: list[str]
+    ) -> list[types.Content]:
         prompt = PROMPT.replace(
             "{{OBJECTS}}",
             "\n".join(
@@ -66,19 +92,14 @@ class GeminiMultiDetector:
             ),
         )
 
-        contents = [
+        return [
             types.Content(
                 role="user",
                 parts=[image_to_part(image), types.Part.from_text(text=prompt)],
             ),
         ]
 
-        resp = client.models.generate_content(
-            model=model_name,
-            contents=contents,
-            config=types.GenerateContentConfig(response_mime_type="text/plain"),
-        )
-
+    def _parse(self, resp: types.GenerateContentResponse) -> list[dict]:
         boxes = json.loads(resp.text.removeprefix("```json").removesuffix("```"))
         return [
             {"label": box["label"], **box_to_relative(box["box_2d"])} for box in boxes
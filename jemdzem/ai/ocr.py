@@ -32,16 +32,30 @@ class GeminiOCR:
     def ocr(self, image: np.ndarray) -> str:
         """Return recognized text from ``image``."""
 
-        contents = [
+        resp = client.models.generate_content(
+            model=self.model_name,
+            contents=self._contents(image),
+            config=types.GenerateContentConfig(response_mime_type="text/plain"),
+        )
+        return self._parse(resp)
+
+    async def aocr(self, image: np.ndarray) -> str:
+        """Asynchronous variant of :meth:`ocr` that can be cancelled."""
+
+        resp = await client.aio.models.generate_content(
+            model=self.model_name,
+            contents=self._contents(image),
+            config=types.GenerateContentConfig(response_mime_type="text/plain"),
+        )
+        return self._parse(resp)
+
+    def _contents(self, image: np.ndarray) -> list[types.Content]:
+        return [
             types.Content(
                 role="user",
                 parts=[image_to_part(image), types.Part.from_text(text=PROMPT)],
             )
         ]
 
-        resp = client.models.generate_content(
-            model=self.model_name,
-            contents=contents,
-            config=types.GenerateContentConfig(response_mime_type="text/plain"),
-        )
+    def _parse(self, resp: types.GenerateContentResponse) -> str:
         return json.loads(resp.text.removeprefix("```json").removesuffix("```"))["text"]
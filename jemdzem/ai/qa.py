@@ -16,7 +16,25 @@ class GeminiQA:
     def answer(self, image: np.ndarray, question: str, model_name: str) -> str:
         """Return a short answer to ``question`` about ``image``."""
 
-        contents = [
+        resp = client.models.generate_content(
+            model=model_name,
+            contents=self._contents(image, question),
+            config=types.GenerateContentConfig(response_mime_type="text/plain"),
+        )
+        return resp.text.strip()
+
+    async def aanswer(self, image: np.ndarray, question: str, model_name: str) -> str:
+        """Asynchronous variant of :meth:`answer` that can be cancelled."""
+
+        resp = await client.aio.models.generate_content(
+            model=model_name,
+            contents=self._contents(image, question),
+            config=types.GenerateContentConfig(response_mime_type="text/plain"),
+        )
+        return resp.text.strip()
+
+    def _contents(self, image: np.ndarray, question: str) -> list[types.Content]:
+        return [
             types.Content(
                 role="user",
                 parts=[
@@ -25,10 +43,3 @@ class GeminiQA:
                 ],
             ),
         ]
-
-        resp = client.models.generate_content(
-            model=model_name,
-            contents=contents,
-            config=types.GenerateContentConfig(response_mime_type="text/plain"),
-        )
-        return resp.text.strip()
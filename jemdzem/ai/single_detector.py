@@ -55,6 +55,37 @@ class GeminiSingleDetector:
     ) -> list[dict]:
         """Return bounding boxes for ``label`` within ``image``."""
 
+        resp = client.models.generate_content(
+            model=model_name,
+            contents=self._contents(image, label, description, ref_image),
+            config=types.GenerateContentConfig(response_mime_type="text/plain"),
+        )
+        return self._parse(resp)
+
+    async def adetect(
+        self,
+        image: np.ndarray,
+        label: str,
+        description: str,
+        model_name: str,
+        ref_image: np.ndarray | None = None,
+    ) -> list[dict]:
+        """Asynchronous variant of :meth:`detect` that can be cancelled."""
+
+        resp = await client.aio.models.generate_content(
+            model=model_name,
+            contents=self._contents(image, label, description, ref_image),
+            config=types.GenerateContentConfig(response_mime_type="text/plain"),
+        )
+        return self._parse(resp)
+
+    def _contents(
+        self,
+        image: np.ndarray,
+        label: str,
+        description: str,
+        ref_image: np.ndarray | None,
+    ) -> list[types.Content]:
         prompt = (
             PROMPT.replace("{{TARGET_OBJECT}}", label)
             .replace("{{OBJECT_DESCRIPTION}}", description)
@@ -76,11 +107,8 @@ class GeminiSingleDetector:
         if ref_image is not None:
             contents[0].parts.insert(0, image_to_part(ref_image))
 
-        resp = client.models.generate_content(
-            model=model_name,
-            contents=contents,
-            config=types.GenerateContentConfig(response_mime_type="text/plain"),
-        )
+        return contents
 
+    def _parse(self, resp: types.GenerateContentResponse) -> list[dict]:
         boxes = json.loads(resp.text.removeprefix("```json").removesuffix("```"))
         return [box_to_relative(box["box_2d"]) for box in boxes]
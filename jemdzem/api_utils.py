@@ -1,14 +1,206 @@
 """Helpers for FastAPI handlers."""
 
-from fastapi import UploadFile
-import numpy as np
+import io
+import struct
+from collections.abc import Sequence
+
 import cv2
+import numpy as np
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from . import config
+from .memory_budget import BudgetExceeded, MemoryLease
+
+# ``cv2.imdecode`` flags decoding at 1/1, 1/2, 1/4 and 1/8 of the resolution.
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers carrying the image size (all SOFn but DHT,
+# JPG and DAC, which share the same range).
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(data: np.ndarray) -> tuple[int, int] | None:
+    """Return ``(width, height)`` read from a PNG or JPEG header, if possible."""
+
+    header = data[:32].tobytes()
+    if header.startswith(_PNG_SIGNATURE) and len(header) >= 24:
+        return struct.unpack(">II", header[16:24])
+    if not header.startswith(b"\xff\xd8"):
+        return None
+
+    buf = memoryview(data)
+    pos = 2
+    while pos + 9 < len(buf):
+        if buf[pos] != 0xFF:
+            return None
+        marker = buf[pos + 1]
+        if marker == 0xFF:
+            # Fill byte before the actual marker.
+            pos += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", buf[pos + 5 : pos + 9])
+            return width, height
+        (length,) = struct.unpack(">H", buf[pos + 2 : pos + 4])
+        pos += 2 + length
+    return None
+
+
+def reduction_factor(width: int, height: int, max_side: int) -> int:
+    """Return the largest supported reduction keeping the longest side ``>= max_side``.
+
+    A ``max_side`` of ``0`` disables reduced decoding.
+    """
+
+    factor = 1
+    if max_side <= 0:
+        return factor
+    while factor < 8 and max(width, height) // (factor * 2) >= max_side:
+        factor *= 2
+    return factor
+
+
+def decoded_bytes(size: tuple[int, int], factor: int, jpeg: bool) -> int:
+    """Return the peak memory of decoding an image of ``size`` at ``1 / factor``.
+
+    Only JPEG is decoded directly at the reduced size. Other formats are
+    decoded at full resolution and then shrunk, so they count at full size.
+    """
+
+    if not jpeg:
+        factor = 1
+    width, height = (-(-side // factor) for side in size)
+    return width * height * 3
+
+
+async def decode_images(
+    images: Sequence[np.ndarray],
+    lease: MemoryLease | None = None,
+    max_side: int = config.DECODE_MAX_SIDE,
+) -> list[np.ndarray]:
+    """Decode all encoded images of one request with a single reservation.
 
+    The decoded sizes of all images are reserved from ``lease`` at once, so a
+    request never holds part of its memory while it waits for the rest, which
+    could deadlock concurrent requests. The size of formats without a known
+    header (WebP, TIFF, BMP, ...) is only known after decoding them, so such
+    requests hold the whole budget while they decode and then give back what
+    the images did not take. Requests whose images turn out larger than the
+    whole budget are rejected with ``413``.
 
-async def image_from_upload_file(file: UploadFile) -> np.ndarray:
-    """Read an uploaded file into an OpenCV ``ndarray``."""
+    When ``max_side`` is set, images are decoded at 1/2, 1/4 or 1/8 of their
+    resolution as long as the longest side stays at or above ``max_side``.
+    JPEG images are then decoded directly at the reduced size.
+    """
 
-    contents = await file.read()
-    nparr = np.frombuffer(contents, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    sizes = [image_size(data) for data in images]
+    factors = [
+        1 if size is None else reduction_factor(*size, max_side) for size in sizes
+    ]
+    estimate = sum(
+        decoded_bytes(size, factor, data[:2].tobytes() == b"\xff\xd8")
+        for data, size, factor in zip(images, sizes, factors)
+        if size is not None
+    )
+    headerless = None in sizes
+    if lease is not None:
+        await _reserve(lease, lease.budget.limit_bytes if headerless else estimate)
+    decoded = [await _decode(data, factor) for data, factor in zip(images, factors)]
+    if lease is not None and headerless:
+        used = estimate + sum(
+            image.nbytes for image, size in zip(decoded, sizes) if size is None
+        )
+        if used > lease.budget.limit_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Images need {used} bytes, budget is "
+                f"{lease.budget.limit_bytes} bytes",
+            )
+        await lease.release(lease.budget.limit_bytes - used)
+    return decoded
+
+
+async def decode_image(
+    data: np.ndarray,
+    lease: MemoryLease | None = None,
+    max_side: int = config.DECODE_MAX_SIDE,
+) -> np.ndarray:
+    """Decode encoded image bytes, reserving the decoded size from ``lease``.
+
+    See :func:`decode_images`; requests with several images must decode them
+    together with it.
+    """
+
+    (image,) = await decode_images([data], lease, max_side)
+    return image
+
+
+async def _decode(data: np.ndarray, factor: int) -> np.ndarray:
+    image = await run_in_threadpool(cv2.imdecode, data, REDUCED_DECODE_FLAGS[factor])
+    if image is None:
+        raise HTTPException(status_code=400, detail="Could not decode image")
     return image
+
+
+async def _reserve(lease: MemoryLease, nbytes: int) -> None:
+    try:
+        await lease.reserve(nbytes)
+    except BudgetExceeded as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": "1"}
+        ) from None
+
+
+def _spooled_array(file: UploadFile) -> np.ndarray:
+    """Return the upload contents as an array backed by the spooled file.
+
+    Small uploads live in an in-memory ``BytesIO``; larger ones are rolled over
+    to a temporary file, which is memory-mapped instead of read into memory.
+    """
+
+    raw = getattr(file.file, "_file", file.file)
+    if isinstance(raw, io.BytesIO):
+        return np.frombuffer(raw.getvalue(), np.uint8)
+    raw.flush()
+    return np.memmap(raw, dtype=np.uint8, mode="r")
+
+
+def encoded_from_upload_file(
+    file: UploadFile, max_size: int = config.MAX_UPLOAD_BYTES
+) -> np.ndarray:
+    """Return the encoded bytes of an upload, rejecting oversized files with ``413``."""
+
+    size = file.size
+    if size is None:
+        size = file.file.seek(0, io.SEEK_END)
+    if size > max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload {file.filename!r} exceeds {max_size} bytes",
+        )
+    if size == 0:
+        raise HTTPException(
+            status_code=400, detail=f"Upload {file.filename!r} is empty"
+        )
+    return _spooled_array(file)
+
+
+async def image_from_upload_file(
+    file: UploadFile,
+    lease: MemoryLease | None = None,
+    max_size: int = config.MAX_UPLOAD_BYTES,
+) -> np.ndarray:
+    """Read an uploaded file into an OpenCV ``ndarray``.
+
+    Uploads larger than ``max_size`` bytes are rejected with ``413``. The
+    spooled file is decoded in place, without reading it into a new buffer.
+    """
+
+    return await decode_image(encoded_from_upload_file(file, max_size), lease)
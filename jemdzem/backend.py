@@ -1,32 +1,154 @@
 """REST API exposing OCR and object detection endpoints."""
 
-from fastapi import FastAPI, Depends, File, UploadFile, Form
-from fastapi.responses import JSONResponse
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import Annotated, TypeVar
+
 import uvicorn
-import json
-import os
-import numpy as np
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 
-from .auth import get_api_key
-from .api_utils import image_from_upload_file
-from .ai.ocr import GeminiOCR
+from . import config
 from .ai.multi_detector import GeminiMultiDetector
-from .ai.single_detector import GeminiSingleDetector
+from .ai.ocr import GeminiOCR
 from .ai.qa import GeminiQA
-
+from .ai.single_detector import GeminiSingleDetector
+from .auth import get_api_key
+from .cancellation import Deadline, RequestCancelled, get_deadline, run_cancellable
+from .memory_budget import MemoryBudget, MemoryLease
+from .metrics import metrics
+from .near_duplicate import NearDuplicateCache, image_hashes, request_key
+from .request_formats import ImageRequest, parse_image_request
+from .responses import detections_response
+from .scheduler import PriorityScheduler, get_priority
 
 app = FastAPI(title="Zawsze lubiłem dżem", dependencies=[Depends(get_api_key)])
 
 
+@app.exception_handler(RequestCancelled)
+async def request_cancelled_handler(request: Request, exc: RequestCancelled):
+    """Report abandoned requests with 504 (deadline) or 499 (client gone)."""
+    status_code = 504 if exc.reason == "deadline" else 499
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+
+scheduler = PriorityScheduler(
+    max_concurrency=config.MAX_CONCURRENCY,
+    class_limits={"routine": config.MAX_ROUTINE_IN_FLIGHT},
+    policy=config.SCHEDULER_POLICY,
+    weights=config.PRIORITY_WEIGHTS,
+)
+
+decode_budget = MemoryBudget(
+    config.DECODE_BUDGET_BYTES, timeout=config.DECODE_QUEUE_TIMEOUT
+)
+
+near_duplicates = NearDuplicateCache(
+    config.NEAR_DUPLICATE_DISTANCE,
+    ttl=config.NEAR_DUPLICATE_TTL,
+    max_entries=config.NEAR_DUPLICATE_ENTRIES,
+)
+
+T = TypeVar("T")
+
+
+@dataclass
+class CallContext:
+    """Per-request deadline and scheduling information for model calls."""
+
+    request: Request
+    deadline: Deadline
+    priority: str
+    api_key: str
+
+    async def run(self, fn: Callable[..., Awaitable[T]], *args) -> T:
+        """Run ``fn(*args)`` in a scheduler slot, cancelling it when abandoned."""
+        return await run_cancellable(
+            self.request,
+            self.deadline,
+            scheduler.run(self.priority, self.api_key, fn, *args),
+            self.request.url.path,
+        )
+
+
+async def run_or_reuse(
+    ctx: CallContext,
+    payload: ImageRequest,
+    model_name: str,
+    fn: Callable[..., Awaitable[T]],
+    *args,
+) -> tuple[T, bool]:
+    """Run ``fn(*args)`` unless a near-duplicate image was just answered.
+
+    Returns the result and whether it was reused. Results are only shared
+    between requests with the same API key and never reused for the
+    ``emergency`` class. Clients can opt out with ``Cache-Control: no-cache``.
+    """
+    endpoint = ctx.request.url.path
+    if (
+        not near_duplicates.enabled
+        or ctx.priority == "emergency"
+        or "no-cache" in ctx.request.headers.get("cache-control", "")
+    ):
+        return await ctx.run(fn, *args), False
+
+    key = request_key(endpoint, model_name, payload.params, payload.refs, ctx.api_key)
+    hashes = image_hashes(payload.image)
+    hit, result = near_duplicates.lookup(key, hashes, endpoint)
+    if hit:
+        return result, True
+    result = await ctx.run(fn, *args)
+    near_duplicates.store(key, hashes, result)
+    return result, False
+
+
+def reuse_header(response: Response, reused: bool) -> Response:
+    response.headers["X-Near-Duplicate"] = "hit" if reused else "miss"
+    return response
+
+
+def get_call_context(
+    request: Request,
+    deadline: Annotated[Deadline, Depends(get_deadline)],
+    priority: Annotated[str, Depends(get_priority)],
+    api_key: Annotated[str, Depends(get_api_key)],
+) -> CallContext:
+    return CallContext(request, deadline, priority, api_key)
+
+
+async def get_decode_lease() -> AsyncIterator[MemoryLease]:
+    """Hold the decode memory of one request until the request is finished."""
+    async with decode_budget.lease() as lease:
+        yield lease
+
+
+async def get_image_request(
+    request: Request, lease: Annotated[MemoryLease, Depends(get_decode_lease)]
+) -> ImageRequest:
+    """Parse the request body in any format of ``request_formats``."""
+    return await parse_image_request(request, lease)
+
+
+@app.get("/metrics")
+async def api_metrics():
+    """Return request counters and timings collected by this process."""
+    return JSONResponse(
+        content=metrics.snapshot()
+        | {"scheduler": scheduler.stats(), "near_duplicate": near_duplicates.stats()}
+    )
+
+
 gemini_ocr = GeminiOCR()
 
 
 @app.post("/ocr")
-async def api_ocr(file: UploadFile = File(...)):
+async def api_ocr(
+    ctx: Annotated[CallContext, Depends(get_call_context)],
+    payload: Annotated[ImageRequest, Depends(get_image_request)],
+):
     """Return text extracted from the uploaded image."""
-    image = await image_from_upload_file(file)
-    text = gemini_ocr.ocr(image)
-    return JSONResponse(content={"text": text})
+    text, reused = await run_or_reuse(ctx, payload, "", gemini_ocr.aocr, payload.image)
+    return reuse_header(JSONResponse(content={"text": text}), reused)
 
 
 gemini_multi_detector = GeminiMultiDetector()
@@ -34,19 +156,22 @@ gemini_multi_detector = GeminiMultiDetector()
 
 @app.post("/multi-detect")
 async def api_multi_detect(
-    file: UploadFile = File(...),
-    labels: str = Form(...),
-    descriptions: str = Form(...),
+    ctx: Annotated[CallContext, Depends(get_call_context)],
+    payload: Annotated[ImageRequest, Depends(get_image_request)],
     model_name: str = "gemini-2.0-flash",
 ):
     """Detect multiple classes in ``file`` using ``GeminiMultiDetector``."""
-    image = await image_from_upload_file(file)
-    labels_list = json.loads(labels)
-    descriptions_list = json.loads(descriptions)
-    detections = gemini_multi_detector.detect(
-        image, labels_list, descriptions_list, model_name
+    detections, reused = await run_or_reuse(
+        ctx,
+        payload,
+        model_name,
+        gemini_multi_detector.adetect,
+        payload.image,
+        payload.param("labels"),
+        payload.param("descriptions"),
+        model_name,
     )
-    return JSONResponse(content=detections)
+    return reuse_header(detections_response(ctx.request, detections), reused)
 
 
 gemini_single_detector = GeminiSingleDetector()
@@ -56,10 +181,8 @@ gemini_qa = GeminiQA()
 
 @app.post("/single-detect")
 async def api_single_detect(
-    file: UploadFile = File(...),
-    ref_files: list[UploadFile] | None = File(None),
-    labels: str = Form(...),
-    descriptions: str = Form(...),
+    ctx: Annotated[CallContext, Depends(get_call_context)],
+    payload: Annotated[ImageRequest, Depends(get_image_request)],
     model_name: str = "gemini-2.0-flash",
 ):
     """Detect multiple classes using the single detector internally.
@@ -67,47 +190,53 @@ async def api_single_detect(
     The API mirrors ``/multi-detect`` but executes a separate single detector
     call for every provided label/description pair. Optional reference images can
     be supplied for individual classes by sending multiple ``ref_file`` form
-    fields. The reference image is matched to the label by comparing the file
-    name (without extension) with the class label.
+    fields (or the ``refs`` mapping of JSON/msgpack bodies). The reference
+    image is matched to the label by comparing the file name (without
+    extension) with the class label.
+
+    The per-label calls share one scheduler slot and run under the client's
+    deadline: once it expires or the client disconnects, the in-flight call is
+    cancelled and the remaining labels are skipped.
     """
 
-    image = await image_from_upload_file(file)
-    labels_list = json.loads(labels)
-    descriptions_list = json.loads(descriptions)
-
-    # Load reference images into a mapping {label: image}
-    ref_map: dict[str, np.ndarray] = {}
-    if ref_files:
-        for rfile in ref_files:
-            label_name, _ = os.path.splitext(rfile.filename)
-            # map each reference file to the label matching its filename
-            ref_map[label_name] = await image_from_upload_file(rfile)
-
-    results = []
-    for label, description in zip(labels_list, descriptions_list):
-        ref_image = ref_map.get(label)
-        detections = gemini_single_detector.detect(
-            image, label, description, model_name, ref_image
-        )
-        for det in detections:
-            det_with_label = det.copy()
-            det_with_label["label"] = label
-            results.append(det_with_label)
+    labels_list = payload.param("labels")
+    descriptions_list = payload.param("descriptions")
+
+    async def detect_all() -> list[dict]:
+        results = []
+        for label, description in zip(labels_list, descriptions_list):
+            ref_image = payload.refs.get(label)
+            detections = await gemini_single_detector.adetect(
+                payload.image, label, description, model_name, ref_image
+            )
+            for det in detections:
+                det_with_label = det.copy()
+                det_with_label["label"] = label
+                results.append(det_with_label)
+        return results
 
-    return JSONResponse(content=results)
+    results, reused = await run_or_reuse(ctx, payload, model_name, detect_all)
+    return reuse_header(detections_response(ctx.request, results), reused)
 
 
 @app.post("/qa")
 async def api_qa(
-    file: UploadFile = File(...),
-    question: str = Form(...),
+    ctx: Annotated[CallContext, Depends(get_call_context)],
+    payload: Annotated[ImageRequest, Depends(get_image_request)],
     model_name: str = "gemini-2.0-flash",
 ):
     """Answer ``question`` about ``file`` using ``GeminiQA``."""
 
-    image = await image_from_upload_file(file)
-    answer = gemini_qa.answer(image, question, model_name)
-    return JSONResponse(content={"answer": answer})
+    answer, reused = await run_or_reuse(
+        ctx,
+        payload,
+        model_name,
+        gemini_qa.aanswer,
+        payload.image,
+        payload.param("question"),
+        model_name,
+    )
+    return reuse_header(JSONResponse(content={"answer": answer}), reused)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""Client deadlines and disconnect detection for long running requests.
+
+Clients may send an ``X-Request-Timeout`` header with the number of seconds
+they are willing to wait. Model calls are wrapped with
+:func:`run_cancellable`, which cancels the outstanding work as soon as the
+deadline passes or the client goes away, so that no further Gemini calls are
+made for a response nobody will read.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import Awaitable
+from typing import Protocol, TypeVar
+
+from fastapi import Header, HTTPException
+
+from .metrics import metrics
+
+DEADLINE_HEADER = "X-Request-Timeout"
+DISCONNECT_POLL_INTERVAL = 0.1
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """Point in time after which the result can no longer be delivered."""
+
+    def __init__(self, timeout: float | None = None) -> None:
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+
+    def remaining(self) -> float | None:
+        """Return the seconds left, ``0`` once expired, or ``None`` if unbounded."""
+
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+
+class RequestCancelled(Exception):
+    """Raised when a request is abandoned before its result is ready.
+
+    ``reason`` is either ``"deadline"`` or ``"disconnect"``.
+    """
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Request cancelled: {reason}")
+        self.reason = reason
+
+
+class _DisconnectAware(Protocol):
+    async def is_disconnected(self) -> bool: ...
+
+
+def get_deadline(
+    x_request_timeout: float | None = Header(None, alias=DEADLINE_HEADER),
+) -> Deadline:
+    """FastAPI dependency returning the deadline requested by the client."""
+
+    if x_request_timeout is not None and x_request_timeout <= 0:
+        raise HTTPException(
+            status_code=400, detail=f"{DEADLINE_HEADER} must be positive"
+        )
+    return Deadline(x_request_timeout)
+
+
+async def _wait_for_disconnect(request: _DisconnectAware, interval: float) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(interval)
+
+
+async def run_cancellable(
+    request: _DisconnectAware,
+    deadline: Deadline,
+    work: Awaitable[T],
+    endpoint: str = "",
+    poll_interval: float = DISCONNECT_POLL_INTERVAL,
+) -> T:
+    """Await ``work`` unless the deadline passes or the client disconnects first.
+
+    On cancellation the task running ``work`` is cancelled (which aborts the
+    in-flight Gemini request and any remaining fan-out), the event is counted
+    in ``requests_cancelled`` and :class:`RequestCancelled` is raised.
+    """
+
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request, poll_interval))
+    try:
+        done, _ = await asyncio.wait(
+            {task, watcher},
+            timeout=deadline.remaining(),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if task in done:
+            return task.result()
+        reason = "disconnect" if watcher in done else "deadline"
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    metrics.increment("requests_cancelled", reason=reason, endpoint=endpoint)
+    raise RequestCancelled(reason)
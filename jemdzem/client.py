@@ -0,0 +1,317 @@
+"""Asynchronous client of the Jem Dżem API.
+
+:class:`JemdzemClient` keeps one pooled keep-alive ``httpx.AsyncClient`` for
+all calls, so frames of a mission reuse the same connections instead of
+opening one per request. Calls may be submitted concurrently; at most
+``max_concurrency`` of them are in flight at once, the others wait on the
+client side. Connection errors and overload responses (``429``, ``502``,
+``503``) are retried with exponential backoff, and every call records a
+:class:`CallTiming`::
+
+    async with JemdzemClient() as client:
+        detections, answer = await asyncio.gather(
+            client.multi_detect(image, ["pipe"], ["find orange pipes"]),
+            client.qa(image, "Are there yellow graffiti?"),
+        )
+
+Images are ``numpy`` arrays (PNG encoded off the event loop), already
+encoded bytes or file paths. The server, API key and model default to the
+``JEMDZEM_URL``, ``JEMDZEM_API_KEY`` and ``JEMDZEM_MODEL`` environment
+variables. Requires the ``httpx`` package (``jemdzem[client]``).
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import cv2
+import httpx
+import numpy as np
+
+DEFAULT_URL = os.environ.get("JEMDZEM_URL", "http://localhost:8000")
+DEFAULT_API_KEY = os.environ.get("JEMDZEM_API_KEY", "tym_razem_to_musi_poleciec")
+DEFAULT_MODEL = os.environ.get("JEMDZEM_MODEL", "gemini-2.5-flash-preview-04-17")
+RETRY_STATUS = frozenset({429, 502, 503})
+
+Image = np.ndarray | bytes | str
+
+
+class JemdzemError(Exception):
+    """The API answered with an error status."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class CallTiming:
+    """Timing of one API call.
+
+    ``queued`` is the time spent waiting for a free slot of the client's
+    concurrency cap and ``elapsed`` the time from the first attempt to the
+    final response, retries and backoff included.
+    """
+
+    endpoint: str
+    status_code: int | None
+    attempts: int
+    queued: float
+    elapsed: float
+    reused: bool = False
+
+
+def _encode(image: Image) -> bytes:
+    if isinstance(image, bytes):
+        return image
+    if isinstance(image, (str, os.PathLike)):
+        with open(image, "rb") as file:
+            return file.read()
+    ok, encoded = cv2.imencode(".png", image)
+    if not ok:
+        raise ValueError("Could not encode image")
+    return encoded.tobytes()
+
+
+async def encode_image(image: Image) -> bytes:
+    """Return the encoded bytes of ``image``; arrays are encoded in a thread."""
+
+    if isinstance(image, np.ndarray):
+        return await asyncio.to_thread(_encode, image)
+    return _encode(image)
+
+
+class JemdzemClient:
+    """Pooled asynchronous client with a concurrency cap and retries.
+
+    Args:
+        base_url: Address of the server.
+        api_key: Value of the ``X-API-Key`` header.
+        model_name: Model used when a call does not name one.
+        max_concurrency: Calls in flight at once; further calls wait.
+        retries: Extra attempts after a connection error or a ``429``,
+            ``502`` or ``503`` response.
+        backoff: First wait in seconds before a retry; doubled after every
+            attempt, with jitter, and replaced by ``Retry-After`` when the
+            server sends one.
+        max_backoff: Upper bound of the wait between attempts.
+        timeout: Seconds a single attempt may take.
+        priority: Default ``X-Priority`` of the calls, ``None`` for the
+            server default (``routine``).
+        transport: ``httpx`` transport, e.g. ``httpx.ASGITransport`` to call
+            an application in process.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_URL,
+        api_key: str = DEFAULT_API_KEY,
+        model_name: str = DEFAULT_MODEL,
+        max_concurrency: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        timeout: float = 120.0,
+        priority: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.model_name = model_name
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.priority = priority
+        self.timings: list[CallTiming] = []
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"X-API-Key": api_key},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "JemdzemClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    def _delay(self, attempt: int, response: httpx.Response | None) -> float:
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        delay = min(self.backoff * 2**attempt, self.max_backoff)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _post(
+        self,
+        endpoint: str,
+        files: list[tuple[str, tuple[str, bytes, str]]],
+        data: dict[str, str],
+        params: dict[str, str],
+        priority: str | None,
+        timeout: float | None,
+        no_cache: bool,
+    ) -> httpx.Response:
+        headers = {}
+        if priority or self.priority:
+            headers["X-Priority"] = priority or self.priority
+        if timeout is not None:
+            headers["X-Request-Timeout"] = str(timeout)
+        if no_cache:
+            headers["Cache-Control"] = "no-cache"
+
+        queued_at = time.perf_counter()
+        async with self._semaphore:
+            started = time.perf_counter()
+            response = None
+            attempt = 0
+            while True:
+                attempt += 1
+                error = None
+                try:
+                    response = await self._http.post(
+                        endpoint, files=files, data=data, params=params, headers=headers
+                    )
+                except httpx.TransportError as exc:
+                    error, response = exc, None
+                if attempt > self.retries or (
+                    error is None and response.status_code not in RETRY_STATUS
+                ):
+                    break
+                await asyncio.sleep(self._delay(attempt - 1, response))
+
+        self.timings.append(
+            CallTiming(
+                endpoint=endpoint,
+                status_code=None if response is None else response.status_code,
+                attempts=attempt,
+                queued=started - queued_at,
+                elapsed=time.perf_counter() - started,
+                reused=(
+                    response is not None
+                    and response.headers.get("X-Near-Duplicate") == "hit"
+                ),
+            )
+        )
+        if error is not None:
+            raise error
+        if response.is_error:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise JemdzemError(response.status_code, str(detail))
+        return response
+
+    async def _call(
+        self,
+        endpoint: str,
+        image: Image,
+        data: dict[str, str],
+        refs: Mapping[str, Image] | None = None,
+        model_name: str | None = None,
+        priority: str | None = None,
+        timeout: float | None = None,
+        no_cache: bool = False,
+    ) -> httpx.Response:
+        files = [("file", ("image.png", await encode_image(image), "image/png"))]
+        for i, (label, ref) in enumerate((refs or {}).items()):
+            # The server matches reference images to labels by file name.
+            files.append(
+                (f"ref_file{i}", (f"{label}.png", await encode_image(ref), "image/png"))
+            )
+        params = (
+            {} if endpoint == "/ocr" else {"model_name": model_name or self.model_name}
+        )
+        return await self._post(
+            endpoint, files, data, params, priority, timeout, no_cache
+        )
+
+    async def ocr(self, image: Image, **options) -> str:
+        """Return the text found in ``image``.
+
+        ``options`` of all calls are ``priority``, ``timeout`` (seconds,
+        sent as ``X-Request-Timeout``) and ``no_cache`` (skip the server's
+        near-duplicate reuse).
+        """
+
+        response = await self._call("/ocr", image, {}, **options)
+        return response.json()["text"]
+
+    async def multi_detect(
+        self,
+        image: Image,
+        labels: list[str],
+        descriptions: list[str],
+        model_name: str | None = None,
+        **options,
+    ) -> list[dict]:
+        """Detect all ``labels`` in one model call; returns API detections."""
+
+        data = {"labels": json.dumps(labels), "descriptions": json.dumps(descriptions)}
+        response = await self._call(
+            "/multi-detect", image, data, model_name=model_name, **options
+        )
+        return response.json()
+
+    async def single_detect(
+        self,
+        image: Image,
+        labels: list[str],
+        descriptions: list[str],
+        refs: Mapping[str, Image] | None = None,
+        model_name: str | None = None,
+        **options,
+    ) -> list[dict]:
+        """Detect every label with its own model call and optional reference image.
+
+        ``refs`` maps labels to reference images.
+        """
+
+        data = {"labels": json.dumps(labels), "descriptions": json.dumps(descriptions)}
+        response = await self._call(
+            "/single-detect", image, data, refs, model_name=model_name, **options
+        )
+        return response.json()
+
+    async def qa(
+        self, image: Image, question: str, model_name: str | None = None, **options
+    ) -> str:
+        """Return the model's answer to ``question`` about ``image``."""
+
+        response = await self._call(
+            "/qa", image, {"question": question}, model_name=model_name, **options
+        )
+        return response.json()["answer"]
+
+    def timing_summary(self) -> dict[str, dict[str, float]]:
+        """Return call counts and mean/max times per endpoint."""
+
+        summary = {}
+        for endpoint in sorted({timing.endpoint for timing in self.timings}):
+            timings = [t for t in self.timings if t.endpoint == endpoint]
+            elapsed = [t.elapsed for t in timings]
+            summary[endpoint] = {
+                "calls": len(timings),
+                "retries": sum(t.attempts - 1 for t in timings),
+                "reused": sum(t.reused for t in timings),
+                "mean_elapsed": sum(elapsed) / len(elapsed),
+                "max_elapsed": max(elapsed),
+                "mean_queued": sum(t.queued for t in timings) / len(timings),
+            }
+        return summary
@@ -0,0 +1,48 @@
+"""Server settings read from ``JEMDZEM_*`` environment variables."""
+
+import os
+
+
+def _int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return default if value is None else float(value)
+
+
+def _weights(name: str, default: str) -> dict[str, int]:
+    """Parse ``"class=weight,class=weight"`` into a mapping."""
+
+    pairs = (item.split("=") for item in os.environ.get(name, default).split(","))
+    return {key.strip(): int(value) for key, value in pairs}
+
+
+# Maximum number of requests running model calls at the same time.
+MAX_CONCURRENCY = _int("JEMDZEM_MAX_CONCURRENCY", 8)
+# Maximum number of ``routine`` requests running model calls at the same time.
+MAX_ROUTINE_IN_FLIGHT = _int("JEMDZEM_MAX_ROUTINE_IN_FLIGHT", 4)
+# ``strict`` always serves higher classes first, ``weighted`` shares slots.
+SCHEDULER_POLICY = os.environ.get("JEMDZEM_SCHEDULER_POLICY", "strict")
+# Relative share of free slots for each class with the ``weighted`` policy.
+PRIORITY_WEIGHTS = _weights("JEMDZEM_PRIORITY_WEIGHTS", "emergency=4,routine=1")
+# Uploaded files larger than this are rejected with ``413``.
+MAX_UPLOAD_BYTES = _int("JEMDZEM_MAX_UPLOAD_MB", 50) * 1024 * 1024
+# Longest image side the model needs; larger uploads are decoded at 1/2, 1/4
+# or 1/8 of their resolution as long as they stay above it. ``0`` disables it.
+DECODE_MAX_SIDE = _int("JEMDZEM_DECODE_MAX_SIDE", 0)
+# Memory that decoded frames of all concurrent requests may take together.
+DECODE_BUDGET_BYTES = _int("JEMDZEM_DECODE_BUDGET_MB", 1024) * 1024 * 1024
+# Seconds a request waits for decode memory before it is rejected with ``503``.
+DECODE_QUEUE_TIMEOUT = _float("JEMDZEM_DECODE_QUEUE_TIMEOUT", 10.0)
+# Whole JSON or msgpack request bodies larger than this are rejected.
+MAX_BODY_BYTES = _int("JEMDZEM_MAX_BODY_MB", 100) * 1024 * 1024
+# Largest perceptual hash distance (bits) at which a frame reuses the result
+# of an earlier, near-identical request. ``-1`` (the default) disables result
+# reuse; ``4`` suits frames of a hovering drone.
+NEAR_DUPLICATE_DISTANCE = _int("JEMDZEM_NEAR_DUPLICATE_DISTANCE", -1)
+# Seconds a model result stays reusable for near-duplicate frames.
+NEAR_DUPLICATE_TTL = _float("JEMDZEM_NEAR_DUPLICATE_TTL", 30.0)
+# Recent results kept for every distinct endpoint, model and parameter set.
+NEAR_DUPLICATE_ENTRIES = _int("JEMDZEM_NEAR_DUPLICATE_ENTRIES", 64)
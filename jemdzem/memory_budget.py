@@ -0,0 +1,88 @@
+"""Admission control for the memory taken by decoded images.
+
+Every request reserves the estimated size of the frames it decodes from a
+shared :class:`MemoryBudget` before decoding them and gives the memory back
+when the request finishes. Requests that would exceed the budget wait for up
+to ``timeout`` seconds and are then rejected.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator
+
+from .metrics import metrics
+
+
+class BudgetExceeded(Exception):
+    """Raised when a reservation cannot be satisfied in time."""
+
+
+class MemoryBudget:
+    """Bytes of decoded image data that may be held by concurrent requests."""
+
+    def __init__(self, limit_bytes: int, timeout: float = 10.0) -> None:
+        self.limit_bytes = limit_bytes
+        self.timeout = timeout
+        self.used_bytes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, nbytes: int) -> None:
+        """Reserve ``nbytes``, waiting for other requests to release memory."""
+
+        if nbytes > self.limit_bytes:
+            metrics.increment("decode_budget_rejected", reason="too_large")
+            raise BudgetExceeded(
+                f"Image needs {nbytes} bytes, budget is {self.limit_bytes} bytes"
+            )
+        start = time.monotonic()
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(
+                        lambda: self.used_bytes + nbytes <= self.limit_bytes
+                    ),
+                    self.timeout,
+                )
+            # Not the builtin TimeoutError before Python 3.11.
+            except asyncio.TimeoutError:
+                metrics.increment("decode_budget_rejected", reason="timeout")
+                raise BudgetExceeded("Timed out waiting for decode memory") from None
+            self.used_bytes += nbytes
+        metrics.observe("decode_budget_wait_seconds", time.monotonic() - start)
+
+    async def release(self, nbytes: int) -> None:
+        """Return ``nbytes`` to the budget and wake up waiting requests."""
+
+        async with self._condition:
+            self.used_bytes -= nbytes
+            self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def lease(self) -> AsyncIterator["MemoryLease"]:
+        """Collect reservations of one request and release them on exit."""
+
+        lease = MemoryLease(self)
+        try:
+            yield lease
+        finally:
+            if lease.reserved_bytes:
+                await self.release(lease.reserved_bytes)
+
+
+class MemoryLease:
+    """Reservations held by a single request."""
+
+    def __init__(self, budget: MemoryBudget) -> None:
+        self.budget = budget
+        self.reserved_bytes = 0
+
+    async def reserve(self, nbytes: int) -> None:
+        await self.budget.acquire(nbytes)
+        self.reserved_bytes += nbytes
+
+    async def release(self, nbytes: int) -> None:
+        """Give back part of the reservation before the request finishes."""
+
+        await self.budget.release(nbytes)
+        self.reserved_bytes -= nbytes
@@ -0,0 +1,66 @@
+"""In-process counters and timings exposed by the ``/metrics`` endpoint."""
+
+import threading
+from collections import defaultdict
+
+
+def _key(name: str, labels: dict[str, str]) -> str:
+    """Return a Prometheus-like ``name{label=value}`` key."""
+
+    if not labels:
+        return name
+    inner = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{inner}}}"
+
+
+class Metrics:
+    """Thread-safe registry of counters and timing summaries."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._timings: dict[str, dict[str, float]] = {}
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Add ``amount`` to the counter ``name`` with the given ``labels``."""
+
+        with self._lock:
+            self._counters[_key(name, labels)] += amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record a single ``value`` (usually seconds) for the timing ``name``."""
+
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._timings.setdefault(
+                key, {"count": 0, "sum": 0.0, "max": 0.0}
+            )
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["max"] = max(summary["max"], value)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Return the current value of a counter."""
+
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def snapshot(self) -> dict:
+        """Return a JSON serializable copy of all metrics."""
+
+        with self._lock:
+            timings = {
+                key: {**summary, "mean": summary["sum"] / summary["count"]}
+                for key, summary in self._timings.items()
+            }
+            return {"counters": dict(self._counters), "timings": timings}
+
+    def reset(self) -> None:
+        """Drop all recorded values."""
+
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,221 @@
+"""Run the independent steps of an inspection mission concurrently.
+
+An inspection of one captured frame consists of independent steps: local
+marker detection, a detection call per object class, person detection and
+a few questions. :class:`MissionRunner` starts them all at once, at most
+``max_concurrency`` at a time, so the mission takes about as long as its
+slowest step instead of the sum of all round-trips.
+
+Every :class:`MissionTask` has a ``run`` step, which may be a coroutine
+function (API calls) or a plain function (local CPU work, run in a thread).
+Its optional ``commit`` step handles the result as soon as it arrives:
+drawing on the canvas, the object map, reporting. Commits run one at a time in a worker
+thread, so they may share state without locks and may block on I/O without
+stalling the other tasks.
+
+Shared artefacts are prepared once in the :class:`MissionContext`: the PNG
+encoded frame and the encoded reference images. The returned
+:class:`MissionReport` holds the timing of every task and of the whole run,
+and can be appended to a JSON lines log::
+
+    runner = MissionRunner(client, max_concurrency=4)
+    report = await runner.run(image, tasks, refs={"barrell": "beczka.png"})
+    report.append_to("mission_logs/missions.jsonl")
+"""
+
+import asyncio
+import datetime
+import inspect
+import json
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import numpy as np
+
+from .client import Image, JemdzemClient, encode_image
+
+
+@dataclass
+class MissionContext:
+    """Artefacts shared by the tasks of one run.
+
+    ``image`` is the captured frame, which ``run`` steps only read;
+    ``canvas`` is a copy for commit steps to draw on. ``encoded`` is the
+    frame encoded once for all API calls and ``refs`` maps labels to encoded
+    reference images.
+    """
+
+    client: JemdzemClient | None
+    image: np.ndarray
+    canvas: np.ndarray
+    encoded: bytes
+    refs: dict[str, bytes] = field(default_factory=dict)
+
+
+@dataclass
+class MissionTask:
+    """One step of a mission.
+
+    Args:
+        name: Unique name used in the report.
+        run: ``run(context)``; coroutine functions are awaited, plain
+            functions run in a worker thread.
+        commit: ``commit(context, result)`` called with the result of a
+            successful ``run`` as soon as it is available.
+    """
+
+    name: str
+    run: Callable[[MissionContext], Any]
+    commit: Callable[[MissionContext, Any], None] | None = None
+
+
+@dataclass(frozen=True)
+class TaskTiming:
+    """Timing of one task, in seconds since the start of the run.
+
+    ``error`` holds the message of a failed ``run`` or ``commit`` step.
+    """
+
+    name: str
+    started: float
+    finished: float
+    committed: float | None
+    error: str | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class MissionReport:
+    """Results and timings of one run.
+
+    ``context`` gives access to the canvas the commit steps drew on.
+    """
+
+    started_at: str
+    elapsed: float
+    prepare: float
+    tasks: list[TaskTiming]
+    results: dict[str, Any] = field(default_factory=dict, repr=False)
+    context: MissionContext | None = field(default=None, repr=False)
+
+    @property
+    def failed(self) -> list[str]:
+        return [task.name for task in self.tasks if task.error is not None]
+
+    def to_dict(self) -> dict:
+        """Return the timings, JSON serializable (results are left out)."""
+
+        return {
+            "started_at": self.started_at,
+            "elapsed": self.elapsed,
+            "prepare": self.prepare,
+            "tasks": [asdict(task) | {"elapsed": task.elapsed} for task in self.tasks],
+            "failed": self.failed,
+        }
+
+    def append_to(self, path: str, **fields: Any) -> None:
+        """Append the report and extra ``fields`` as one line of a JSON lines log."""
+
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(self.to_dict() | fields) + "\n")
+
+
+async def _call(fn: Callable[..., Any], *args: Any) -> Any:
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args)
+    result = await asyncio.to_thread(fn, *args)
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class MissionRunner:
+    """Run mission tasks over one frame concurrently.
+
+    Args:
+        client: API client shared by the tasks; its own cap still limits
+            the calls in flight.
+        max_concurrency: Tasks whose ``run`` step executes at once.
+    """
+
+    def __init__(
+        self, client: JemdzemClient | None = None, max_concurrency: int = 4
+    ) -> None:
+        self.client = client
+        self.max_concurrency = max_concurrency
+
+    async def prepare(
+        self, image: np.ndarray, refs: Mapping[str, Image] | None = None
+    ) -> MissionContext:
+        """Encode the frame and the reference images once."""
+
+        labels = list(refs or {})
+        encoded = await asyncio.gather(
+            encode_image(image), *(encode_image(refs[label]) for label in labels)
+        )
+        return MissionContext(
+            self.client, image, image.copy(), encoded[0], dict(zip(labels, encoded[1:]))
+        )
+
+    async def run(
+        self,
+        image: np.ndarray,
+        tasks: list[MissionTask],
+        refs: Mapping[str, Image] | None = None,
+    ) -> MissionReport:
+        """Run ``tasks`` over ``image`` and return the report.
+
+        A failing task does not stop the others; its error is recorded in
+        the report and its commit step is skipped.
+        """
+
+        names = [task.name for task in tasks]
+        if len(set(names)) != len(names):
+            raise ValueError("Task names must be unique")
+        started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        start = time.perf_counter()
+        context = await self.prepare(image, refs)
+        prepare = time.perf_counter() - start
+        slots = asyncio.Semaphore(self.max_concurrency)
+        commit_lock = asyncio.Lock()
+        results: dict[str, Any] = {}
+
+        async def execute(task: MissionTask) -> TaskTiming:
+            async with slots:
+                started = time.perf_counter() - start
+                try:
+                    result = await _call(task.run, context)
+                # A failed step is recorded in the report; the others go on.
+                except Exception as exc:  # noqa: BLE001
+                    return TaskTiming(
+                        task.name, started, time.perf_counter() - start, None, repr(exc)
+                    )
+            finished = time.perf_counter() - start
+            results[task.name] = result
+            if task.commit is None:
+                return TaskTiming(task.name, started, finished, None)
+            async with commit_lock:
+                try:
+                    await asyncio.to_thread(task.commit, context, result)
+                except Exception as exc:  # noqa: BLE001
+                    error = repr(exc)
+                else:
+                    error = None
+            return TaskTiming(
+                task.name, started, finished, time.perf_counter() - start, error
+            )
+
+        timings = await asyncio.gather(*(execute(task) for task in tasks))
+        return MissionReport(
+            started_at=started_at,
+            elapsed=time.perf_counter() - start,
+            prepare=prepare,
+            tasks=list(timings),
+            results=results,
+            context=context,
+        )
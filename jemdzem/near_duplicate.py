@@ -0,0 +1,215 @@
+"""Reuse of model results for near-duplicate frames.
+
+While the drone hovers, consecutive frames differ only by sensor noise and
+compression artefacts, so an exact hash of the upload never matches. Each
+decoded image is summarised by two 64-bit perceptual hashes computed on a
+tiny grayscale copy:
+
+* ``dhash`` - signs of horizontal gradients of a 9x8 thumbnail,
+* ``phash`` - signs of the lowest 8x8 DCT coefficients of a 32x32
+  thumbnail relative to their median.
+
+:class:`NearDuplicateCache` keeps the results of recent model calls with
+the hashes of their images. A new request from the same client with the
+same endpoint, model and parameters whose hashes are both within ``max_distance`` bits (Hamming
+distance) of a cached entry gets the cached result instead of a model call.
+Lookups compare against all recent entries of the same request at once with
+vectorized XOR and popcount.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import cv2
+import numpy as np
+
+from .metrics import metrics
+
+_BITS = 1 << np.arange(64, dtype=np.uint64)
+
+
+def _pack(bits: np.ndarray) -> int:
+    """Pack 64 booleans into an integer, first bit least significant."""
+
+    return int(np.bitwise_or.reduce(_BITS[np.ravel(bits)]))
+
+
+def _gray(image: np.ndarray) -> np.ndarray:
+    return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def dhash(image: np.ndarray) -> int:
+    """Return the 64-bit difference hash of a BGR or grayscale image."""
+
+    small = cv2.resize(_gray(image), (9, 8), interpolation=cv2.INTER_AREA)
+    return _pack(small[:, 1:] > small[:, :-1])
+
+
+def phash(image: np.ndarray) -> int:
+    """Return the 64-bit DCT perceptual hash of a BGR or grayscale image."""
+
+    small = cv2.resize(_gray(image), (32, 32), interpolation=cv2.INTER_AREA)
+    low = cv2.dct(small.astype(np.float32))[:8, :8]
+    # The DC term only encodes the mean brightness.
+    return _pack(low > np.median(low.ravel()[1:]))
+
+
+def image_hashes(image: np.ndarray) -> tuple[int, int]:
+    """Return ``(dhash, phash)`` of ``image``.
+
+    Both thumbnails are derived from one ``64x64`` copy. Large images are
+    first subsampled to about 256 pixels on the short side, which keeps
+    hashing a 20 MP frame in the millisecond range.
+    """
+
+    step = max(1, min(image.shape[:2]) // 256)
+    small = cv2.resize(
+        np.ascontiguousarray(image[::step, ::step]),
+        (64, 64),
+        interpolation=cv2.INTER_AREA,
+    )
+    small = _gray(small)
+    return dhash(small), phash(small)
+
+
+def request_key(
+    endpoint: str, model_name: str, params: dict, refs: dict, client: str = ""
+) -> str:
+    """Identify the question asked about an image, independent of the image.
+
+    Reference images are included by digest, so different references never
+    share results, and so is ``client`` (the API key), so clients never get
+    results of each other's images.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    document = json.dumps(
+        [endpoint, model_name, params, client], sort_keys=True, default=str
+    )
+    digest.update(document.encode())
+    for label in sorted(refs):
+        digest.update(label.encode())
+        digest.update(np.ascontiguousarray(refs[label]).data)
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entries:
+    """Recent results of one request key, oldest first."""
+
+    dhashes: np.ndarray
+    phashes: np.ndarray
+    times: np.ndarray
+    results: list[Any]
+
+
+class NearDuplicateCache:
+    """Results of recent model calls looked up by perceptual hash distance.
+
+    Args:
+        max_distance: Largest Hamming distance, in bits of each of the two
+            hashes, for images to count as near duplicates. ``0`` only
+            matches identical hashes; negative values disable the cache.
+        ttl: Seconds a result stays reusable.
+        max_entries: Results kept per request key (at least one); the oldest
+            are dropped.
+        max_keys: Request keys kept; the least recently used are dropped.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = 4,
+        ttl: float = 30.0,
+        max_entries: int = 64,
+        max_keys: int = 256,
+    ) -> None:
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._keys: OrderedDict[str, _Entries] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_distance >= 0
+
+    def lookup(
+        self, key: str, hashes: tuple[int, int], endpoint: str = ""
+    ) -> tuple[bool, Any]:
+        """Return ``(True, result)`` for a near duplicate, else ``(False, None)``."""
+
+        if not self.enabled:
+            return False, None
+        now = time.monotonic()
+        with self._lock:
+            entries = self._keys.get(key)
+            hit, found = False, None
+            if entries is not None:
+                self._keys.move_to_end(key)
+                d = np.bitwise_count(entries.dhashes ^ np.uint64(hashes[0]))
+                p = np.bitwise_count(entries.phashes ^ np.uint64(hashes[1]))
+                fresh = now - entries.times <= self.ttl
+                candidates = np.nonzero(
+                    fresh & (d <= self.max_distance) & (p <= self.max_distance)
+                )[0]
+                if len(candidates):
+                    # Closest match, the newest one among equals.
+                    distance = (d + p)[candidates]
+                    best = candidates[distance == distance.min()][-1]
+                    hit, found = True, entries.results[best]
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.increment(
+            "near_duplicate_hits" if hit else "near_duplicate_misses",
+            endpoint=endpoint,
+        )
+        return hit, found
+
+    def store(self, key: str, hashes: tuple[int, int], result: Any) -> None:
+        """Remember the model result for an image with ``hashes``."""
+
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            entries = self._keys.get(key)
+            if entries is None:
+                entries = self._keys[key] = _Entries(
+                    np.empty(0, np.uint64), np.empty(0, np.uint64), np.empty(0), []
+                )
+                while len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+            self._keys.move_to_end(key)
+            last = -self.max_entries
+            entries.dhashes = np.append(entries.dhashes, np.uint64(hashes[0]))[last:]
+            entries.phashes = np.append(entries.phashes, np.uint64(hashes[1]))[last:]
+            entries.times = np.append(entries.times, now)[last:]
+            entries.results = [*entries.results, result][last:]
+
+    def stats(self) -> dict[str, float]:
+        """Return hits (saved model calls), misses and the hit rate."""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_calls": self.hits,
+                "keys": len(self._keys),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,211 @@
+"""Request body formats accepted by the image endpoints.
+
+The format is selected by the ``Content-Type`` header:
+
+* ``multipart/form-data`` - the image in the ``file`` field, reference images
+  in ``ref_file*`` fields (matched to labels by file name) and parameters as
+  form fields, with lists encoded as JSON strings.
+* ``application/octet-stream`` or ``image/*`` - the raw encoded image as the
+  whole body. Parameters come from the query string (lists as repeated
+  values, e.g. ``?labels=pipe&labels=barrel``) or from ``X-<Name>`` headers
+  (lists as JSON, e.g. ``X-Labels: ["pipe"]``).
+* ``application/json`` - one object with the base64 encoded ``image``, an
+  optional ``refs`` mapping ``{label: base64 image}`` and the parameters.
+* ``application/msgpack`` - the same object with raw bytes instead of
+  base64 strings. Requires the optional ``msgpack`` package.
+"""
+
+import binascii
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+from fastapi import HTTPException, Request
+from starlette.datastructures import UploadFile
+
+from . import config
+from .api_utils import decode_images, encoded_from_upload_file
+from .memory_budget import MemoryLease
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+# Parameters holding a list of strings; all others are plain strings.
+LIST_PARAMS = {"labels", "descriptions"}
+# Parameters that must be a single string.
+STRING_PARAMS = {"question"}
+# Parameters that raw-body requests may send as ``X-<Name>`` headers.
+HEADER_PARAMS = ("labels", "descriptions", "question")
+RAW_CONTENT_TYPES = ("application/octet-stream", "image/")
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+@dataclass
+class EncodedImageRequest:
+    """Encoded image, reference images and parameters of one request."""
+
+    image: np.ndarray
+    refs: dict[str, np.ndarray] = field(default_factory=dict)
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ImageRequest:
+    """Decoded image, reference images and parameters of one request."""
+
+    image: np.ndarray
+    refs: dict[str, np.ndarray]
+    params: dict[str, Any]
+
+    def param(self, name: str) -> Any:
+        """Return a required parameter or fail with ``422``."""
+
+        if name not in self.params:
+            raise HTTPException(status_code=422, detail=f"Missing parameter {name!r}")
+        return self.params[name]
+
+
+def _checked(name: str, value: Any) -> Any:
+    """Fail with ``422`` unless ``value`` has the type of parameter ``name``."""
+
+    if name in LIST_PARAMS:
+        valid = isinstance(value, list) and all(isinstance(v, str) for v in value)
+        expected = "a list of strings"
+    elif name in STRING_PARAMS:
+        valid = isinstance(value, str)
+        expected = "a string"
+    else:
+        return value
+    if not valid:
+        raise HTTPException(
+            status_code=422, detail=f"Parameter {name!r} must be {expected}"
+        )
+    return value
+
+
+def _typed(name: str, value: Any) -> Any:
+    """Decode JSON encoded list parameters coming from forms and headers."""
+
+    if name in LIST_PARAMS and isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            raise HTTPException(
+                status_code=422, detail=f"Parameter {name!r} must be a JSON list"
+            ) from None
+    return _checked(name, value)
+
+
+async def _read_body(request: Request, max_size: int) -> bytearray:
+    """Read the request body, failing with ``413`` once it exceeds ``max_size``."""
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_size:
+            raise HTTPException(
+                status_code=413, detail=f"Request body exceeds {max_size} bytes"
+            )
+    return body
+
+
+def _image_bytes(value: Any, name: str) -> np.ndarray:
+    if isinstance(value, str):
+        try:
+            value = binascii.a2b_base64(value)
+        except binascii.Error:
+            raise HTTPException(
+                status_code=422, detail=f"{name!r} is not valid base64"
+            ) from None
+    if not isinstance(value, (bytes, bytearray)) or not value:
+        raise HTTPException(status_code=422, detail=f"Missing image data in {name!r}")
+    if len(value) > config.MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{name!r} exceeds {config.MAX_UPLOAD_BYTES} bytes",
+        )
+    return np.frombuffer(value, np.uint8)
+
+
+async def _read_multipart(request: Request) -> EncodedImageRequest:
+    form = await request.form()
+    image = form.get("file")
+    if not isinstance(image, UploadFile):
+        raise HTTPException(status_code=422, detail="Missing 'file' upload")
+
+    parsed = EncodedImageRequest(encoded_from_upload_file(image))
+    for key, value in form.multi_items():
+        if isinstance(value, UploadFile):
+            if key.startswith("ref_file"):
+                # map each reference file to the label matching its filename
+                label, _ = os.path.splitext(value.filename)
+                parsed.refs[label] = encoded_from_upload_file(value)
+        else:
+            parsed.params[key] = _typed(key, value)
+    return parsed
+
+
+async def _read_raw(request: Request) -> EncodedImageRequest:
+    body = await _read_body(request, config.MAX_UPLOAD_BYTES)
+    parsed = EncodedImageRequest(_image_bytes(body, "body"))
+    for name in HEADER_PARAMS:
+        value = request.headers.get(f"x-{name}")
+        if value is not None:
+            parsed.params[name] = _typed(name, value)
+    for name in request.query_params:
+        if name in LIST_PARAMS:
+            parsed.params[name] = request.query_params.getlist(name)
+        else:
+            parsed.params[name] = request.query_params[name]
+    return parsed
+
+
+async def _read_document(request: Request, loads) -> EncodedImageRequest:
+    body = await _read_body(request, config.MAX_BODY_BYTES)
+    try:
+        document = loads(body)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Malformed request body") from None
+    if not isinstance(document, dict):
+        raise HTTPException(status_code=422, detail="Request body must be an object")
+
+    parsed = EncodedImageRequest(_image_bytes(document.pop("image", None), "image"))
+    refs = document.pop("refs", None) or {}
+    if not isinstance(refs, dict) or not all(isinstance(k, str) for k in refs):
+        raise HTTPException(status_code=422, detail="'refs' must map labels to images")
+    for label, ref in refs.items():
+        parsed.refs[label] = _image_bytes(ref, f"refs.{label}")
+    parsed.params = {name: _checked(name, value) for name, value in document.items()}
+    return parsed
+
+
+async def read_image_request(request: Request) -> EncodedImageRequest:
+    """Parse the request body according to its ``Content-Type``."""
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "multipart/form-data":
+        return await _read_multipart(request)
+    if content_type.startswith(RAW_CONTENT_TYPES):
+        return await _read_raw(request)
+    if content_type == "application/json":
+        return await _read_document(request, json.loads)
+    if content_type in MSGPACK_CONTENT_TYPES and msgpack is not None:
+        return await _read_document(request, msgpack.unpackb)
+    raise HTTPException(
+        status_code=415, detail=f"Unsupported Content-Type {content_type!r}"
+    )
+
+
+async def parse_image_request(
+    request: Request, lease: MemoryLease | None = None
+) -> ImageRequest:
+    """Parse and decode the image and reference images of ``request``."""
+
+    encoded = await read_image_request(request)
+    image, *refs = await decode_images([encoded.image, *encoded.refs.values()], lease)
+    return ImageRequest(image, dict(zip(encoded.refs, refs)), encoded.params)
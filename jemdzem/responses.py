@@ -0,0 +1,81 @@
+"""Response encodings for detection results.
+
+Detections are returned as a JSON list of ``{"label", "x", "y", "width",
+"height"}`` objects by default. Clients handling many boxes can ask for a
+compact columnar document with the ``Accept`` header:
+
+* ``application/vnd.jemdzem.columnar+json``
+* ``application/vnd.jemdzem.columnar+msgpack`` (requires ``msgpack``)
+
+The columnar document holds parallel arrays, with labels interned::
+
+    {"labels": ["pipe", "barrel"], "label": [0, 1, 0],
+     "x": [...], "y": [...], "width": [...], "height": [...]}
+
+so that ``labels[label[i]]`` is the label of box ``i``.
+"""
+
+import json
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+COLUMNAR_JSON = "application/vnd.jemdzem.columnar+json"
+COLUMNAR_MSGPACK = "application/vnd.jemdzem.columnar+msgpack"
+BOX_FIELDS = ("x", "y", "width", "height")
+
+
+def to_columnar(detections: list[dict]) -> dict[str, list]:
+    """Convert a list of detections into parallel arrays with interned labels."""
+
+    label_ids: dict[str, int] = {}
+    columns: dict[str, list] = {"labels": [], "label": []}
+    columns.update((name, []) for name in BOX_FIELDS)
+    for det in detections:
+        label_id = label_ids.setdefault(det["label"], len(label_ids))
+        columns["label"].append(label_id)
+        for name in BOX_FIELDS:
+            columns[name].append(det[name])
+    columns["labels"] = list(label_ids)
+    return columns
+
+
+def dumps_json(content) -> bytes:
+    """Serialize ``content`` to compact JSON, using ``orjson`` when available."""
+
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":")).encode()
+
+
+def negotiate(accept: str) -> str | None:
+    """Return the first columnar media type listed in ``accept``, if any."""
+
+    supported = [COLUMNAR_JSON] + ([COLUMNAR_MSGPACK] if msgpack else [])
+    for media_range in accept.split(","):
+        media_type = media_range.split(";")[0].strip()
+        if media_type in supported:
+            return media_type
+    return None
+
+
+def detections_response(request: Request, detections: list[dict]) -> Response:
+    """Encode ``detections`` in the format requested by the ``Accept`` header."""
+
+    media_type = negotiate(request.headers.get("accept", ""))
+    if media_type == COLUMNAR_JSON:
+        return Response(dumps_json(to_columnar(detections)), media_type=media_type)
+    if media_type == COLUMNAR_MSGPACK:
+        return Response(msgpack.packb(to_columnar(detections)), media_type=media_type)
+    return JSONResponse(content=detections)
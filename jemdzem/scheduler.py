@@ -0,0 +1,163 @@
+"""Priority scheduling of model calls.
+
+Every request declares a priority class with the ``X-Priority`` header
+(``emergency`` or ``routine``, the default). Requests wait in per-class queues
+until :class:`PriorityScheduler` grants them one of ``max_concurrency`` slots:
+
+* ``strict`` policy - a waiting higher class is always served first,
+* ``weighted`` policy - free slots are shared between waiting classes in
+  proportion to their weights (smooth weighted round robin).
+
+Inside a class waiters are served round robin per API key so that one busy
+client cannot starve the others, and per-class limits cap how many requests
+of a class may be in flight at once.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TypeVar
+
+from fastapi import Header, HTTPException
+
+from .metrics import metrics
+
+PRIORITY_HEADER = "X-Priority"
+# Priority classes ordered from the most to the least important one.
+PRIORITY_CLASSES = ("emergency", "routine")
+
+T = TypeVar("T")
+
+
+def get_priority(
+    x_priority: str = Header("routine", alias=PRIORITY_HEADER),
+) -> str:
+    """FastAPI dependency returning the validated priority class."""
+
+    if x_priority not in PRIORITY_CLASSES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{PRIORITY_HEADER} must be one of {', '.join(PRIORITY_CLASSES)}",
+        )
+    return x_priority
+
+
+class PriorityScheduler:
+    """Admit requests to model calls by priority class and API key."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        class_limits: dict[str, int] | None = None,
+        policy: str = "strict",
+        weights: dict[str, int] | None = None,
+    ) -> None:
+        if policy not in ("strict", "weighted"):
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.max_concurrency = max_concurrency
+        self.class_limits = class_limits or {}
+        self.policy = policy
+        self.weights = {c: 1 for c in PRIORITY_CLASSES} | (weights or {})
+        self._queues: dict[str, OrderedDict[str, deque[asyncio.Future]]] = {
+            c: OrderedDict() for c in PRIORITY_CLASSES
+        }
+        self._in_flight = dict.fromkeys(PRIORITY_CLASSES, 0)
+        self._credit = dict.fromkeys(PRIORITY_CLASSES, 0)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: str, api_key: str) -> AsyncIterator[None]:
+        """Wait for a free slot for ``priority`` and hold it inside the block."""
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(api_key, deque()).append(waiter)
+        enqueued = time.monotonic()
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Granted just before the cancellation arrived: give the slot back.
+            if waiter.done() and not waiter.cancelled():
+                self._release(priority)
+            raise
+        metrics.observe(
+            "queue_wait_seconds", time.monotonic() - enqueued, priority=priority
+        )
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    async def run(
+        self,
+        priority: str,
+        api_key: str,
+        fn: Callable[..., Awaitable[T]],
+        *args,
+    ) -> T:
+        """Call ``fn(*args)`` once a slot for ``priority`` is available."""
+
+        async with self.slot(priority, api_key):
+            return await fn(*args)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return the number of queued and running requests per class."""
+
+        return {
+            c: {
+                "queued": sum(
+                    1 for q in self._queues[c].values() for w in q if not w.done()
+                ),
+                "in_flight": self._in_flight[c],
+            }
+            for c in PRIORITY_CLASSES
+        }
+
+    def _release(self, priority: str) -> None:
+        self._in_flight[priority] -= 1
+        self._dispatch()
+
+    def _eligible(self, priority: str) -> bool:
+        limit = self.class_limits.get(priority)
+        if limit is not None and self._in_flight[priority] >= limit:
+            return False
+        return bool(self._queues[priority])
+
+    def _next_class(self) -> str | None:
+        eligible = [c for c in PRIORITY_CLASSES if self._eligible(c)]
+        if not eligible:
+            return None
+        if self.policy == "strict":
+            return eligible[0]
+        for c in eligible:
+            self._credit[c] += self.weights[c]
+        chosen = max(eligible, key=lambda c: self._credit[c])
+        self._credit[chosen] -= sum(self.weights[c] for c in eligible)
+        return chosen
+
+    def _pop(self, priority: str) -> asyncio.Future | None:
+        """Pop the next live waiter of ``priority``, rotating over API keys."""
+
+        queues = self._queues[priority]
+        while queues:
+            api_key, queue = next(iter(queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                queues.move_to_end(api_key)
+            else:
+                del queues[api_key]
+            if not waiter.done():
+                return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        while sum(self._in_flight.values()) < self.max_concurrency:
+            priority = self._next_class()
+            if priority is None:
+                return
+            waiter = self._pop(priority)
+            if waiter is None:
+                continue
+            self._in_flight[priority] += 1
+            waiter.set_result(None)
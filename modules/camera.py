@@ -0,0 +1,227 @@
+"""Camera calibrations with cached undistortion lookup tables.
+
+:class:`CameraRegistry` loads each calibration once and hands out
+:class:`CameraModel` objects keyed by camera ID and image resolution. A model
+lazily builds a table of normalized (undistorted) coordinates sampled every
+``lut_step`` pixels, so that projecting a whole frame onto the ground needs
+no iterative ``cv2.undistortPoints`` solve, and caches the maps used to
+undistort frames with ``cv2.remap``.
+Tables and undistortion maps are kept in a cache bounded by
+``max_cache_bytes``; the least recently used ones are evicted first.
+"""
+
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from .get_coordinates import normalized_to_ground, translate_batch
+
+
+class ByteLRUCache:
+    """Least-recently-used cache of ``ndarray`` tuples bounded by total size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, arrays: tuple) -> None:
+        size = sum(a.nbytes for a in arrays)
+        if size > self.max_bytes:
+            # Too large to keep: the caller still gets its result.
+            return
+        if key in self._items:
+            self.nbytes -= sum(a.nbytes for a in self._items.pop(key))
+        self._items[key] = arrays
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.nbytes -= sum(a.nbytes for a in evicted)
+
+    def evict(self, prefix: tuple) -> None:
+        """Drop every entry whose key starts with ``prefix``."""
+
+        for key in [k for k in self._items if k[: len(prefix)] == prefix]:
+            self.nbytes -= sum(a.nbytes for a in self._items.pop(key))
+
+
+class CameraModel:
+    """Intrinsics of one camera at one image resolution."""
+
+    def __init__(
+        self,
+        camera_id: str,
+        camera_matrix: np.ndarray,
+        dist_coeffs: np.ndarray,
+        resolution: tuple[int, int],
+        cache: ByteLRUCache,
+        lut_step: int = 4,
+    ) -> None:
+        self.camera_id = camera_id
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.resolution = resolution
+        self.lut_step = lut_step
+        self._cache = cache
+
+    def normalized_lut(self) -> np.ndarray:
+        """Return normalized coordinates sampled every ``lut_step`` pixels.
+
+        The table has shape ``(ceil((h - 1) / step) + 1, ceil((w - 1) / step)
+        + 1, 2)`` and always includes the last row and column of pixels.
+        """
+
+        key = (self.camera_id, self.resolution, "lut", self.lut_step)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached[0]
+
+        width, height = self.resolution
+        xs = np.minimum(
+            np.arange(0, width - 1 + self.lut_step, self.lut_step), width - 1
+        )
+        ys = np.minimum(
+            np.arange(0, height - 1 + self.lut_step, self.lut_step), height - 1
+        )
+        grid = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 1, 2)
+        grid = grid.astype(np.float32)
+        lut = cv2.undistortPoints(grid, self.camera_matrix, self.dist_coeffs)
+        lut = lut.reshape(len(ys), len(xs), 2)
+        self._cache.put(key, (lut,))
+        return lut
+
+    def undistort_maps(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return cached ``cv2.remap`` maps that undistort whole frames."""
+
+        key = (self.camera_id, self.resolution, "maps")
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        maps = cv2.initUndistortRectifyMap(
+            self.camera_matrix,
+            self.dist_coeffs,
+            None,
+            self.camera_matrix,
+            self.resolution,
+            cv2.CV_16SC2,
+        )
+        self._cache.put(key, maps)
+        return maps
+
+    def translate(
+        self, pixels: np.ndarray, altitude: float, angle: float = 0.0
+    ) -> np.ndarray:
+        """:func:`get_coordinates.translate_batch` with this camera's intrinsics.
+
+        Scattered points go straight through ``cv2.undistortPoints``, which is
+        faster than gathering them from the table; use :meth:`ground_grid` to
+        project whole frames.
+        """
+
+        return translate_batch(
+            pixels, altitude, self.camera_matrix, self.dist_coeffs, angle
+        )
+
+    def ground_grid(self, altitude: float, angle: float = 0.0) -> np.ndarray:
+        """Return ground offsets of every sample of :meth:`normalized_lut`.
+
+        Entry ``[i, j]`` is the ``(dx, dy)`` offset in metres of pixel
+        ``(j * lut_step, i * lut_step)`` (clamped to the last row and column).
+        """
+
+        lut = self.normalized_lut()
+        ground = normalized_to_ground(lut.reshape(-1, 2), altitude, angle)
+        return ground.reshape(lut.shape)
+
+    def undistort(self, image: np.ndarray) -> np.ndarray:
+        """Undistort a whole frame using the cached maps."""
+
+        map1, map2 = self.undistort_maps()
+        return cv2.remap(image, map1, map2, cv2.INTER_LINEAR)
+
+
+class CameraRegistry:
+    """Calibrations loaded once, keyed by camera ID and resolution."""
+
+    def __init__(self, max_cache_bytes: int = 256 * 1024 * 1024, lut_step: int = 4):
+        self.lut_step = lut_step
+        self.cache = ByteLRUCache(max_cache_bytes)
+        self._calibrations: dict[str, tuple] = {}
+        self._models: dict[tuple[str, tuple[int, int]], CameraModel] = {}
+
+    def register(
+        self,
+        camera_id: str,
+        camera_matrix: np.ndarray,
+        dist_coeffs: np.ndarray,
+        resolution: tuple[int, int],
+    ) -> None:
+        """Add a calibration made at ``resolution`` (``(width, height)``).
+
+        Re-registering ``camera_id`` drops its models and cached tables.
+        """
+
+        self._calibrations[camera_id] = (
+            np.asarray(camera_matrix, dtype=np.float64),
+            np.asarray(dist_coeffs, dtype=np.float64),
+            tuple(resolution),
+        )
+        self._models = {k: v for k, v in self._models.items() if k[0] != camera_id}
+        self.cache.evict((camera_id,))
+
+    def load(
+        self,
+        camera_id: str,
+        path: str,
+        resolution: tuple[int, int] | None = None,
+    ) -> None:
+        """Load a calibration ``.npz`` with ``camMatrix`` and ``distCoef`` arrays.
+
+        When ``resolution`` is not given it is estimated as twice the principal
+        point, which holds for calibrations of centred sensors.
+        """
+
+        with np.load(path) as calibration:
+            camera_matrix = calibration["camMatrix"]
+            dist_coeffs = calibration["distCoef"]
+        if resolution is None:
+            resolution = (
+                round(2 * camera_matrix[0, 2]),
+                round(2 * camera_matrix[1, 2]),
+            )
+        self.register(camera_id, camera_matrix, dist_coeffs, resolution)
+
+    def get(
+        self, camera_id: str, resolution: tuple[int, int] | None = None
+    ) -> CameraModel:
+        """Return the model of ``camera_id`` for images of ``resolution``.
+
+        Intrinsics are rescaled when ``resolution`` differs from the one used
+        for calibration; distortion coefficients do not depend on it.
+        """
+
+        camera_matrix, dist_coeffs, calibrated = self._calibrations[camera_id]
+        resolution = tuple(resolution or calibrated)
+        key = (camera_id, resolution)
+        model = self._models.get(key)
+        if model is None:
+            scale = np.diag(
+                [resolution[0] / calibrated[0], resolution[1] / calibrated[1], 1.0]
+            )
+            model = CameraModel(
+                camera_id,
+                scale @ camera_matrix,
+                dist_coeffs,
+                resolution,
+                self.cache,
+                self.lut_step,
+            )
+            self._models[key] = model
+        return model
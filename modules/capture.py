@@ -0,0 +1,225 @@
+"""Background video capture that always hands out the newest frame.
+
+``cv2.VideoCapture.read`` returns the oldest buffered frame, so a script that
+connects, waits and then reads gets a stale image, and any slow processing
+step lets the stream fall further behind the drone. :class:`LatestFrameGrabber`
+decodes the stream on a background thread and keeps only the most recent
+frame together with its capture time; older frames are dropped. Lost streams
+are reopened with an exponential backoff.
+
+Any source accepted by ``cv2.VideoCapture`` works, including local video
+files, which are read in a loop (end of file counts as a lost connection)
+and can be paced to their nominal frame rate to stand in for a live stream::
+
+    with LatestFrameGrabber("rtsp://192.168.241.1/live") as grabber:
+        image, timestamp = grabber.read(timeout=10.0)
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CaptureStats:
+    """Counters of a :class:`LatestFrameGrabber`.
+
+    ``frame_age`` is the time in seconds since the newest frame was decoded
+    (``inf`` before the first frame) and ``drop_rate`` the fraction of
+    decoded frames that were replaced before anyone read them.
+    """
+
+    connected: bool
+    frames_decoded: int
+    frames_read: int
+    frames_dropped: int
+    reconnects: int
+    frame_age: float
+    drop_rate: float
+
+
+class LatestFrameGrabber:
+    """Decode a video source on a background thread, keeping the newest frame.
+
+    Args:
+        source: Stream URL, file path or device index for ``cv2.VideoCapture``.
+        pace: Sleep between frames to match the source's nominal frame rate.
+            Useful to replay video files at live speed; network streams are
+            paced by the sender already.
+        reconnect_delay: First wait in seconds before reopening a lost
+            source; doubled after every failed attempt.
+        max_reconnect_delay: Upper bound of the reconnect wait.
+        capture_factory: Callable opening the source, ``cv2.VideoCapture`` by
+            default.
+    """
+
+    def __init__(
+        self,
+        source: str | int,
+        pace: bool = False,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 10.0,
+        capture_factory: Callable[[str | int], cv2.VideoCapture] = cv2.VideoCapture,
+    ) -> None:
+        self.source = source
+        self.pace = pace
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._capture_factory = capture_factory
+
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._frame: np.ndarray | None = None
+        self._timestamp = 0.0
+        self._decoded_at = 0.0
+        self._sequence = 0
+        self._last_read = 0
+        self._connected = False
+        self._frames_read = 0
+        self._frames_dropped = 0
+        self._reconnects = 0
+
+    def __enter__(self) -> "LatestFrameGrabber":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start the decode thread; does nothing if it is already running."""
+
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="LatestFrameGrabber", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Stop the decode thread and release the source."""
+
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _open(self) -> cv2.VideoCapture | None:
+        capture = self._capture_factory(self.source)
+        if not capture.isOpened():
+            capture.release()
+            return None
+        # Honoured by some backends only; the thread drains the buffer anyway.
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return capture
+
+    def _run(self) -> None:
+        capture = None
+        delay = self.reconnect_delay
+        opened_before = False
+        try:
+            while not self._stop.is_set():
+                if capture is None:
+                    if opened_before:
+                        self._reconnects += 1
+                    capture = self._open()
+                    if capture is None:
+                        self._stop.wait(delay)
+                        delay = min(delay * 2, self.max_reconnect_delay)
+                        continue
+                    opened_before = True
+                    fps = capture.get(cv2.CAP_PROP_FPS)
+                    interval = 1.0 / fps if self.pace and fps > 0 else 0.0
+                    next_frame = time.monotonic()
+
+                ok, frame = capture.read()
+                if not ok:
+                    # Sources that open but send nothing back off as well.
+                    capture.release()
+                    capture = None
+                    with self._condition:
+                        self._connected = False
+                    self._stop.wait(delay)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+                    continue
+
+                delay = self.reconnect_delay
+                with self._condition:
+                    if self._sequence > self._last_read:
+                        self._frames_dropped += 1
+                    self._frame = frame
+                    self._timestamp = time.time()
+                    self._decoded_at = time.monotonic()
+                    self._sequence += 1
+                    self._connected = True
+                    self._condition.notify_all()
+
+                if interval:
+                    next_frame += interval
+                    self._stop.wait(max(0.0, next_frame - time.monotonic()))
+        finally:
+            if capture is not None:
+                capture.release()
+            with self._condition:
+                self._connected = False
+                self._condition.notify_all()
+
+    def read(
+        self, timeout: float | None = 5.0, fresh: bool = True
+    ) -> tuple[np.ndarray, float]:
+        """Return the newest frame and its capture time (``time.time()``).
+
+        Args:
+            timeout: Seconds to wait for a frame, ``None`` to wait forever.
+            fresh: Wait for a frame that has not been returned before;
+                otherwise the current frame is returned again if no newer one
+                arrived.
+
+        Raises:
+            TimeoutError: No suitable frame arrived within ``timeout``.
+        """
+
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: (
+                    self._stop.is_set()
+                    or (
+                        self._sequence > self._last_read
+                        if fresh
+                        else self._frame is not None
+                    )
+                ),
+                timeout,
+            )
+            if (
+                not ready
+                or self._frame is None
+                or (fresh and self._sequence == self._last_read)
+            ):
+                raise TimeoutError(f"No frame from {self.source} within {timeout} s")
+            self._last_read = self._sequence
+            self._frames_read += 1
+            return self._frame, self._timestamp
+
+    def stats(self) -> CaptureStats:
+        with self._condition:
+            decoded = self._sequence
+            return CaptureStats(
+                connected=self._connected,
+                frames_decoded=decoded,
+                frames_read=self._frames_read,
+                frames_dropped=self._frames_dropped,
+                reconnects=self._reconnects,
+                frame_age=(
+                    time.monotonic() - self._decoded_at if decoded else float("inf")
+                ),
+                drop_rate=self._frames_dropped / decoded if decoded else 0.0,
+            )
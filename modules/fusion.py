@@ -0,0 +1,255 @@
+"""Incremental fusion of per-frame detections into a persistent object map.
+
+Every frame of a mission is georeferenced independently, so the same barrel
+seen from two passes produces two detections a few metres apart.
+:class:`ObjectMap` clusters detections online: each detection is matched to
+the closest known object of the same label within ``radius`` metres, or
+starts a new object. Matched objects keep a running weighted mean of their
+position and a confidence that grows with every observation.
+
+Positions are kept in metres on the tangent plane at the first detection
+(:func:`get_coordinates.wgs84_to_local`) and indexed with one
+:class:`spatial_index.GridIndex` per label, so an update only looks at the
+objects near the new detections, however large the map has grown.
+:meth:`ObjectMap.update` returns only the objects that are new or have
+changed noticeably, which is what needs to be pushed to the report.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from .get_coordinates import calculate_new_coordinates_batch, wgs84_to_local
+from .spatial_index import GridIndex, _greedy
+
+
+@dataclass
+class FusedObject:
+    """One physical object of the map.
+
+    ``confidence`` is the probability that at least one of the observations
+    was correct, ``1 - prod(1 - score)``.
+    """
+
+    object_id: int
+    label: str
+    lat: float
+    lng: float
+    observations: int
+    confidence: float
+    first_seen: float
+    last_seen: float
+
+
+class ObjectMap:
+    """Online clustering of labelled geo-detections.
+
+    Args:
+        radius: Detections closer than this many metres to a known object of
+            the same label are treated as that object.
+        min_move: Minimal change of an object's position estimate, in metres,
+            for it to be reported again by :meth:`update`.
+        min_confidence_change: Minimal confidence increase for an object to
+            be reported again by :meth:`update`.
+        default_score: Score of detections that come without one.
+    """
+
+    def __init__(
+        self,
+        radius: float = 3.0,
+        min_move: float = 0.5,
+        min_confidence_change: float = 0.1,
+        default_score: float = 0.5,
+    ) -> None:
+        self.radius = radius
+        self.min_move = min_move
+        self.min_confidence_change = min_confidence_change
+        self.default_score = default_score
+        self.origin: tuple[float, float] | None = None
+        self.objects: list[FusedObject] = []
+        # One grid index of positions in metres per label; _ids maps its
+        # per-label point ids to object ids, _slots the other way round.
+        self._indexes: dict[str, GridIndex] = {}
+        self._ids: dict[str, list[int]] = {}
+        self._slots: list[int] = []
+        self._weights: list[float] = []
+        # Position and confidence when the object was last reported.
+        self._reported: list[tuple[float, float, float]] = []
+        # Object id of every detection of the last update.
+        self.last_ids = np.empty(0, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def update(
+        self,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        labels: list[str],
+        scores: np.ndarray | None = None,
+        timestamp: float = 0.0,
+    ) -> list[FusedObject]:
+        """Fuse the detections of one frame into the map.
+
+        Detections of the same frame are never merged with each other: each
+        known object absorbs at most one of them.
+
+        Args:
+            lat: ``(N,)`` detection latitudes in decimal degrees.
+            lng: ``(N,)`` detection longitudes in decimal degrees.
+            labels: ``N`` detection labels.
+            scores: ``(N,)`` detection confidences in ``[0, 1]``, by default
+                ``default_score`` each.
+            timestamp: Time of the frame, stored as ``first_seen`` and
+                ``last_seen``.
+
+        The object id of every detection is left in :attr:`last_ids`.
+
+        Returns:
+            The objects created by this frame or whose position or confidence
+            changed by more than ``min_move`` or ``min_confidence_change``
+            since they were last returned, in order of their ids.
+        """
+
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lng = np.atleast_1d(np.asarray(lng, dtype=np.float64))
+        self.last_ids = np.full(len(lat), -1, dtype=np.intp)
+        if not len(lat):
+            return []
+        if scores is None:
+            scores = np.full(len(lat), self.default_score)
+        scores = np.clip(np.asarray(scores, dtype=np.float64), 0.0, 1.0)
+        if self.origin is None:
+            self.origin = (float(lat[0]), float(lng[0]))
+        points = wgs84_to_local(lat, lng, *self.origin)
+        labels = np.asarray(labels)
+
+        touched: list[int] = []
+        for label in np.unique(labels).tolist():
+            selected = np.nonzero(labels == label)[0]
+            ids = self._update_label(
+                label, points[selected], scores[selected], timestamp
+            )
+            self.last_ids[selected] = ids
+            touched.extend(ids)
+        if not touched:
+            return []
+
+        touched.sort()
+        positions = np.array([self._position(object_id) for object_id in touched])
+        coordinates = calculate_new_coordinates_batch(
+            *self.origin, positions, mode="fast"
+        )
+        changed = []
+        for object_id, (x, y), (new_lat, new_lng) in zip(
+            touched, positions.tolist(), coordinates.tolist()
+        ):
+            obj = self.objects[object_id]
+            obj.lat, obj.lng = new_lat, new_lng
+            reported = self._reported[object_id]
+            if (
+                obj.observations == 1
+                or np.hypot(x - reported[0], y - reported[1]) >= self.min_move
+                or obj.confidence - reported[2] >= self.min_confidence_change
+            ):
+                self._reported[object_id] = (x, y, obj.confidence)
+                changed.append(obj)
+        return changed
+
+    def _position(self, object_id: int) -> np.ndarray:
+        label = self.objects[object_id].label
+        return self._indexes[label].points[self._slots[object_id]]
+
+    def _update_label(
+        self, label: str, points: np.ndarray, scores: np.ndarray, timestamp: float
+    ) -> list[int]:
+        """Match one label's detections to its objects; return their ids."""
+
+        index = self._indexes.get(label)
+        if index is None:
+            index = self._indexes[label] = GridIndex(self.radius)
+            self._ids[label] = []
+        ids = self._ids[label]
+
+        query, stored, distance = index.pairs_within(points, self.radius)
+        pairs = _greedy(query, stored, distance)
+        touched = [0] * len(points)
+        for detection, slot in pairs.tolist():
+            object_id = ids[slot]
+            obj = self.objects[object_id]
+            # Zero scores still count as an observation, with a tiny weight.
+            score = float(scores[detection])
+            weight = self._weights[object_id]
+            added = max(score, 1e-6)
+            index.move(
+                slot,
+                (index.points[slot] * weight + points[detection] * added)
+                / (weight + added),
+            )
+            self._weights[object_id] = weight + added
+            obj.observations += 1
+            obj.confidence = 1.0 - (1.0 - obj.confidence) * (1.0 - score)
+            obj.last_seen = timestamp
+            touched[detection] = object_id
+
+        new = np.setdiff1d(np.arange(len(points)), pairs[:, 0])
+        for detection, slot in zip(new.tolist(), index.insert(points[new]).tolist()):
+            object_id = len(self.objects)
+            score = float(scores[detection])
+            ids.append(object_id)
+            self._slots.append(slot)
+            self._weights.append(max(score, 1e-6))
+            self._reported.append((np.nan, np.nan, np.nan))
+            self.objects.append(
+                FusedObject(object_id, label, 0.0, 0.0, 1, score, timestamp, timestamp)
+            )
+            touched[detection] = object_id
+        return touched
+
+    def save(self, path: str) -> None:
+        """Write the map to a JSON file readable by :meth:`load`."""
+
+        state = {
+            "radius": self.radius,
+            "min_move": self.min_move,
+            "min_confidence_change": self.min_confidence_change,
+            "default_score": self.default_score,
+            "origin": self.origin,
+            "objects": [
+                {**asdict(obj), "weight": weight, "reported": reported}
+                for obj, weight, reported in zip(
+                    self.objects, self._weights, self._reported
+                )
+            ],
+        }
+        with open(path, "w") as f:
+            json.dump(state, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "ObjectMap":
+        with open(path) as f:
+            state = json.load(f)
+        fusion = cls(
+            state["radius"],
+            state["min_move"],
+            state["min_confidence_change"],
+            state["default_score"],
+        )
+        if state["origin"] is not None:
+            fusion.origin = tuple(state["origin"])
+        for record in state["objects"]:
+            weight = record.pop("weight")
+            reported = tuple(record.pop("reported"))
+            obj = FusedObject(**record)
+            index = fusion._indexes.get(obj.label)
+            if index is None:
+                index = fusion._indexes[obj.label] = GridIndex(fusion.radius)
+                fusion._ids[obj.label] = []
+            (slot,) = index.insert(wgs84_to_local(obj.lat, obj.lng, *fusion.origin))
+            fusion._ids[obj.label].append(obj.object_id)
+            fusion._slots.append(int(slot))
+            fusion._weights.append(weight)
+            fusion._reported.append(reported)
+            fusion.objects.append(obj)
+        return fusion
@@ -0,0 +1,248 @@
+"""Streaming export of geo-located detections to GeoJSON, KML and CSV.
+
+Writers append points in batches straight to the output file, so exporting
+millions of detections never builds the whole document in memory::
+
+    with open_exporter("report.geojson") as exporter:
+        for lat, lng, records in batches:
+            exporter.write(lat, lng, records)
+
+``records`` are dictionaries of extra properties (label, time, ...). Every
+format writes the coordinates as decimal degrees; CSV additionally writes
+degrees, minutes and seconds computed with
+:func:`get_coordinates.degrees_to_d_m_s_batch`.
+"""
+
+import csv
+import json
+import os
+from collections.abc import Iterable
+from typing import IO
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+from .get_coordinates import degrees_to_d_m_s_batch
+
+
+def format_dms(degrees: np.ndarray, positive: str, negative: str) -> list[str]:
+    """Format coordinates as ``50°16'21.500400"N`` strings.
+
+    Args:
+        degrees: ``(N,)`` coordinates in decimal degrees.
+        positive: Hemisphere letter of non-negative values (``N`` or ``E``).
+        negative: Hemisphere letter of negative values (``S`` or ``W``).
+    """
+
+    sign, d, m, s = degrees_to_d_m_s_batch(np.ravel(degrees))
+    return [
+        f"{d_}°{m_:02d}'{s_:09.6f}\"{positive if sign_ > 0 else negative}"
+        for sign_, d_, m_, s_ in zip(sign.tolist(), d.tolist(), m.tolist(), s.tolist())
+    ]
+
+
+class GeoExporter:
+    """Base class of the streaming writers.
+
+    Args:
+        file: Path of the output file or an open text file, which is then
+            left open by :meth:`close`.
+    """
+
+    def __init__(self, file: str | IO[str]) -> None:
+        if isinstance(file, (str, os.PathLike)):
+            # Closed by close(); exporters are streamed across many calls.
+            self._file = open(file, "w", newline="", encoding="utf-8")  # noqa: SIM115
+            self._owned = True
+        else:
+            self._file = file
+            self._owned = False
+        self.count = 0
+        self._header()
+
+    def __enter__(self) -> "GeoExporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _header(self) -> None:
+        pass
+
+    def _footer(self) -> None:
+        pass
+
+    def _write(self, lat: list[float], lng: list[float], records: list[dict]) -> None:
+        raise NotImplementedError
+
+    def write(
+        self,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        records: Iterable[dict] | None = None,
+    ) -> None:
+        """Append a batch of points.
+
+        Args:
+            lat: ``(N,)`` latitudes in decimal degrees.
+            lng: ``(N,)`` longitudes in decimal degrees.
+            records: ``N`` dictionaries of JSON-serializable properties.
+        """
+
+        lat = np.ravel(np.asarray(lat, dtype=np.float64))
+        lng = np.ravel(np.asarray(lng, dtype=np.float64))
+        records = [{}] * len(lat) if records is None else list(records)
+        if not len(lat) == len(lng) == len(records):
+            raise ValueError("lat, lng and records must have the same length")
+        if len(lat):
+            self._write(lat.tolist(), lng.tolist(), records)
+            self.count += len(lat)
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self._footer()
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+        self._file = None
+
+
+class GeoJSONExporter(GeoExporter):
+    """RFC 7946 ``FeatureCollection`` of ``Point`` features."""
+
+    def _header(self) -> None:
+        self._file.write('{"type": "FeatureCollection", "features": [\n')
+
+    def _write(self, lat: list[float], lng: list[float], records: list[dict]) -> None:
+        dumps = json.dumps
+        features = [
+            '{"type": "Feature", "geometry": {"type": "Point", "coordinates": '
+            f'[{x!r}, {y!r}]}}, "properties": {dumps(record)}}}'
+            for y, x, record in zip(lat, lng, records)
+        ]
+        separator = ",\n" if self.count else ""
+        self._file.write(separator + ",\n".join(features))
+
+    def _footer(self) -> None:
+        self._file.write("\n]}\n")
+
+
+class KMLExporter(GeoExporter):
+    """KML document with one ``Placemark`` per point.
+
+    The ``name`` (or ``label``) property names the placemark; all properties
+    are kept as ``ExtendedData``.
+    """
+
+    def _header(self) -> None:
+        self._file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<kml xmlns="http://www.opengis.net/kml/2.2">\n<Document>\n'
+        )
+
+    def _write(self, lat: list[float], lng: list[float], records: list[dict]) -> None:
+        placemarks = []
+        for y, x, record in zip(lat, lng, records):
+            name = record.get("name", record.get("label", ""))
+            data = "".join(
+                f"<Data name={quoteattr(str(key))}>"
+                f"<value>{escape(str(value))}</value></Data>"
+                for key, value in record.items()
+            )
+            placemarks.append(
+                f"<Placemark><name>{escape(str(name))}</name>"
+                + (f"<ExtendedData>{data}</ExtendedData>" if data else "")
+                + f"<Point><coordinates>{x!r},{y!r}</coordinates></Point>"
+                "</Placemark>\n"
+            )
+        self._file.write("".join(placemarks))
+
+    def _footer(self) -> None:
+        self._file.write("</Document>\n</kml>\n")
+
+
+class CSVExporter(GeoExporter):
+    """CSV with ``lat``, ``lng``, their DMS strings and the record properties.
+
+    Args:
+        file: Output path or open text file.
+        fieldnames: Property columns. By default the keys of the first
+            record; properties missing from ``fieldnames`` are dropped.
+    """
+
+    def __init__(
+        self, file: str | IO[str], fieldnames: list[str] | None = None
+    ) -> None:
+        self.fieldnames = fieldnames
+        self._writer: csv.DictWriter | None = None
+        super().__init__(file)
+
+    def _write(self, lat: list[float], lng: list[float], records: list[dict]) -> None:
+        if self._writer is None:
+            if self.fieldnames is None:
+                self.fieldnames = list(records[0])
+            self._writer = csv.DictWriter(
+                self._file,
+                ["lat", "lng", "lat_dms", "lng_dms", *self.fieldnames],
+                extrasaction="ignore",
+            )
+            self._writer.writeheader()
+        lat_dms = format_dms(np.array(lat), "N", "S")
+        lng_dms = format_dms(np.array(lng), "E", "W")
+        self._writer.writerows(
+            {**record, "lat": y, "lng": x, "lat_dms": y_dms, "lng_dms": x_dms}
+            for y, x, y_dms, x_dms, record in zip(lat, lng, lat_dms, lng_dms, records)
+        )
+
+    def _footer(self) -> None:
+        if self._writer is None:
+            # No points: still write the header when the columns are known.
+            csv.writer(self._file).writerow(
+                ["lat", "lng", "lat_dms", "lng_dms", *(self.fieldnames or [])]
+            )
+
+
+EXPORTERS = {
+    ".geojson": GeoJSONExporter,
+    ".json": GeoJSONExporter,
+    ".kml": KMLExporter,
+    ".csv": CSVExporter,
+}
+
+
+def open_exporter(path: str) -> GeoExporter:
+    """Return the exporter matching the extension of ``path``."""
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORTERS:
+        raise ValueError(f"Unsupported export format: {extension}")
+    return EXPORTERS[extension](path)
+
+
+def export_points(
+    path: str,
+    lat: np.ndarray,
+    lng: np.ndarray,
+    records: Iterable[dict] | None = None,
+    batch_size: int = 10_000,
+) -> int:
+    """Write points to ``path`` in batches and return how many were written.
+
+    ``records`` may be a generator; it is consumed ``batch_size`` at a time.
+    """
+
+    lat = np.ravel(np.asarray(lat, dtype=np.float64))
+    lng = np.ravel(np.asarray(lng, dtype=np.float64))
+    records = iter(records) if records is not None else None
+    with open_exporter(path) as exporter:
+        for start in range(0, len(lat), batch_size):
+            stop = min(start + batch_size, len(lat))
+            batch = (
+                None
+                if records is None
+                else [next(records) for _ in range(stop - start)]
+            )
+            exporter.write(lat[start:stop], lng[start:stop], batch)
+        return exporter.count
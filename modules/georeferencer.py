@@ -0,0 +1,158 @@
+"""Map image pixels of a drone frame to WGS84 coordinates.
+
+A :class:`GeoReferencer` holds the camera calibration. For every frame it
+builds a :class:`FrameTransform` from the frame telemetry once; mapping
+detections is then one ``cv2.undistortPoints`` call followed by one 3x3
+matrix product for the whole batch.
+
+On flat ground, the ray-plane intersection of :mod:`modules.projection` and
+the tangent-plane conversion of
+:func:`get_coordinates.calculate_new_coordinates_batch` (``mode="fast"``)
+are both projective maps of the normalized image coordinates, so they fold
+into a single homography per frame. With a terrain grid the rays are
+intersected iteratively by :class:`projection.GroundProjector` instead.
+"""
+
+import math
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from .get_coordinates import WGS84_A, WGS84_E2, calculate_new_coordinates_batch
+from .projection import GroundProjector, TerrainGrid, camera_rotation
+
+
+@dataclass(frozen=True)
+class FrameTelemetry:
+    """Drone state when a frame was taken.
+
+    ``altitude`` is in metres above the ground (or above the terrain datum
+    when a terrain grid is used). Angles are in degrees: ``heading`` of the
+    top of the image clockwise from north, gimbal ``pitch`` (``-90`` looks
+    straight down) and ``roll``.
+    """
+
+    lat: float
+    lng: float
+    altitude: float
+    heading: float = 0.0
+    pitch: float = -90.0
+    roll: float = 0.0
+
+
+class FrameTransform:
+    """Pixel to WGS84 mapping of one frame."""
+
+    def __init__(self, georeferencer: "GeoReferencer", telemetry: FrameTelemetry):
+        self.telemetry = telemetry
+        self._georeferencer = georeferencer
+        self._heading = math.radians(telemetry.heading)
+        self._pitch = math.radians(telemetry.pitch)
+        self._roll = math.radians(telemetry.roll)
+
+        # Degrees of latitude/longitude per metre north/east at the drone.
+        phi = math.radians(telemetry.lat)
+        w = 1.0 - WGS84_E2 * math.sin(phi) ** 2
+        deg_per_north = math.degrees(w**1.5 / (WGS84_A * (1.0 - WGS84_E2)))
+        deg_per_east = math.degrees(math.sqrt(w) / (WGS84_A * math.cos(phi)))
+
+        # Normalized (x, y, 1) -> homogeneous (lat, lng, 1): rotate the ray,
+        # scale it to hit the plane ``altitude`` below the camera, then
+        # convert the east/north offset to degrees around the drone.
+        rotation = camera_rotation(self._heading, self._pitch, self._roll)
+        to_ground = np.vstack((rotation[:2] * telemetry.altitude, -rotation[2]))
+        to_degrees = np.array(
+            [
+                [0.0, deg_per_north, telemetry.lat],
+                [deg_per_east, 0.0, telemetry.lng],
+                [0.0, 0.0, 1.0],
+            ]
+        )
+        self.homography = to_degrees @ to_ground
+
+    def to_wgs84(self, pixels: np.ndarray) -> np.ndarray:
+        """Return ``(N, 2)`` ``(lat, lng)`` of ``(N, 2)`` ``(x, y)`` pixels.
+
+        Pixels whose ray does not hit the ground give ``nan``.
+        """
+
+        georeferencer = self._georeferencer
+        pts = np.asarray(pixels, dtype=np.float32).reshape(-1, 1, 2)
+        if len(pts) == 0:
+            return np.empty((0, 2))
+
+        if georeferencer.projector.terrain is not None:
+            t = self.telemetry
+            offsets = georeferencer.projector.project(
+                pts, t.altitude, self._heading, self._pitch, self._roll, t.lat, t.lng
+            )
+            coords = calculate_new_coordinates_batch(
+                t.lat, t.lng, np.nan_to_num(offsets), mode="fast"
+            )
+            coords[np.isnan(offsets).any(axis=1)] = np.nan
+            return coords
+
+        norm = cv2.undistortPoints(
+            pts, georeferencer.camera_matrix, georeferencer.dist_coeffs
+        ).reshape(-1, 2)
+        mapped = norm @ self.homography[:, :2].T + self.homography[:, 2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(mapped[:, 2] > 0, 1.0 / mapped[:, 2], np.nan)
+        return mapped[:, :2] * scale[:, None]
+
+    def centres(self, boxes: np.ndarray) -> np.ndarray:
+        """Return ``(N, 2)`` ``(lat, lng)`` of the centres of pixel boxes.
+
+        Args:
+            boxes: ``(N, 4)`` array of ``(x, y, width, height)`` in pixels,
+                ``(x, y)`` being the top-left corner.
+        """
+
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        return self.to_wgs84(boxes[:, :2] + boxes[:, 2:] / 2)
+
+    def corners(self, boxes: np.ndarray) -> np.ndarray:
+        """Return ``(N, 4, 2)`` ``(lat, lng)`` of box corners.
+
+        Corners are ordered top-left, top-right, bottom-right, bottom-left.
+        """
+
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        x, y, w, h = boxes.T
+        pixels = np.stack(
+            [
+                np.column_stack((x, y)),
+                np.column_stack((x + w, y)),
+                np.column_stack((x + w, y + h)),
+                np.column_stack((x, y + h)),
+            ],
+            axis=1,
+        )
+        return self.to_wgs84(pixels.reshape(-1, 2)).reshape(-1, 4, 2)
+
+
+class GeoReferencer:
+    """Calibrated camera that georeferences frames from their telemetry.
+
+    Args:
+        camera_matrix: 3x3 intrinsic camera matrix for the frame resolution,
+            e.g. from :meth:`camera.CameraRegistry.get`.
+        dist_coeffs: Distortion coefficients for the lens.
+        terrain: Optional elevation grid; the ground is flat without it.
+    """
+
+    def __init__(
+        self,
+        camera_matrix: np.ndarray,
+        dist_coeffs: np.ndarray,
+        terrain: TerrainGrid | None = None,
+    ) -> None:
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.projector = GroundProjector(self.camera_matrix, self.dist_coeffs, terrain)
+
+    def frame(self, telemetry: FrameTelemetry) -> FrameTransform:
+        """Precompute the pixel to WGS84 transform of one frame."""
+
+        return FrameTransform(self, telemetry)
@@ -5,6 +5,11 @@ import numpy as np
 from typing import Tuple
 
 
+# WGS84 ellipsoid: semi-major axis (m) and first eccentricity squared.
+WGS84_A = 6378137.0
+WGS84_E2 = Geodesic.WGS84.f * (2 - Geodesic.WGS84.f)
+
+
 def degrees_to_d_m_s(degrees: float) -> Tuple[int, int, int, float]:
     """Convert decimal degrees to a ``(sign, degrees, minutes, seconds)`` tuple.
 
@@ -57,6 +62,59 @@ def d_m_s_to_degrees(sign: int, d: int, m: int, s: float) -> float:
     return sign * deg_abs
 
 
+def degrees_to_d_m_s_batch(
+    degrees: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized :func:`degrees_to_d_m_s` with the same rounding and carry.
+
+    Seconds are rounded to 6 decimals with ``np.round``, which scales by
+    ``1e6`` before rounding. Values whose scaled seconds are within rounding
+    noise of a half are rounded again with Python's :func:`round`, so every
+    element matches the scalar function exactly.
+
+    Args:
+        degrees: Geographic coordinates in decimal degrees (any shape).
+
+    Returns:
+        ``(sign, d, m, s)`` arrays of the input shape; ``sign``, ``d`` and
+        ``m`` are integer arrays and ``s`` is a float array.
+    """
+
+    degrees = np.asarray(degrees, dtype=np.float64)
+    sign = np.where(degrees < 0, -1, 1)
+    abs_deg = np.abs(degrees)
+
+    d = np.floor(abs_deg)
+    minutes_decimal = (abs_deg - d) * 60
+    m = np.floor(minutes_decimal)
+    s = (minutes_decimal - m) * 60
+
+    scaled = s * 1e6
+    s_rounded = np.round(s, 6)
+    ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ambiguous.any():
+        s_rounded[ambiguous] = [round(value, 6) for value in s[ambiguous].tolist()]
+
+    carry = s_rounded >= 60.0
+    s_rounded[carry] = 0.0
+    m = m + carry
+    carry = m >= 60
+    m[carry] = 0
+    d = d + carry
+
+    return sign, d.astype(np.int64), m.astype(np.int64), s_rounded
+
+
+def d_m_s_to_degrees_batch(
+    sign: np.ndarray, d: np.ndarray, m: np.ndarray, s: np.ndarray
+) -> np.ndarray:
+    """Vectorized :func:`d_m_s_to_degrees`."""
+
+    return np.asarray(sign) * (
+        np.asarray(d) + (np.asarray(m) / 60) + (np.asarray(s, dtype=np.float64) / 3600)
+    )
+
+
 def pixels_to_meters(
     pixels: float,
     altitude: float,
@@ -119,6 +177,61 @@ def translate(
     return delta_x_meters, delta_y_meters
 
 
+def normalized_to_ground(
+    norm: np.ndarray,
+    altitude: float,
+    angle: float = 0.0,
+) -> np.ndarray:
+    """Project normalized camera coordinates onto the ground below the camera.
+
+    Args:
+        norm: ``(N, 2)`` array of undistorted, normalized image coordinates.
+        altitude: Altitude of the camera in meters.
+        angle: Optional rotation of the image around the optical axis (radians).
+
+    Returns:
+        ``(N, 2)`` array of ``(delta_x_meters, delta_y_meters)`` offsets with
+        the same conventions as :func:`translate`.
+    """
+
+    ground = np.asarray(norm, dtype=np.float64).reshape(-1, 2) * altitude
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    # Rotate around the Z axis and flip Y so that positive values point north.
+    rotation = np.array([[cos_a, -sin_a], [-sin_a, -cos_a]])
+    return ground @ rotation
+
+
+def translate_batch(
+    pixels: np.ndarray,
+    altitude: float,
+    camera_matrix: np.ndarray,
+    dist_coeffs: np.ndarray,
+    angle: float = 0.0,
+) -> np.ndarray:
+    """Vectorized :func:`translate` for many pixels at once.
+
+    All pixels are undistorted with a single ``cv2.undistortPoints`` call and
+    rotated with one matrix product.
+
+    Args:
+        pixels: ``(N, 2)`` array of ``(x, y)`` pixel coordinates.
+        altitude: Altitude of the camera in meters.
+        camera_matrix: 3x3 intrinsic camera matrix ``[[fx,0,cx],[0,fy,cy],[0,0,1]]``.
+        dist_coeffs: Distortion coefficients for the lens.
+        angle: Optional rotation of the image around the optical axis (radians).
+
+    Returns:
+        ``(N, 2)`` array of ``(delta_x_meters, delta_y_meters)`` offsets from
+        the image centre in metres.
+    """
+
+    pts = np.asarray(pixels, dtype=np.float32).reshape(-1, 1, 2)
+    if len(pts) == 0:
+        return np.empty((0, 2))
+    norm = cv2.undistortPoints(pts, camera_matrix, dist_coeffs)
+    return normalized_to_ground(norm, altitude, angle)
+
+
 def calculate_new_coordinates(
     lat: float,  # lateral position of drone
     lng: float,  # longitudinal position of drone
@@ -155,3 +268,87 @@ def calculate_new_coordinates(
     new_lat = res["lat2"]
     new_lng = res["lon2"]
     return new_lat, new_lng
+
+
+def calculate_new_coordinates_batch(
+    lat: float | np.ndarray,
+    lng: float | np.ndarray,
+    deltas: np.ndarray,
+    mode: str = "exact",
+) -> np.ndarray:
+    """Vectorized :func:`calculate_new_coordinates` for many offsets at once.
+
+    ``mode="exact"`` solves the direct geodesic problem with ``geographiclib``
+    for every offset. ``mode="fast"`` treats the offsets as east/north
+    coordinates on the local tangent plane at ``(lat, lng)`` and scales them by
+    the WGS84 meridional and prime vertical radii of curvature. Its error
+    grows with the square of the distance ``d``: it stays below
+    ``d**2 * (1 + abs(tan(lat))) / WGS84_A`` metres, i.e. about 4 mm for
+    100 m offsets at 50 degrees latitude, which is well within detection
+    accuracy for offsets of tens of metres.
+
+    Args:
+        lat: Latitude of the drone in decimal degrees (scalar or ``(N,)``).
+        lng: Longitude of the drone in decimal degrees (scalar or ``(N,)``).
+        deltas: ``(N, 2)`` array of ``(delta_x_meters, delta_y_meters)``
+            offsets, x pointing east and y pointing north.
+        mode: ``"exact"`` or ``"fast"``.
+
+    Returns:
+        ``(N, 2)`` array of ``(new_lat, new_lng)`` in decimal degrees.
+    """
+
+    deltas = np.asarray(deltas, dtype=np.float64).reshape(-1, 2)
+    lat = np.broadcast_to(np.asarray(lat, dtype=np.float64), len(deltas))
+    lng = np.broadcast_to(np.asarray(lng, dtype=np.float64), len(deltas))
+
+    if mode == "exact":
+        return np.array(
+            [
+                calculate_new_coordinates(la, ln, dx, dy)
+                for la, ln, (dx, dy) in zip(lat, lng, deltas)
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+    if mode != "fast":
+        raise ValueError(f"Unknown mode: {mode}")
+
+    phi = np.radians(lat)
+    w = 1.0 - WGS84_E2 * np.sin(phi) ** 2
+    meridional = WGS84_A * (1.0 - WGS84_E2) / w**1.5
+    prime_vertical = WGS84_A / np.sqrt(w)
+
+    new_lat = lat + np.degrees(deltas[:, 1] / meridional)
+    new_lng = lng + np.degrees(deltas[:, 0] / (prime_vertical * np.cos(phi)))
+    return np.column_stack((new_lat, new_lng))
+
+
+def wgs84_to_local(
+    lat: float | np.ndarray,
+    lng: float | np.ndarray,
+    origin_lat: float,
+    origin_lng: float,
+) -> np.ndarray:
+    """Inverse of :func:`calculate_new_coordinates_batch` with ``mode="fast"``.
+
+    Args:
+        lat: Latitudes in decimal degrees (scalar or ``(N,)``).
+        lng: Longitudes in decimal degrees (scalar or ``(N,)``).
+        origin_lat: Latitude of the tangent point in decimal degrees.
+        origin_lng: Longitude of the tangent point in decimal degrees.
+
+    Returns:
+        ``(N, 2)`` array of ``(delta_x_meters, delta_y_meters)`` offsets from
+        the origin, x pointing east and y pointing north.
+    """
+
+    phi = math.radians(origin_lat)
+    w = 1.0 - WGS84_E2 * math.sin(phi) ** 2
+    meridional = WGS84_A * (1.0 - WGS84_E2) / w**1.5
+    prime_vertical = WGS84_A / math.sqrt(w)
+
+    north = np.radians(np.asarray(lat, dtype=np.float64) - origin_lat) * meridional
+    east = np.radians(np.asarray(lng, dtype=np.float64) - origin_lng) * (
+        prime_vertical * math.cos(phi)
+    )
+    return np.column_stack((np.ravel(east), np.ravel(north)))
@@ -0,0 +1,203 @@
+"""Keyframe selection: forward only sharp, well exposed frames of new ground.
+
+Model calls are by far the most expensive step of the pipeline, so frames
+are screened with cheap OpenCV operations on a small grayscale copy first:
+
+* sharpness is the variance of the Laplacian, which drops sharply with
+  motion blur and defocus; it is compared with a fixed floor and with a
+  moving average of recent frames, since its absolute value depends on the
+  scene,
+* exposure is the mean brightness and the fraction of clipped pixels,
+* overlap with the previous keyframe comes from the translation found by
+  ``cv2.phaseCorrelate``; frames that still mostly show the same ground are
+  skipped.
+
+:class:`KeyframeSelector` keeps the counters needed to report how many
+frames were selected and why the others were rejected, and
+:func:`iter_keyframes` applies it to a :class:`capture.LatestFrameGrabber`.
+"""
+
+import time
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from .capture import LatestFrameGrabber
+
+REASONS = ("selected", "blur", "exposure", "overlap", "budget")
+
+
+@dataclass(frozen=True)
+class FrameScore:
+    """Scores of one frame and the selection decision.
+
+    ``overlap`` is the estimated fraction of the frame that shows the same
+    ground as the previous keyframe (``0`` for the first frame or when the
+    correlation is too weak to trust), ``shift`` the estimated translation
+    to the previous keyframe in pixels of the full frame.
+    """
+
+    sharpness: float
+    brightness: float
+    clipped: float
+    overlap: float
+    shift: tuple[float, float]
+    reason: str
+
+    @property
+    def selected(self) -> bool:
+        return self.reason == "selected"
+
+
+class KeyframeSelector:
+    """Score frames and decide which ones to forward.
+
+    Args:
+        width: Width in pixels of the grayscale copy used for scoring.
+        min_sharpness: Minimal Laplacian variance of the scoring copy.
+        relative_sharpness: Frames less sharp than this fraction of the
+            moving average of recent frames count as blurred.
+        brightness_range: Accepted range of the mean brightness (0-255).
+        max_clipped: Maximal fraction of pixels at 0-5 or 250-255.
+        max_overlap: Frames overlapping the previous keyframe more than this
+            are skipped.
+        min_response: Minimal ``cv2.phaseCorrelate`` response for the
+            estimated shift to be trusted; weaker matches count as new
+            ground.
+        max_fraction: Upper bound of the fraction of considered frames that
+            may be selected, ``None`` for no bound.
+    """
+
+    def __init__(
+        self,
+        width: int = 320,
+        min_sharpness: float = 50.0,
+        relative_sharpness: float = 0.5,
+        brightness_range: tuple[float, float] = (40.0, 215.0),
+        max_clipped: float = 0.25,
+        max_overlap: float = 0.6,
+        min_response: float = 0.05,
+        max_fraction: float | None = None,
+    ) -> None:
+        self.width = width
+        self.min_sharpness = min_sharpness
+        self.relative_sharpness = relative_sharpness
+        self.brightness_range = brightness_range
+        self.max_clipped = max_clipped
+        self.max_overlap = max_overlap
+        self.min_response = min_response
+        self.max_fraction = max_fraction
+        self.counts: Counter[str] = Counter()
+        self._reference: np.ndarray | None = None
+        self._window: np.ndarray | None = None
+        self._sharpness_level: float | None = None
+
+    @property
+    def considered(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def selected_fraction(self) -> float:
+        return self.counts["selected"] / self.considered if self.considered else 0.0
+
+    def report(self) -> dict:
+        """Return the selection counters and settings, JSON serializable."""
+
+        return {
+            "considered": self.considered,
+            "selected_fraction": self.selected_fraction,
+            "counts": {reason: self.counts[reason] for reason in REASONS},
+            "thresholds": {
+                "min_sharpness": self.min_sharpness,
+                "relative_sharpness": self.relative_sharpness,
+                "brightness_range": list(self.brightness_range),
+                "max_clipped": self.max_clipped,
+                "max_overlap": self.max_overlap,
+                "max_fraction": self.max_fraction,
+            },
+        }
+
+    def _prepare(self, frame: np.ndarray) -> tuple[np.ndarray, float]:
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        scale = self.width / gray.shape[1]
+        if scale < 1:
+            height = max(1, round(gray.shape[0] * scale))
+            gray = cv2.resize(gray, (self.width, height), interpolation=cv2.INTER_AREA)
+        else:
+            scale = 1.0
+        return gray, scale
+
+    def _overlap(
+        self, small: np.ndarray, scale: float
+    ) -> tuple[float, tuple[float, float]]:
+        if self._reference is None or self._reference.shape != small.shape:
+            return 0.0, (0.0, 0.0)
+        if self._window is None or self._window.shape != small.shape:
+            self._window = cv2.createHanningWindow(small.shape[::-1], cv2.CV_32F)
+        (dx, dy), response = cv2.phaseCorrelate(
+            self._reference, small.astype(np.float32), self._window
+        )
+        if response < self.min_response:
+            return 0.0, (0.0, 0.0)
+        height, width = small.shape
+        overlap = max(0.0, 1 - abs(dx) / width) * max(0.0, 1 - abs(dy) / height)
+        return overlap, (dx / scale, dy / scale)
+
+    def consider(self, frame: np.ndarray) -> FrameScore:
+        """Score ``frame``, count the decision and remember it if selected."""
+
+        small, scale = self._prepare(frame)
+        _, deviation = cv2.meanStdDev(cv2.Laplacian(small, cv2.CV_32F))
+        sharpness = float(deviation[0, 0]) ** 2
+        histogram = np.ravel(cv2.calcHist([small], [0], None, [256], [0, 256]))
+        brightness = float(histogram @ np.arange(256)) / small.size
+        clipped = float(histogram[:6].sum() + histogram[250:].sum()) / small.size
+        overlap, shift = self._overlap(small, scale)
+        if self._sharpness_level is None:
+            self._sharpness_level = sharpness
+        level = self._sharpness_level
+        self._sharpness_level += 0.1 * (sharpness - level)
+
+        low, high = self.brightness_range
+        over_budget = self.max_fraction is not None and (
+            self.counts["selected"] + 1 > self.max_fraction * (self.considered + 1)
+        )
+        if sharpness < max(self.min_sharpness, self.relative_sharpness * level):
+            reason = "blur"
+        elif not low <= brightness <= high or clipped > self.max_clipped:
+            reason = "exposure"
+        elif overlap > self.max_overlap:
+            reason = "overlap"
+        elif over_budget:
+            reason = "budget"
+        else:
+            reason = "selected"
+            self._reference = small.astype(np.float32)
+
+        self.counts[reason] += 1
+        return FrameScore(sharpness, brightness, clipped, overlap, shift, reason)
+
+
+def iter_keyframes(
+    grabber: LatestFrameGrabber,
+    selector: KeyframeSelector,
+    duration: float | None = None,
+    timeout: float = 5.0,
+) -> Iterator[tuple[np.ndarray, float, FrameScore]]:
+    """Yield ``(frame, timestamp, score)`` of the keyframes of a live grabber.
+
+    Every fresh frame of ``grabber`` is scored; only selected ones are
+    yielded. Stops after ``duration`` seconds (``None`` runs until the
+    caller stops iterating) and raises ``TimeoutError`` if the stream
+    delivers no frame for ``timeout`` seconds.
+    """
+
+    end = None if duration is None else time.monotonic() + duration
+    while end is None or time.monotonic() < end:
+        frame, timestamp = grabber.read(timeout=timeout)
+        score = selector.consider(frame)
+        if score.selected:
+            yield frame, timestamp, score
@@ -0,0 +1,418 @@
+"""Orthorectified mosaic of mission frames, written tile by tile.
+
+Every frame is warped onto a north-up ground grid of ``gsd`` metres per pixel
+centred on the mission origin. For each mosaic pixel covered by the frame's
+footprint the ray back to the camera is projected into the image with the
+lens model (``cv2.projectPoints``), and the frame is resampled with
+``cv2.remap``. Overlapping frames are blended with weights that fade towards
+the image border.
+
+Frames are warped in a process pool. The parent process adds the warped
+patches into per-tile accumulators kept as ``.npy`` memory maps in the output
+directory, so memory use depends on the tile size and the number of frames in
+flight, not on the mission length. :meth:`MosaicWriter.finalize` turns the
+accumulators into BGRA PNG tiles and a ``mosaic.json`` index with their
+WGS84 bounds.
+
+Run offline on a folder of frames with::
+
+    python -m modules.mosaic FRAMES_DIR TELEMETRY --out mosaic
+
+where ``FRAMES_DIR/frames.csv`` (or ``--index``) lists ``file,time`` for each
+frame and ``TELEMETRY`` is any log read by :class:`telemetry.TelemetryLog`.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from .camera import CameraRegistry
+from .georeferencer import FrameTelemetry
+from .get_coordinates import WGS84_A, WGS84_E2
+from .projection import camera_rotation
+from .telemetry import TelemetryLog
+
+
+@dataclass(frozen=True)
+class MosaicGrid:
+    """North-up ground grid split into square tiles.
+
+    Mosaic pixel ``(col, row)`` covers the square whose north-west corner is
+    ``col * gsd`` metres east and ``row * gsd`` metres south of the origin.
+    Tile ``(tx, ty)`` holds columns ``tx * tile_size`` to
+    ``(tx + 1) * tile_size - 1`` and the matching rows.
+    """
+
+    origin_lat: float
+    origin_lng: float
+    gsd: float = 0.05
+    tile_size: int = 1024
+
+    def _degrees_per_metre(self) -> tuple[float, float]:
+        phi = math.radians(self.origin_lat)
+        w = 1.0 - WGS84_E2 * math.sin(phi) ** 2
+        per_north = math.degrees(w**1.5 / (WGS84_A * (1.0 - WGS84_E2)))
+        per_east = math.degrees(math.sqrt(w) / (WGS84_A * math.cos(phi)))
+        return per_north, per_east
+
+    def to_metres(self, lat: float, lng: float) -> tuple[float, float]:
+        """Return the east/north offset of ``(lat, lng)`` from the origin."""
+
+        per_north, per_east = self._degrees_per_metre()
+        return (lng - self.origin_lng) / per_east, (lat - self.origin_lat) / per_north
+
+    def to_wgs84(self, east: float, north: float) -> tuple[float, float]:
+        per_north, per_east = self._degrees_per_metre()
+        return self.origin_lat + north * per_north, self.origin_lng + east * per_east
+
+
+class MosaicWriter:
+    """Accumulate warped patches into on-disk tiles."""
+
+    def __init__(self, out_dir: str, grid: MosaicGrid) -> None:
+        self.out_dir = out_dir
+        self.grid = grid
+        self.tiles: set[tuple[int, int]] = set()
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _accumulators(self, tx: int, ty: int) -> tuple[np.ndarray, np.ndarray]:
+        size = self.grid.tile_size
+        mode = "r+" if (tx, ty) in self.tiles else "w+"
+        self.tiles.add((tx, ty))
+        colour = np.lib.format.open_memmap(
+            os.path.join(self.out_dir, f"tile_{tx}_{ty}.sum.npy"),
+            mode,
+            np.float32,
+            (size, size, 3),
+        )
+        weight = np.lib.format.open_memmap(
+            os.path.join(self.out_dir, f"tile_{tx}_{ty}.weight.npy"),
+            mode,
+            np.float32,
+            (size, size),
+        )
+        return colour, weight
+
+    def add(self, patches: list[tuple]) -> None:
+        """Add ``(tx, ty, row, col, colour, weight)`` patches from :func:`warp_frame`."""
+
+        for tx, ty, row, col, colour, weight in patches:
+            acc_colour, acc_weight = self._accumulators(tx, ty)
+            h, w = weight.shape
+            acc_colour[row : row + h, col : col + w] += colour
+            acc_weight[row : row + h, col : col + w] += weight
+            acc_colour.flush()
+            acc_weight.flush()
+            del acc_colour, acc_weight
+
+    def finalize(self, keep_accumulators: bool = False) -> dict:
+        """Write PNG tiles and ``mosaic.json``; return the index."""
+
+        grid = self.grid
+        size = grid.tile_size
+        entries = []
+        for tx, ty in sorted(self.tiles):
+            colour, weight = self._accumulators(tx, ty)
+            covered = weight > 0
+            tile = np.zeros((size, size, 4), dtype=np.uint8)
+            tile[covered, :3] = np.clip(
+                colour[covered] / weight[covered, None] + 0.5, 0, 255
+            )
+            tile[covered, 3] = 255
+            del colour, weight
+            name = f"tile_{tx}_{ty}.png"
+            cv2.imwrite(os.path.join(self.out_dir, name), tile)
+            if not keep_accumulators:
+                for suffix in ("sum", "weight"):
+                    os.remove(
+                        os.path.join(self.out_dir, f"tile_{tx}_{ty}.{suffix}.npy")
+                    )
+
+            north, west = grid.to_wgs84(tx * size * grid.gsd, -ty * size * grid.gsd)
+            south, east = grid.to_wgs84(
+                (tx + 1) * size * grid.gsd, -(ty + 1) * size * grid.gsd
+            )
+            entries.append(
+                {
+                    "file": name,
+                    "x": tx,
+                    "y": ty,
+                    "bounds": [[north, west], [south, east]],
+                }
+            )
+
+        index = {
+            "origin": [grid.origin_lat, grid.origin_lng],
+            "gsd": grid.gsd,
+            "tile_size": size,
+            "tiles": entries,
+        }
+        with open(os.path.join(self.out_dir, "mosaic.json"), "w") as f:
+            json.dump(index, f, indent=2)
+        return index
+
+
+# Mosaic pixels between exactly projected samples of the remap tables.
+MAP_STEP = 8
+
+_registry: CameraRegistry | None = None
+
+
+def _init_worker(camera_matrix, dist_coeffs, resolution) -> None:
+    global _registry
+    _registry = CameraRegistry()
+    _registry.register("mosaic", camera_matrix, dist_coeffs, resolution)
+
+
+def _upsample(coarse: np.ndarray, rows: int, cols: int) -> np.ndarray:
+    """Bilinearly upsample maps sampled every ``MAP_STEP`` pixels."""
+
+    def axis_weights(n: int, samples: int) -> tuple[np.ndarray, np.ndarray]:
+        position = np.arange(n) / MAP_STEP
+        index = np.minimum(position.astype(np.intp), samples - 2)
+        return index, (position - index).astype(np.float32)
+
+    coarse = coarse.astype(np.float32)
+    y, fy = axis_weights(rows, coarse.shape[0])
+    x, fx = axis_weights(cols, coarse.shape[1])
+    vertical = coarse[y] + (coarse[y + 1] - coarse[y]) * fy[:, None, None]
+    return vertical[:, x] + (vertical[:, x + 1] - vertical[:, x]) * fx[None, :, None]
+
+
+def _border_weight(height: int, width: int) -> np.ndarray:
+    """Blend weight of every image pixel, 1 in the centre fading to 0 at the border."""
+
+    x = np.minimum(np.arange(width), np.arange(width)[::-1]) + 1.0
+    y = np.minimum(np.arange(height), np.arange(height)[::-1]) + 1.0
+    weight = np.minimum.outer(y / y.max(), x / x.max())
+    return weight.astype(np.float32)
+
+
+def warp_frame(
+    path: str,
+    telemetry: FrameTelemetry,
+    grid: MosaicGrid,
+    max_range: float = 5.0,
+) -> list[tuple]:
+    """Warp one frame onto the mosaic grid.
+
+    Ground further than ``max_range`` times the altitude from the point below
+    the drone is left out, which bounds the footprint of oblique frames.
+
+    Returns:
+        A list of ``(tx, ty, row, col, colour, weight)`` patches: ``colour``
+        is the weighted ``float32`` BGR sum and ``weight`` the blend weights
+        of the tile region starting at ``(row, col)``.
+    """
+
+    image = cv2.imread(path)
+    if image is None:
+        raise ValueError(f"Cannot read frame {path}")
+    height, width = image.shape[:2]
+    camera = _registry.get("mosaic", (width, height))
+    rotation = camera_rotation(
+        math.radians(telemetry.heading),
+        math.radians(telemetry.pitch),
+        math.radians(telemetry.roll),
+    )
+
+    # Field of view in normalized coordinates. Ground points are clamped to
+    # a slightly larger box before projection, so that the distortion
+    # polynomial cannot fold far-away points back into the image.
+    border = np.concatenate(
+        [
+            np.column_stack((np.linspace(0, width - 1, 16), np.zeros(16))),
+            np.column_stack((np.linspace(0, width - 1, 16), np.full(16, height - 1))),
+            np.column_stack((np.zeros(16), np.linspace(0, height - 1, 16))),
+            np.column_stack((np.full(16, width - 1), np.linspace(0, height - 1, 16))),
+        ]
+    ).astype(np.float32)
+    fov = cv2.undistortPoints(
+        border.reshape(-1, 1, 2), camera.camera_matrix, camera.dist_coeffs
+    ).reshape(-1, 2)
+    centre = (fov.min(axis=0) + fov.max(axis=0)) / 2
+    half = (fov.max(axis=0) - fov.min(axis=0)) / 2 * 1.1
+    fov_min, fov_max = centre - half, centre + half
+
+    # Footprint: border rays intersected with the ground, clamped to max_range.
+    altitude = telemetry.altitude
+    rays = np.column_stack((fov, np.ones(len(fov)))) @ rotation.T
+    down = np.maximum(-rays[:, 2], 1e-9)
+    reach = rays[:, :2] * (altitude / down)[:, None]
+    distance = np.linalg.norm(reach, axis=1, keepdims=True)
+    limit = max_range * altitude
+    reach = np.where(distance > limit, reach * limit / distance, reach)
+    reach = np.vstack((reach, [0.0, 0.0]))
+    east0, north0 = grid.to_metres(telemetry.lat, telemetry.lng)
+
+    col_min = math.floor((east0 + reach[:, 0].min()) / grid.gsd)
+    col_max = math.ceil((east0 + reach[:, 0].max()) / grid.gsd)
+    row_min = math.floor(-(north0 + reach[:, 1].max()) / grid.gsd)
+    row_max = math.ceil(-(north0 + reach[:, 1].min()) / grid.gsd)
+
+    # Resample premultiplied colour so that pixels blended with the empty
+    # border get the same share of colour and weight.
+    weight_image = _border_weight(height, width)
+    weighted_image = image.astype(np.float32) * weight_image[..., None]
+    size = grid.tile_size
+    patches = []
+    for ty in range(row_min // size, row_max // size + 1):
+        for tx in range(col_min // size, col_max // size + 1):
+            r0 = max(row_min, ty * size)
+            r1 = min(row_max, (ty + 1) * size)
+            c0 = max(col_min, tx * size)
+            c1 = min(col_max, (tx + 1) * size)
+            if r0 >= r1 or c0 >= c1:
+                continue
+
+            # Project every MAP_STEP-th mosaic pixel and interpolate the rest:
+            # the lens mapping is smooth, projectPoints is not cheap.
+            rows = r0 + np.arange((r1 - r0 - 1) // MAP_STEP + 2) * MAP_STEP
+            cols = c0 + np.arange((c1 - c0 - 1) // MAP_STEP + 2) * MAP_STEP
+            ground = np.empty((len(rows), len(cols), 3))
+            ground[..., 0] = ((cols + 0.5) * grid.gsd - east0)[None, :]
+            ground[..., 1] = (-(rows + 0.5) * grid.gsd - north0)[:, None]
+            ground[..., 2] = -altitude
+            # World to camera coordinates: the transpose of camera_rotation.
+            cam = ground.reshape(-1, 3) @ rotation
+            depth = cam[:, 2]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                norm = cam[:, :2] / depth[:, None]
+            norm[depth <= 0] = fov_max
+            norm = np.clip(norm, fov_min, fov_max)
+            inside = np.all((norm > fov_min) & (norm < fov_max), axis=1)
+            if not inside.any():
+                continue
+
+            points = np.column_stack((norm, np.ones(len(norm))))
+            projected, _ = cv2.projectPoints(
+                points.reshape(-1, 1, 3),
+                np.zeros(3),
+                np.zeros(3),
+                camera.camera_matrix,
+                camera.dist_coeffs,
+            )
+            maps = _upsample(
+                projected.reshape(len(rows), len(cols), 2), r1 - r0, c1 - c0
+            )
+            weight = cv2.remap(
+                weight_image, maps, None, cv2.INTER_LINEAR, borderValue=0
+            )
+            colour = cv2.remap(
+                weighted_image, maps, None, cv2.INTER_LINEAR, borderValue=0
+            )
+            patches.append((tx, ty, r0 - ty * size, c0 - tx * size, colour, weight))
+    return patches
+
+
+def build_mosaic(
+    frames: list[tuple[str, FrameTelemetry]],
+    out_dir: str,
+    camera_matrix: np.ndarray,
+    dist_coeffs: np.ndarray,
+    resolution: tuple[int, int],
+    gsd: float = 0.05,
+    tile_size: int = 1024,
+    workers: int | None = None,
+    origin: tuple[float, float] | None = None,
+) -> dict:
+    """Warp ``frames`` onto a tiled mosaic in ``out_dir`` and return its index.
+
+    Args:
+        frames: ``(path, telemetry)`` for every frame.
+        camera_matrix: Intrinsics calibrated at ``resolution``; they are
+            rescaled to the resolution of each frame.
+        dist_coeffs: Distortion coefficients for the lens.
+        resolution: ``(width, height)`` of the calibration.
+        gsd: Ground sampling distance of the mosaic in metres per pixel.
+        tile_size: Side of the square tiles in pixels.
+        workers: Size of the process pool (``os.cpu_count()`` by default);
+            ``0`` warps the frames in the calling process.
+        origin: ``(lat, lng)`` of the grid origin, the first frame by default.
+    """
+
+    if not frames:
+        raise ValueError("No frames to mosaic")
+    if origin is None:
+        origin = (frames[0][1].lat, frames[0][1].lng)
+    grid = MosaicGrid(origin[0], origin[1], gsd, tile_size)
+    writer = MosaicWriter(out_dir, grid)
+    init_args = (camera_matrix, dist_coeffs, tuple(resolution))
+
+    if workers == 0:
+        _init_worker(*init_args)
+        for path, telemetry in frames:
+            writer.add(warp_frame(path, telemetry, grid))
+        return writer.finalize()
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=init_args
+    ) as pool:
+        # Keep a bounded number of frames in flight so that finished patches
+        # never pile up in memory faster than they are written.
+        pending = set()
+        for path, telemetry in frames:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    writer.add(future.result())
+            pending.add(pool.submit(warp_frame, path, telemetry, grid))
+        for future in pending:
+            writer.add(future.result())
+    return writer.finalize()
+
+
+def read_frame_index(frames_dir: str, index_path: str) -> list[tuple[str, float]]:
+    """Read ``file,time`` rows naming frames relative to ``frames_dir``."""
+
+    with open(index_path, newline="") as f:
+        return [
+            (os.path.join(frames_dir, row["file"]), float(row["time"]))
+            for row in csv.DictReader(f)
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build a mosaic from mission frames.")
+    parser.add_argument("frames_dir")
+    parser.add_argument("telemetry", help="CSV, JSON or MAVLink JSON-lines log")
+    parser.add_argument("--index", help="file,time CSV (default FRAMES_DIR/frames.csv)")
+    parser.add_argument("--out", default="mosaic")
+    parser.add_argument("--camera", default="camera_dependencies/Yuneec.npz")
+    parser.add_argument("--gsd", type=float, default=0.05, help="metres per pixel")
+    parser.add_argument("--tile-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    log = TelemetryLog.load(args.telemetry)
+    index = read_frame_index(
+        args.frames_dir, args.index or os.path.join(args.frames_dir, "frames.csv")
+    )
+    frames = [(path, log.frame(t)) for path, t in index]
+
+    registry = CameraRegistry()
+    registry.load("camera", args.camera)
+    camera = registry.get("camera")
+    result = build_mosaic(
+        frames,
+        args.out,
+        camera.camera_matrix,
+        camera.dist_coeffs,
+        camera.resolution,
+        args.gsd,
+        args.tile_size,
+        args.workers,
+    )
+    print(f"Wrote {len(result['tiles'])} tiles to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
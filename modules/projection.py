@@ -0,0 +1,196 @@
+"""Project pixels onto the ground for an arbitrary camera attitude.
+
+:func:`get_coordinates.translate` assumes a camera looking straight down. The
+:class:`GroundProjector` instead casts a ray through every pixel using the
+full gimbal attitude and intersects it with the ground: a horizontal plane,
+or a :class:`TerrainGrid` of elevations when one is given.
+
+Offsets are returned as ``(delta_x_meters, delta_y_meters)`` pointing east
+and north, as in :func:`get_coordinates.translate`, so they can be passed to
+:func:`get_coordinates.calculate_new_coordinates_batch`.
+
+Attitude conventions (all angles in radians):
+
+* ``yaw``: heading of the top of the image, clockwise from north. For a
+  nadir camera it is the same as the ``angle`` of ``translate``.
+* ``pitch``: elevation of the optical axis above the horizon; ``0`` looks
+  forward at the horizon and ``-pi / 2`` straight down.
+* ``roll``: right-handed rotation about the optical axis; positive values
+  turn the right side of the image downward.
+"""
+
+import math
+
+import cv2
+import numpy as np
+
+from .get_coordinates import calculate_new_coordinates_batch
+
+NADIR = -math.pi / 2
+
+# Camera axes (x right, y down, z forward) of a level camera looking north,
+# expressed in east/north/up coordinates.
+_LEVEL_CAMERA = np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.0, -1.0, 0.0]])
+
+
+def camera_rotation(yaw: float, pitch: float = NADIR, roll: float = 0.0) -> np.ndarray:
+    """Return the 3x3 matrix turning camera-frame vectors into east/north/up."""
+
+    cy, sy = math.cos(yaw), math.sin(yaw)
+    cp, sp = math.cos(pitch), math.sin(pitch)
+    cr, sr = math.cos(roll), math.sin(roll)
+    heading = np.array([[cy, sy, 0.0], [-sy, cy, 0.0], [0.0, 0.0, 1.0]])
+    tilt = np.array([[1.0, 0.0, 0.0], [0.0, cp, -sp], [0.0, sp, cp]])
+    spin = np.array([[cr, -sr, 0.0], [sr, cr, 0.0], [0.0, 0.0, 1.0]])
+    return heading @ _LEVEL_CAMERA @ tilt @ spin
+
+
+class TerrainGrid:
+    """Ground elevations on a regular latitude/longitude grid.
+
+    Args:
+        elevation: ``(rows, cols)`` elevations in metres, row ``0`` being the
+            northernmost one.
+        origin: ``(lat, lng)`` of sample ``[0, 0]`` in decimal degrees.
+        resolution: ``(dlat, dlng)`` spacing between samples in degrees.
+    """
+
+    def __init__(
+        self,
+        elevation: np.ndarray,
+        origin: tuple[float, float],
+        resolution: tuple[float, float],
+    ) -> None:
+        self.elevation = np.asarray(elevation, dtype=np.float64)
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.resolution = (float(resolution[0]), float(resolution[1]))
+
+    @classmethod
+    def load(cls, path: str) -> "TerrainGrid":
+        """Load an ``.npz`` file with ``elevation``, ``origin`` and ``resolution``."""
+
+        with np.load(path) as data:
+            return cls(data["elevation"], data["origin"], data["resolution"])
+
+    def sample(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """Bilinearly interpolate the elevation at the given coordinates.
+
+        Points outside the grid take the elevation of the nearest edge.
+        """
+
+        rows, cols = self.elevation.shape
+        r = np.clip(
+            (self.origin[0] - np.asarray(lat)) / self.resolution[0], 0, rows - 1
+        )
+        c = np.clip(
+            (np.asarray(lng) - self.origin[1]) / self.resolution[1], 0, cols - 1
+        )
+        r0 = np.minimum(r.astype(np.intp), max(rows - 2, 0))
+        c0 = np.minimum(c.astype(np.intp), max(cols - 2, 0))
+        r1 = np.minimum(r0 + 1, rows - 1)
+        c1 = np.minimum(c0 + 1, cols - 1)
+        fr, fc = r - r0, c - c0
+        z = self.elevation
+        top = z[r0, c0] * (1 - fc) + z[r0, c1] * fc
+        bottom = z[r1, c0] * (1 - fc) + z[r1, c1] * fc
+        return top * (1 - fr) + bottom * fr
+
+
+class GroundProjector:
+    """Cast pixel rays of a calibrated camera onto the ground.
+
+    Args:
+        camera_matrix: 3x3 intrinsic camera matrix ``[[fx,0,cx],[0,fy,cy],[0,0,1]]``.
+        dist_coeffs: Distortion coefficients for the lens.
+        terrain: Optional elevation grid. Without it the ground is the plane
+            ``altitude`` metres below the camera.
+        iterations: Maximum refinement steps of the terrain intersection.
+        tolerance: Stop refining once no point moves more than this (metres).
+    """
+
+    def __init__(
+        self,
+        camera_matrix: np.ndarray,
+        dist_coeffs: np.ndarray,
+        terrain: TerrainGrid | None = None,
+        iterations: int = 10,
+        tolerance: float = 0.01,
+    ) -> None:
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.terrain = terrain
+        self.iterations = iterations
+        self.tolerance = tolerance
+
+    def rays(
+        self,
+        pixels: np.ndarray,
+        yaw: float = 0.0,
+        pitch: float = NADIR,
+        roll: float = 0.0,
+    ) -> np.ndarray:
+        """Return ``(N, 3)`` east/north/up directions of the rays through ``pixels``."""
+
+        pts = np.asarray(pixels, dtype=np.float32).reshape(-1, 1, 2)
+        if len(pts) == 0:
+            return np.empty((0, 3))
+        norm = cv2.undistortPoints(pts, self.camera_matrix, self.dist_coeffs)
+        directions = np.ones((len(pts), 3))
+        directions[:, :2] = norm.reshape(-1, 2)
+        return directions @ camera_rotation(yaw, pitch, roll).T
+
+    def project(
+        self,
+        pixels: np.ndarray,
+        altitude: float,
+        yaw: float = 0.0,
+        pitch: float = NADIR,
+        roll: float = 0.0,
+        lat: float | None = None,
+        lng: float | None = None,
+    ) -> np.ndarray:
+        """Intersect the rays through ``pixels`` with the ground.
+
+        Args:
+            pixels: ``(N, 2)`` array of ``(x, y)`` pixel coordinates.
+            altitude: Height of the camera in metres: above the ground plane,
+                or above the terrain datum when a terrain grid is used.
+            yaw: Heading of the image top, clockwise from north (radians).
+            pitch: Elevation of the optical axis (radians), ``-pi / 2`` is nadir.
+            roll: Rotation about the optical axis (radians).
+            lat: Latitude of the camera, required with a terrain grid.
+            lng: Longitude of the camera, required with a terrain grid.
+
+        Returns:
+            ``(N, 2)`` array of ``(delta_x_meters, delta_y_meters)`` east/north
+            offsets from the point below the camera. Rays that do not hit the
+            ground (at or above the horizon) give ``nan``.
+        """
+
+        rays = self.rays(pixels, yaw, pitch, roll)
+        down = -rays[:, 2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(down > 0, 1.0 / down, np.nan)
+        horizontal = rays[:, :2] * scale[:, None]
+
+        if self.terrain is None:
+            return horizontal * altitude
+
+        if lat is None or lng is None:
+            raise ValueError("lat and lng are required to sample the terrain")
+        # Fixed-point iteration: intersect with the plane at the terrain
+        # height found under the previous estimate, starting below the camera.
+        height = altitude - self.terrain.sample(lat, lng)
+        offsets = horizontal * height
+        for _ in range(self.iterations):
+            coords = calculate_new_coordinates_batch(
+                lat, lng, np.nan_to_num(offsets), mode="fast"
+            )
+            height = altitude - self.terrain.sample(coords[:, 0], coords[:, 1])
+            height[height <= 0] = np.nan
+            updated = horizontal * height[:, None]
+            moved = np.nanmax(np.abs(updated - offsets), initial=0.0)
+            offsets = updated
+            if moved < self.tolerance:
+                break
+        return offsets
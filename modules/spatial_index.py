@@ -0,0 +1,302 @@
+"""Spatial index and assignment of detections to expected objects.
+
+:class:`GridIndex` hashes 2-D points in metres (or pixels) into square cells,
+so radius and nearest-neighbour queries only look at the few cells around
+the query instead of every stored point. Geographic coordinates are
+converted to local metres with :func:`get_coordinates.wgs84_to_local` first.
+
+:func:`match` pairs detections with expected objects (e.g. reference points
+of a mission) within a maximum distance, either optimally (Hungarian
+algorithm, using ``scipy`` when it is installed) or greedily by increasing
+distance.
+"""
+
+import math
+from collections import defaultdict
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # pragma: no cover - optional dependency
+    linear_sum_assignment = None
+
+
+class GridIndex:
+    """Uniform grid hash over 2-D points.
+
+    Args:
+        cell_size: Side of the grid cells, ideally close to the typical query
+            radius.
+    """
+
+    def __init__(self, cell_size: float) -> None:
+        self.cell_size = cell_size
+        self._points = np.empty((0, 2))
+        self._count = 0
+        self._cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def points(self) -> np.ndarray:
+        """``(N, 2)`` array of the stored points, indexed by their ids."""
+
+        return self._points[: self._count]
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, points: np.ndarray) -> np.ndarray:
+        """Add ``(N, 2)`` points and return their ids."""
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        start, end = self._count, self._count + len(points)
+        if end > len(self._points):
+            grown = np.empty((max(end, 2 * len(self._points), 16), 2))
+            grown[:start] = self._points[:start]
+            self._points = grown
+        self._points[start:end] = points
+        self._count = end
+
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        for point_id, (cx, cy) in enumerate(cells.tolist(), start):
+            self._cells[cx, cy].append(point_id)
+        return np.arange(start, end)
+
+    def move(self, point_id: int, point: tuple[float, float]) -> None:
+        """Update the position of a stored point."""
+
+        old = self._cell(*self._points[point_id])
+        new = self._cell(*point)
+        self._points[point_id] = point
+        if old != new:
+            self._cells[old].remove(point_id)
+            if not self._cells[old]:
+                del self._cells[old]
+            self._cells[new].append(point_id)
+
+    def _candidates(self, x: float, y: float, radius: float) -> list[int]:
+        reach = max(1, math.ceil(radius / self.cell_size))
+        cx, cy = self._cell(x, y)
+        found: list[int] = []
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                cell = self._cells.get((i, j))
+                if cell:
+                    found.extend(cell)
+        return found
+
+    def query_radius(self, point: tuple[float, float], radius: float) -> np.ndarray:
+        """Return ids of the points within ``radius`` of ``point``."""
+
+        candidates = np.array(self._candidates(point[0], point[1], radius), np.intp)
+        if not len(candidates):
+            return candidates
+        offsets = self._points[candidates] - point
+        inside = np.einsum("ij,ij->i", offsets, offsets) <= radius * radius
+        return candidates[inside]
+
+    def pairs_within(
+        self, points: np.ndarray, radius: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(query, stored, distance)`` arrays of all pairs within ``radius``."""
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        queries: list[np.ndarray] = []
+        found: list[np.ndarray] = []
+        for query, (x, y) in enumerate(points.tolist()):
+            ids = self._candidates(x, y, radius)
+            queries.append(np.full(len(ids), query, np.intp))
+            found.append(np.array(ids, np.intp))
+        if not found:
+            return (np.empty(0, np.intp),) * 2 + (np.empty(0),)
+        query = np.concatenate(queries)
+        stored = np.concatenate(found)
+        distance = np.linalg.norm(self._points[stored] - points[query], axis=1)
+        keep = distance <= radius
+        return query[keep], stored[keep], distance[keep]
+
+    def nearest(
+        self, points: np.ndarray, max_distance: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the id of and distance to the nearest stored point.
+
+        Queries with no stored point within ``max_distance`` get id ``-1``
+        and distance ``inf``.
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        ids = np.full(len(points), -1, np.intp)
+        distances = np.full(len(points), np.inf)
+        query, stored, distance = self.pairs_within(points, max_distance)
+        order = np.lexsort((distance, query))
+        query, stored, distance = query[order], stored[order], distance[order]
+        first = np.ones(len(query), dtype=bool)
+        first[1:] = query[1:] != query[:-1]
+        ids[query[first]] = stored[first]
+        distances[query[first]] = distance[first]
+        return ids, distances
+
+
+def _hungarian(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Minimum-cost assignment of a rectangular cost matrix.
+
+    Shortest augmenting path version of the Hungarian algorithm, O(n^2 m)
+    with the inner loop vectorized over columns. Returns ``(rows, cols)``
+    like ``scipy.optimize.linear_sum_assignment``.
+    """
+
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.shape[0] > cost.shape[1]:
+        cols, rows = _hungarian(cost.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    # owner[j] is the 1-based row assigned to 1-based column j, 0 if none.
+    owner = np.zeros(m + 1, dtype=np.intp)
+    way = np.zeros(m + 1, dtype=np.intp)
+    for row in range(1, n + 1):
+        owner[0] = row
+        column = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current = owner[column]
+            slack = cost[current - 1] - u[current] - v[1:]
+            free = ~used[1:]
+            better = free & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = column
+            masked = np.where(free, min_slack[1:], np.inf)
+            next_column = int(np.argmin(masked)) + 1
+            delta = masked[next_column - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+            column = next_column
+            if owner[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+
+    assigned = np.nonzero(owner[1:])[0]
+    rows = owner[1:][assigned] - 1
+    order = np.argsort(rows)
+    return rows[order], assigned[order]
+
+
+def _greedy(query: np.ndarray, stored: np.ndarray, distance: np.ndarray) -> np.ndarray:
+    """Take candidate pairs by increasing distance, each index at most once."""
+
+    used_query: set[int] = set()
+    used_stored: set[int] = set()
+    pairs = []
+    order = np.argsort(distance, kind="stable")
+    for q, s in zip(query[order].tolist(), stored[order].tolist()):
+        if q not in used_query and s not in used_stored:
+            used_query.add(q)
+            used_stored.add(s)
+            pairs.append((q, s))
+    return np.array(pairs, dtype=np.intp).reshape(-1, 2)
+
+
+def _hungarian_components(
+    query: np.ndarray, stored: np.ndarray, distance: np.ndarray, max_distance: float
+) -> np.ndarray:
+    """Solve the assignment separately on each connected group of candidate pairs.
+
+    Detections and expected objects only interact through pairs closer than
+    ``max_distance``, so each connected component of that bipartite graph is
+    an independent, usually tiny, assignment problem.
+    """
+
+    # Union-find over detections (0..n-1) and expected objects (n..).
+    n = int(query.max()) + 1 if len(query) else 0
+    parent = list(range(n + (int(stored.max()) + 1 if len(stored) else 0)))
+
+    def root(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for d, e in zip(query.tolist(), stored.tolist()):
+        a, b = root(d), root(n + e)
+        if a != b:
+            parent[a] = b
+
+    groups: dict[int, list[int]] = defaultdict(list)
+    for pair, d in enumerate(query.tolist()):
+        groups[root(d)].append(pair)
+
+    solve = linear_sum_assignment or _hungarian
+    pairs = []
+    for members in groups.values():
+        group_detections, local_rows = np.unique(query[members], return_inverse=True)
+        group_expected, local_cols = np.unique(stored[members], return_inverse=True)
+        # Absent pairs cost more than any set of allowed pairs, so they are
+        # only used when nothing else is left, and then dropped.
+        penalty = max_distance * (min(len(group_detections), len(group_expected)) + 1)
+        cost = np.full((len(group_detections), len(group_expected)), penalty)
+        cost[local_rows, local_cols] = distance[members]
+        rows, cols = solve(cost)
+        keep = cost[rows, cols] < penalty
+        pairs.append(
+            np.column_stack((group_detections[rows[keep]], group_expected[cols[keep]]))
+        )
+    if not pairs:
+        return np.empty((0, 2), dtype=np.intp)
+    return np.concatenate(pairs).astype(np.intp)
+
+
+def match(
+    detections: np.ndarray,
+    expected: np.ndarray,
+    max_distance: float,
+    method: str = "hungarian",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pair detections with expected objects closer than ``max_distance``.
+
+    Candidate pairs are found with a :class:`GridIndex`.
+    ``method="hungarian"`` matches as many objects as possible with the
+    smallest total distance, solving each group of mutually reachable
+    objects separately; ``method="greedy"`` repeatedly takes the closest
+    remaining pair.
+
+    Args:
+        detections: ``(N, 2)`` detection positions.
+        expected: ``(M, 2)`` positions of the expected objects.
+        max_distance: Pairs further apart are never matched.
+        method: ``"hungarian"`` or ``"greedy"``.
+
+    Returns:
+        ``(pairs, unmatched_detections, missing)``: a ``(K, 2)`` array of
+        ``(detection, expected)`` indices, and the indices of detections and
+        expected objects left without a partner.
+    """
+
+    detections = np.asarray(detections, dtype=np.float64).reshape(-1, 2)
+    expected = np.asarray(expected, dtype=np.float64).reshape(-1, 2)
+    if method not in ("greedy", "hungarian"):
+        raise ValueError(f"Unknown method: {method}")
+
+    index = GridIndex(max_distance)
+    index.insert(expected)
+    query, stored, distance = index.pairs_within(detections, max_distance)
+
+    if method == "greedy":
+        pairs = _greedy(query, stored, distance)
+    else:
+        pairs = _hungarian_components(query, stored, distance, max_distance)
+
+    unmatched = np.setdiff1d(np.arange(len(detections)), pairs[:, 0])
+    missing = np.setdiff1d(np.arange(len(expected)), pairs[:, 1])
+    return pairs, unmatched, missing
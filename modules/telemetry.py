@@ -0,0 +1,288 @@
+"""Flight telemetry logs indexed by time.
+
+A :class:`TelemetryLog` keeps every logged quantity as a NumPy array sorted
+by timestamp. Queries for a batch of frame timestamps find the neighbouring
+samples with one ``np.searchsorted`` call and interpolate linearly, so
+georeferencing all frames of an hour-long 50 Hz log stays a handful of
+vectorized operations. Results feed :class:`georeferencer.GeoReferencer`
+(:meth:`TelemetryLog.frame`) or the batch helpers of
+:mod:`modules.get_coordinates` (:meth:`TelemetryLog.interpolate`).
+
+Supported inputs:
+
+* CSV with a header row,
+* JSON, either a list of records or an object of parallel arrays,
+* MAVLink message dumps with one JSON message per line, as written by
+  ``mavlogdump.py --format json`` or ``msg.to_dict()``.
+
+Times are in seconds and angles in degrees, with the conventions of
+:class:`georeferencer.FrameTelemetry`: ``pitch`` and ``roll`` are gimbal
+angles, ``-90`` pitch looking straight down. Angles are unwrapped before
+interpolation so that crossing north does not sweep through south.
+"""
+
+import csv
+import json
+from datetime import datetime
+
+import numpy as np
+
+from .georeferencer import FrameTelemetry
+
+FIELDS = ("lat", "lng", "altitude", "heading", "pitch", "roll")
+ANGLES = ("heading", "pitch", "roll")
+
+# Column names accepted in CSV and JSON logs, lower case.
+ALIASES = {
+    "time": "time",
+    "t": "time",
+    "timestamp": "time",
+    "lat": "lat",
+    "latitude": "lat",
+    "lng": "lng",
+    "lon": "lng",
+    "longitude": "lng",
+    "alt": "altitude",
+    "altitude": "altitude",
+    "relative_alt": "altitude",
+    "heading": "heading",
+    "yaw": "heading",
+    "hdg": "heading",
+    "pitch": "pitch",
+    "gimbal_pitch": "pitch",
+    "roll": "roll",
+    "gimbal_roll": "roll",
+}
+
+
+def _to_seconds(values: list) -> np.ndarray:
+    """Return timestamps as float seconds, parsing ISO 8601 strings if needed."""
+
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except ValueError:
+        return np.array([datetime.fromisoformat(v).timestamp() for v in values])
+
+
+def _neighbours(
+    time: np.ndarray, timestamps: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the index of the sample before each timestamp and the blend weight."""
+
+    if len(time) == 1:
+        return np.zeros(timestamps.shape, dtype=np.intp), np.zeros(timestamps.shape)
+    index = np.clip(
+        np.searchsorted(time, timestamps, side="right") - 1, 0, len(time) - 2
+    )
+    start = time[index]
+    span = time[index + 1] - start
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = np.where(span > 0, (timestamps - start) / span, 0.0)
+    return index, np.clip(weight, 0.0, 1.0)
+
+
+def _blend(values: np.ndarray, index: np.ndarray, weight: np.ndarray) -> np.ndarray:
+    if len(values) == 1:
+        return np.full(index.shape, values[0])
+    return values[index] + (values[index + 1] - values[index]) * weight
+
+
+class TelemetryLog:
+    """Time-sorted telemetry samples with batch interpolation.
+
+    Args:
+        time: ``(N,)`` sample timestamps in seconds.
+        **columns: ``(N,)`` arrays named after :data:`FIELDS`; ``lat``, ``lng``
+            and ``altitude`` are required.
+    """
+
+    def __init__(self, time: np.ndarray, **columns: np.ndarray) -> None:
+        missing = {"lat", "lng", "altitude"} - columns.keys()
+        if missing:
+            raise ValueError(f"Telemetry is missing {', '.join(sorted(missing))}")
+        unknown = columns.keys() - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown telemetry fields: {', '.join(sorted(unknown))}")
+
+        time = np.asarray(time, dtype=np.float64)
+        order = np.argsort(time, kind="stable")
+        self.time = time[order]
+        self.columns: dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            values = np.asarray(values, dtype=np.float64)[order]
+            if name in ANGLES:
+                values = np.unwrap(values, period=360.0)
+            self.columns[name] = values
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "TelemetryLog":
+        """Build a log from dictionaries using any of the :data:`ALIASES`."""
+
+        columns: dict[str, list] = {}
+        for record in records:
+            for key, value in record.items():
+                name = ALIASES.get(key.lower())
+                if name is not None:
+                    columns.setdefault(name, []).append(value)
+        if "time" not in columns:
+            raise ValueError("Telemetry has no time column")
+        return cls(_to_seconds(columns.pop("time")), **columns)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "TelemetryLog":
+        with open(path, newline="") as f:
+            header = next(csv.reader(f))
+        names = {}
+        for index, key in enumerate(header):
+            name = ALIASES.get(key.strip().lower())
+            if name is not None:
+                names[index] = name
+        if "time" not in names.values():
+            raise ValueError("Telemetry has no time column")
+
+        try:
+            # Fast path for all-numeric logs.
+            values = np.loadtxt(
+                path, delimiter=",", skiprows=1, usecols=list(names), ndmin=2
+            ).T
+        except ValueError:
+            with open(path, newline="") as f:
+                reader = csv.reader(f)
+                next(reader)
+                rows = list(zip(*reader))
+            values = [rows[index] for index in names]
+        columns = dict(zip(names.values(), values))
+        return cls(_to_seconds(columns.pop("time")), **columns)
+
+    @classmethod
+    def from_json(cls, path: str) -> "TelemetryLog":
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            return cls.from_records(data)
+        columns = {
+            ALIASES[k.lower()]: v for k, v in data.items() if k.lower() in ALIASES
+        }
+        if "time" not in columns:
+            raise ValueError("Telemetry has no time column")
+        return cls(_to_seconds(columns.pop("time")), **columns)
+
+    @classmethod
+    def from_mavlink(cls, path: str) -> "TelemetryLog":
+        """Load a MAVLink dump with one JSON message per line.
+
+        ``GLOBAL_POSITION_INT`` messages define the samples. The gimbal
+        orientation from ``MOUNT_ORIENTATION`` and, when the position carries
+        no heading, the vehicle yaw from ``ATTITUDE`` are interpolated onto
+        their timestamps. Vehicle pitch and roll are ignored: the gimbal
+        compensates for them.
+        """
+
+        position: list[tuple] = []
+        attitude: list[tuple] = []
+        mount: list[tuple] = []
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if "meta" in message:
+                    kind = message["meta"].get("type")
+                    message = message.get("data", {})
+                else:
+                    kind = message.get("mavpackettype")
+                if kind == "GLOBAL_POSITION_INT":
+                    hdg = message["hdg"]
+                    position.append(
+                        (
+                            message["time_boot_ms"] / 1e3,
+                            message["lat"] / 1e7,
+                            message["lon"] / 1e7,
+                            message["relative_alt"] / 1e3,
+                            # 65535 marks an unknown heading.
+                            np.nan if hdg == 65535 else hdg / 100,
+                        )
+                    )
+                elif kind == "ATTITUDE":
+                    attitude.append(
+                        (message["time_boot_ms"] / 1e3, np.degrees(message["yaw"]))
+                    )
+                elif kind == "MOUNT_ORIENTATION":
+                    mount.append(
+                        (
+                            message["time_boot_ms"] / 1e3,
+                            message["pitch"],
+                            message["roll"],
+                        )
+                    )
+        if not position:
+            raise ValueError("No GLOBAL_POSITION_INT messages in the log")
+
+        time, lat, lng, altitude, heading = np.array(position).T
+        columns = {"lat": lat, "lng": lng, "altitude": altitude}
+        if np.isnan(heading).any() and attitude:
+            (yaw,) = cls._resample(np.array(attitude), time)
+            heading = np.where(np.isnan(heading), yaw, heading)
+        if not np.isnan(heading).any():
+            columns["heading"] = heading
+        if mount:
+            columns["pitch"], columns["roll"] = cls._resample(np.array(mount), time)
+        return cls(time, **columns)
+
+    @staticmethod
+    def _resample(samples: np.ndarray, time: np.ndarray) -> list[np.ndarray]:
+        """Interpolate angle columns of ``(t, *angles)`` rows at ``time``."""
+
+        samples = samples[np.argsort(samples[:, 0], kind="stable")]
+        index, weight = _neighbours(samples[:, 0], time)
+        return [
+            _blend(np.unwrap(column, period=360.0), index, weight)
+            for column in samples[:, 1:].T
+        ]
+
+    @classmethod
+    def load(cls, path: str) -> "TelemetryLog":
+        """Load a log, choosing the format from the file extension.
+
+        ``.csv`` files are read as CSV, ``.json`` as JSON and anything else
+        (e.g. ``.jsonl``) as a MAVLink message dump.
+        """
+
+        if path.lower().endswith(".csv"):
+            return cls.from_csv(path)
+        if path.lower().endswith(".json"):
+            return cls.from_json(path)
+        return cls.from_mavlink(path)
+
+    def interpolate(
+        self, timestamps: np.ndarray, fields: tuple[str, ...] | None = None
+    ) -> dict[str, np.ndarray]:
+        """Linearly interpolate ``fields`` (default: all) at ``timestamps``.
+
+        Timestamps outside the log take the first or last sample. Angles are
+        returned wrapped to ``[0, 360)`` for ``heading`` and ``[-180, 180)``
+        for ``pitch`` and ``roll``.
+        """
+
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        index, weight = _neighbours(self.time, timestamps)
+        result = {}
+        for name in fields or self.columns:
+            value = _blend(self.columns[name], index, weight)
+            if name == "heading":
+                value = np.mod(value, 360.0)
+            elif name in ANGLES:
+                value = np.mod(value + 180.0, 360.0) - 180.0
+            result[name] = value
+        return result
+
+    def frame(self, timestamp: float) -> FrameTelemetry:
+        """Return the interpolated drone state at ``timestamp``."""
+
+        sample = self.interpolate(np.array([timestamp]))
+        return FrameTelemetry(
+            **{name: float(value[0]) for name, value in sample.items()}
+        )
@@ -0,0 +1,297 @@
+"""Follow detected objects between model calls with sparse optical flow.
+
+A model call takes seconds, a video frame arrives every few tens of
+milliseconds. :class:`BoxTracker` is seeded with the boxes of a detection
+(the ``x``/``y``/``width``/``height`` dictionaries returned by the API) and
+moves them from frame to frame on the CPU:
+
+* corners are picked inside every box with ``cv2.goodFeaturesToTrack`` on a
+  small grayscale copy,
+* all corners are followed with pyramidal Lucas-Kanade flow, forward and
+  back; points that do not return to where they started are dropped,
+* a box moves by the median displacement of its points and scales by the
+  median change of their distances to the centre.
+
+The confidence of a track is the fraction of its seed points still
+followed. :attr:`BoxTracker.needs_detection` says when the model should be
+asked again: after ``max_age`` frames, when a track falls below
+``min_confidence`` or when a track is lost. :func:`track_frames` runs that
+loop for any frame source and detection callable. Detections that finish
+while later frames were tracked are caught up with ``seed(frame,
+detections, current)``.
+"""
+
+import itertools
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, replace
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Track:
+    """One tracked object.
+
+    ``box`` is ``(x, y, width, height)`` relative to the frame size, like
+    the detections of the API; ``age`` counts frames since the box was last
+    confirmed by a detection.
+    """
+
+    track_id: int
+    label: str
+    box: tuple[float, float, float, float]
+    confidence: float
+    age: int
+
+    def to_detection(self) -> dict:
+        """Return the track in the format of the API detections."""
+
+        x, y, width, height = self.box
+        return {
+            "label": self.label,
+            "x": x,
+            "y": y,
+            "width": width,
+            "height": height,
+            "track_id": self.track_id,
+            "confidence": self.confidence,
+        }
+
+
+def iou(a: tuple[float, ...], b: tuple[float, ...]) -> float:
+    """Intersection over union of two ``(x, y, width, height)`` boxes."""
+
+    width = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    height = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    inter = width * height
+    return inter / (a[2] * a[3] + b[2] * b[3] - inter)
+
+
+class BoxTracker:
+    """Propagate detection boxes across frames with Lucas-Kanade flow.
+
+    Args:
+        width: Width in pixels of the grayscale copy used for tracking.
+        max_points: Corners picked per box.
+        min_points: Tracks keeping fewer points are lost.
+        max_age: Frames after a detection before a new one is due.
+        min_confidence: A new detection is due once any track keeps less
+            than this fraction of its seed points.
+        max_error: Largest forward-backward error, in pixels of the
+            tracking copy, of a point that is kept.
+        match_iou: Detections overlapping a track of the same label by at
+            least this much keep its ``track_id``.
+    """
+
+    def __init__(
+        self,
+        width: int = 640,
+        max_points: int = 30,
+        min_points: int = 4,
+        max_age: int = 30,
+        min_confidence: float = 0.5,
+        max_error: float = 1.0,
+        match_iou: float = 0.3,
+    ) -> None:
+        self.width = width
+        self.max_points = max_points
+        self.min_points = min_points
+        self.max_age = max_age
+        self.min_confidence = min_confidence
+        self.max_error = max_error
+        self.match_iou = match_iou
+        self.tracks: list[Track] = []
+        self.frames = 0
+        self.detections = 0
+        self._ids = itertools.count()
+        self._points: list[np.ndarray] = []
+        self._seed_counts: list[int] = []
+        self._gray: np.ndarray | None = None
+        self._age = 0
+        self._lost = False
+        self._flow_params = {
+            "winSize": (21, 21),
+            "maxLevel": 3,
+            "criteria": (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+        }
+
+    @property
+    def needs_detection(self) -> bool:
+        """Whether the next frame should be sent to the model."""
+
+        return (
+            self._gray is None
+            or self._lost
+            or self._age >= self.max_age
+            or any(track.confidence < self.min_confidence for track in self.tracks)
+        )
+
+    @property
+    def detection_fraction(self) -> float:
+        """Fraction of frames that were sent to the model."""
+
+        return self.detections / self.frames if self.frames else 0.0
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if gray.shape[1] > self.width:
+            height = max(1, round(gray.shape[0] * self.width / gray.shape[1]))
+            gray = cv2.resize(gray, (self.width, height), interpolation=cv2.INTER_AREA)
+        return gray
+
+    def _corners(self, gray: np.ndarray, box: tuple[float, ...]) -> np.ndarray:
+        height, width = gray.shape
+        x0 = int(np.clip(box[0] * width, 0, width - 1))
+        y0 = int(np.clip(box[1] * height, 0, height - 1))
+        x1 = int(np.clip(np.ceil((box[0] + box[2]) * width), x0 + 1, width))
+        y1 = int(np.clip(np.ceil((box[1] + box[3]) * height), y0 + 1, height))
+        mask = np.zeros_like(gray)
+        mask[y0:y1, x0:x1] = 255
+        corners = cv2.goodFeaturesToTrack(
+            gray, self.max_points, 0.01, 3, mask=mask, blockSize=5
+        )
+        if corners is None:
+            return np.empty((0, 2), np.float32)
+        return corners.reshape(-1, 2)
+
+    def seed(
+        self,
+        frame: np.ndarray,
+        detections: Iterable[dict],
+        current: np.ndarray | None = None,
+    ) -> list[Track]:
+        """Replace the tracks with the detections made on ``frame``.
+
+        Detections matching a current track of the same label keep its id.
+        Objects without enough texture to follow are dropped.
+
+        When the detections arrive while later frames were already tracked,
+        pass the newest frame as ``current``: the new boxes are moved from
+        ``frame`` to it with one flow step and tracking continues from there.
+        ``frame`` itself is then not counted again in :attr:`frames`.
+        """
+
+        gray = self._prepare(frame)
+        previous = list(self.tracks)
+        tracks, points, counts = [], [], []
+        for detection in detections:
+            box = tuple(float(detection[key]) for key in ("x", "y", "width", "height"))
+            corners = self._corners(gray, box)
+            if len(corners) < self.min_points:
+                continue
+            label = detection["label"]
+            overlaps = [
+                iou(box, track.box) if track.label == label else 0.0
+                for track in previous
+            ]
+            best = int(np.argmax(overlaps)) if overlaps else -1
+            if best >= 0 and overlaps[best] >= self.match_iou:
+                track_id = previous.pop(best).track_id
+            else:
+                track_id = next(self._ids)
+            tracks.append(Track(track_id, label, box, 1.0, 0))
+            points.append(corners)
+            counts.append(len(corners))
+
+        self.tracks, self._points, self._seed_counts = tracks, points, counts
+        self._gray = gray
+        self._age = 0
+        self._lost = False
+        self.detections += 1
+        if current is not None:
+            return self.update(current)
+        self.frames += 1
+        return self.tracks
+
+    def update(self, frame: np.ndarray) -> list[Track]:
+        """Move the tracks to ``frame`` and return the ones still followed."""
+
+        if self._gray is None:
+            raise RuntimeError("seed() must be called before update()")
+        gray = self._prepare(frame)
+        self.frames += 1
+        self._age += 1
+        if gray.shape != self._gray.shape:
+            # A different stream or resolution: nothing can be followed.
+            self._lost = bool(self.tracks)
+            self.tracks, self._points, self._seed_counts = [], [], []
+        if not self.tracks:
+            self._gray = gray
+            return self.tracks
+
+        start = np.concatenate(self._points).reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._gray, gray, start, None, **self._flow_params
+        )
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            gray, self._gray, moved, None, **self._flow_params
+        )
+        error = np.linalg.norm((start - back).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1)
+        good &= error <= self.max_error
+        moved = moved.reshape(-1, 2)
+        height, width = gray.shape
+
+        tracks, points, counts = [], [], []
+        offset = 0
+        for track, old, seeded in zip(self.tracks, self._points, self._seed_counts):
+            keep = good[offset : offset + len(old)]
+            new = moved[offset : offset + len(old)][keep]
+            old = old[keep]
+            offset += len(keep)
+            if len(new) < self.min_points:
+                self._lost = True
+                continue
+
+            shift = np.median(new - old, axis=0).astype(float)
+            old_spread = np.linalg.norm(old - np.median(old, axis=0), axis=1)
+            new_spread = np.linalg.norm(new - np.median(new, axis=0), axis=1)
+            valid = old_spread > 1.0
+            scale = (
+                float(np.median(new_spread[valid] / old_spread[valid]))
+                if valid.sum() >= 2
+                else 1.0
+            )
+            x, y, w, h = track.box
+            cx = x + w / 2 + shift[0] / width
+            cy = y + h / 2 + shift[1] / height
+            w, h = w * scale, h * scale
+            cx, cy = float(cx), float(cy)
+            if not (0 <= cx <= 1 and 0 <= cy <= 1):
+                self._lost = True
+                continue
+            box = (cx - w / 2, cy - h / 2, w, h)
+            tracks.append(
+                replace(track, box=box, confidence=len(new) / seeded, age=track.age + 1)
+            )
+            points.append(new)
+            counts.append(seeded)
+
+        self.tracks, self._points, self._seed_counts = tracks, points, counts
+        self._gray = gray
+        return self.tracks
+
+
+def track_frames(
+    frames: Iterable[np.ndarray],
+    detect: Callable[[np.ndarray], list[dict]],
+    tracker: BoxTracker,
+) -> Iterator[tuple[np.ndarray, list[Track], bool]]:
+    """Yield ``(frame, tracks, detected)`` for every frame of ``frames``.
+
+    ``detect`` is called with the frame whenever
+    :attr:`BoxTracker.needs_detection` is set and must return API style
+    detections; all other frames are tracked only. ``detected`` tells which
+    frames went to the model.
+    """
+
+    for frame in frames:
+        detected = tracker.needs_detection
+        if detected:
+            tracks = tracker.seed(frame, detect(frame))
+        else:
+            tracks = tracker.update(frame)
+        yield frame, tracks, detected
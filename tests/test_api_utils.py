@@ -0,0 +1,198 @@
+import asyncio
+import tempfile
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from jemdzem import api_utils
+from jemdzem.memory_budget import BudgetExceeded, MemoryBudget
+
+
+def encoded(ext: str, width: int = 640, height: int = 480) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return cv2.imencode(ext, image)[1]
+
+
+def upload(data: np.ndarray, spool_size: int) -> UploadFile:
+    """Build an ``UploadFile`` the way the multipart parser does."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=spool_size)  # noqa: SIM115
+    spooled.write(data.tobytes())
+    spooled.seek(0)
+    return UploadFile(spooled, size=data.size, filename="image.jpg")
+
+
+@pytest.mark.parametrize("ext", [".png", ".jpg"])
+def test_image_size_from_header(ext: str) -> None:
+    assert api_utils.image_size(encoded(ext, 640, 480)) == (640, 480)
+
+
+def test_image_size_unknown_format() -> None:
+    assert api_utils.image_size(encoded(".bmp")) is None
+
+
+@pytest.mark.parametrize(
+    "size, max_side, expected",
+    [
+        ((5472, 3648), 0, 1),
+        ((5472, 3648), 3072, 1),
+        ((5472, 3648), 1536, 2),
+        ((5472, 3648), 1024, 4),
+        ((5472, 3648), 100, 8),
+        ((640, 480), 1024, 1),
+    ],
+)
+def test_reduction_factor(size: tuple[int, int], max_side: int, expected: int) -> None:
+    assert api_utils.reduction_factor(*size, max_side) == expected
+
+
+@pytest.mark.parametrize("spool_size", [1024 * 1024, 1])
+def test_image_from_upload_file(spool_size: int) -> None:
+    data = encoded(".jpg", 640, 480)
+    image = asyncio.run(api_utils.image_from_upload_file(upload(data, spool_size)))
+    assert image.shape == (480, 640, 3)
+
+
+def test_reduced_resolution_decode() -> None:
+    data = encoded(".jpg", 640, 480)
+    image = asyncio.run(api_utils.decode_image(data, max_side=160))
+    assert image.shape == (120, 160, 3)
+
+
+def test_upload_size_limit() -> None:
+    data = encoded(".jpg")
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            api_utils.image_from_upload_file(upload(data, 1024), max_size=data.size - 1)
+        )
+    assert excinfo.value.status_code == 413
+
+
+def test_decode_reserves_budget() -> None:
+    budget = MemoryBudget(10 * 1024 * 1024)
+
+    async def main() -> int:
+        async with budget.lease() as lease:
+            await api_utils.decode_image(encoded(".png", 640, 480), lease)
+            return budget.used_bytes
+
+    assert asyncio.run(main()) == 640 * 480 * 3
+    assert budget.used_bytes == 0
+
+
+@pytest.mark.parametrize(
+    "ext, reserved", [(".jpg", 160 * 120 * 3), (".png", 640 * 480 * 3)]
+)
+def test_reduced_decode_reserves_peak_memory(ext: str, reserved: int) -> None:
+    budget = MemoryBudget(10 * 1024 * 1024)
+
+    async def main() -> tuple[int, tuple[int, ...]]:
+        async with budget.lease() as lease:
+            image = await api_utils.decode_image(encoded(ext), lease, max_side=160)
+            return budget.used_bytes, image.shape
+
+    # PNG is decoded at full size before it is shrunk.
+    assert asyncio.run(main()) == (reserved, (120, 160, 3))
+
+
+def test_requests_reserve_all_images_at_once() -> None:
+    images = [encoded(".png", 64, 64), encoded(".jpg", 64, 64), encoded(".bmp", 64, 64)]
+    budget = MemoryBudget(64 * 64 * 3 * 4, timeout=1.0)
+    acquired = []
+
+    async def request() -> None:
+        async with budget.lease() as lease:
+            decoded = await api_utils.decode_images(images, lease)
+            acquired.append(lease.reserved_bytes)
+            assert [image.shape for image in decoded] == [(64, 64, 3)] * 3
+            await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        # Reserving image by image, each request would hold one image and
+        # wait for the other forever.
+        await asyncio.gather(request(), request())
+
+    asyncio.run(main())
+    assert acquired == [64 * 64 * 3 * 3] * 2
+    assert budget.used_bytes == 0
+
+
+def test_headerless_images_hold_the_whole_budget_while_decoding() -> None:
+    budget = MemoryBudget(64 * 64 * 3 * 2, timeout=0.05)
+    bmp = encoded(".bmp", 64, 64)
+
+    async def main() -> int:
+        async with budget.lease() as other:
+            await other.reserve(1)
+            with pytest.raises(HTTPException) as excinfo:
+                async with budget.lease() as lease:
+                    await api_utils.decode_image(bmp, lease)
+            assert excinfo.value.status_code == 503
+        async with budget.lease() as lease:
+            await api_utils.decode_image(bmp, lease)
+            return lease.reserved_bytes
+
+    assert asyncio.run(main()) == 64 * 64 * 3
+    assert budget.used_bytes == 0
+
+
+def test_headerless_images_larger_than_the_budget_are_rejected() -> None:
+    budget = MemoryBudget(1000)
+
+    async def main() -> None:
+        async with budget.lease() as lease:
+            await api_utils.decode_image(encoded(".bmp", 64, 64), lease)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.status_code == 413
+    assert budget.used_bytes == 0
+
+
+def test_decode_rejected_over_budget() -> None:
+    budget = MemoryBudget(1000)
+
+    async def main() -> None:
+        async with budget.lease() as lease:
+            await api_utils.decode_image(encoded(".png", 640, 480), lease)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.status_code == 503
+
+
+def test_budget_queues_until_memory_is_released() -> None:
+    budget = MemoryBudget(100, timeout=1.0)
+    order: list[str] = []
+
+    async def holder() -> None:
+        async with budget.lease() as lease:
+            await lease.reserve(80)
+            order.append("first acquired")
+            await asyncio.sleep(0.05)
+            order.append("first released")
+
+    async def waiter() -> None:
+        await asyncio.sleep(0.01)
+        async with budget.lease() as lease:
+            await lease.reserve(50)
+            order.append("second acquired")
+
+    async def main() -> None:
+        await asyncio.gather(holder(), waiter())
+
+    asyncio.run(main())
+    assert order == ["first acquired", "first released", "second acquired"]
+
+
+def test_budget_wait_times_out() -> None:
+    budget = MemoryBudget(100, timeout=0.01)
+
+    async def main() -> None:
+        await budget.acquire(80)
+        await budget.acquire(50)
+
+    with pytest.raises(BudgetExceeded):
+        asyncio.run(main())
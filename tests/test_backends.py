@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+import pytest
+
+from inspekcja.raporting import backends, push_point
+from inspekcja.raporting.publisher import InMemoryReference
+
+PASSWORD = b"haslo"
+SALT = b"sol"
+
+
+def encrypt(path, data: bytes, key: bytes) -> None:
+    from cryptography.hazmat.primitives import padding
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    iv = os.urandom(16)
+    padder = padding.PKCS7(128).padder()
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    padded = padder.update(data) + padder.finalize()
+    path.write_bytes(iv + encryptor.update(padded) + encryptor.finalize())
+
+
+def test_key_is_derived_once_per_process(monkeypatch, tmp_path) -> None:
+    pytest.importorskip("cryptography")
+    monkeypatch.delenv(backends.KEY_ENV, raising=False)
+    backends.derive_key.cache_clear()
+    start = time.perf_counter()
+    key = backends.load_key(PASSWORD, SALT)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    assert backends.load_key(PASSWORD, SALT) is key
+    assert time.perf_counter() - start < first / 10
+    assert backends.derive_key.cache_info().hits == 1
+
+    config = tmp_path / "key.json.enc"
+    encrypt(config, b'{"project_id": "test"}', key)
+    assert backends.decrypt_config(str(config), PASSWORD, SALT) == {
+        "project_id": "test"
+    }
+
+
+def test_pre_derived_key_skips_the_derivation(monkeypatch, tmp_path) -> None:
+    pytest.importorskip("cryptography")
+    key = bytes(range(32))
+    monkeypatch.setenv(backends.KEY_ENV, key.hex())
+    backends.derive_key.cache_clear()
+    assert backends.load_key(PASSWORD, SALT) == key
+    assert backends.derive_key.cache_info().misses == 0
+
+    config = tmp_path / "key.json.enc"
+    encrypt(config, b"{}", key)
+    assert backends.decrypt_config(str(config), PASSWORD, SALT) == {}
+
+    monkeypatch.setenv(backends.KEY_ENV, "abcd")
+    with pytest.raises(ValueError):
+        backends.load_key(PASSWORD, SALT)
+
+
+def test_lazy_reference_is_created_once_on_first_use() -> None:
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.01)
+        return InMemoryReference({"generate": True})
+
+    ref = backends.LazyReference(factory)
+    assert not ref.initialised
+    threads = [threading.Thread(target=ref.child, args=("generate",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert ref.initialised
+    assert calls == [1]
+    assert ref.child("generate").get() is True
+
+
+def test_open_backend() -> None:
+    args = ("missing.enc", PASSWORD, SALT)
+    firebase = backends.open_backend("firebase", *args)
+    assert isinstance(firebase, backends.LazyReference)
+    assert not firebase.initialised
+    assert isinstance(backends.open_backend("memory", *args), InMemoryReference)
+    assert backends.open_backend("offline", *args) is None
+    with pytest.raises(ValueError):
+        backends.open_backend("sqlite", *args)
+
+
+def test_push_point_reports_through_a_configured_backend(tmp_path) -> None:
+    # Importing the module did not initialise reporting
+    assert push_point._journal is None
+    root = InMemoryReference()
+    push_point.configure(reference=root, journal_path=str(tmp_path / "j.sqlite3"))
+    try:
+        push_point.clear_points()
+        with push_point.batch():
+            push_point.push_detection_to_firebase(
+                {"label": "barrell"}, (50.0, 18.0), image_b64="abc"
+            )
+            push_point.answer_missing("barrell", "Missing 1 barrel(s)")
+        push_point.generate_points()
+        push_point.journal().flush()
+        assert push_point.backlog()["backlog"] == 0
+    finally:
+        assert push_point.close() == 0
+    data = root.get()
+    assert data["points"][0]["type"] == "barrel"
+    assert data["points"][0]["image"] == "abc"
+    assert data["missing"] == {"barrel": "Missing 1 barrel(s)"}
+    assert data["generate"] is True
+    assert push_point._journal is None
+
+
+def test_offline_backend_keeps_reports_for_the_next_run(tmp_path) -> None:
+    path = str(tmp_path / "j.sqlite3")
+    push_point.configure("offline", journal_path=path)
+    push_point.answer("yes")
+    assert push_point.close(timeout=0) == 1
+
+    root = InMemoryReference()
+    push_point.configure(reference=root, journal_path=path)
+    push_point.journal().flush()
+    push_point.close()
+    assert root.get() == {"answer": "yes"}
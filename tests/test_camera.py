@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from modules import get_coordinates
+from modules.camera import ByteLRUCache, CameraRegistry
+
+CAMERA_MATRIX = np.array([[400.0, 0, 320.0], [0, 400.0, 240.0], [0, 0, 1]])
+DIST_COEFFS = np.array([-0.024, -0.063, -0.010, -0.011, 0.205])
+RESOLUTION = (640, 480)
+
+
+def make_registry(**kwargs) -> CameraRegistry:
+    registry = CameraRegistry(**kwargs)
+    registry.register("test", CAMERA_MATRIX, DIST_COEFFS, RESOLUTION)
+    return registry
+
+
+@pytest.mark.parametrize("step", [1, 4, 7])
+def test_ground_grid_matches_translate_batch(step: int) -> None:
+    camera = make_registry(lut_step=step).get("test")
+    grid = camera.ground_grid(50.0, 0.7)
+
+    rows, cols = grid.shape[:2]
+    i, j = np.meshgrid(np.arange(rows), np.arange(cols), indexing="ij")
+    pixels = np.stack(
+        [np.minimum(j * step, 639), np.minimum(i * step, 479)], axis=-1
+    ).reshape(-1, 2)
+    expected = get_coordinates.translate_batch(
+        pixels, 50.0, CAMERA_MATRIX, DIST_COEFFS, 0.7
+    )
+
+    np.testing.assert_allclose(grid.reshape(-1, 2), expected, atol=1e-4)
+
+
+def test_translate_uses_scaled_intrinsics() -> None:
+    camera = make_registry().get("test")
+    pixels = np.array([[0, 0], [639, 479], [100, 200]])
+
+    expected = get_coordinates.translate_batch(pixels, 10.0, CAMERA_MATRIX, DIST_COEFFS)
+
+    np.testing.assert_allclose(camera.translate(pixels, 10.0), expected)
+
+
+def test_lut_covers_last_pixel() -> None:
+    lut = make_registry(lut_step=5).get("test").normalized_lut()
+    # 640 px sampled every 5 px: 0..635 plus 640 to include 639.
+    assert lut.shape == (97, 129, 2)
+
+
+def test_resolution_scaling() -> None:
+    registry = make_registry()
+    full = registry.get("test")
+    half = registry.get("test", (320, 240))
+
+    assert registry.get("test", (320, 240)) is half
+    np.testing.assert_allclose(half.camera_matrix[:2], full.camera_matrix[:2] / 2)
+    # The same point of the scene projects to the same ground offset.
+    np.testing.assert_allclose(
+        half.translate([[50.0, 60.0]], 30.0),
+        full.translate([[100.0, 120.0]], 30.0),
+        atol=0.02,
+    )
+
+
+def test_tables_are_cached() -> None:
+    registry = make_registry()
+    camera = registry.get("test")
+
+    assert camera.normalized_lut() is camera.normalized_lut()
+    assert camera.undistort_maps()[0] is camera.undistort_maps()[0]
+
+
+def test_register_again_drops_cached_tables() -> None:
+    registry = make_registry()
+    camera = registry.get("test")
+    old_lut = camera.normalized_lut()
+    old_map = camera.undistort_maps()[0]
+    registry.get("test", (320, 240)).normalized_lut()
+
+    registry.register("test", CAMERA_MATRIX, DIST_COEFFS * 2, RESOLUTION)
+    camera = registry.get("test")
+
+    assert not np.allclose(camera.normalized_lut(), old_lut)
+    assert not np.array_equal(camera.undistort_maps()[0], old_map)
+    assert registry.cache.nbytes == sum(
+        a.nbytes for a in (camera.normalized_lut(), *camera.undistort_maps())
+    )
+
+
+def test_undistort_keeps_shape() -> None:
+    camera = make_registry().get("test")
+    image = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    assert camera.undistort(image).shape == image.shape
+
+
+def test_cache_is_bounded() -> None:
+    registry = make_registry(max_cache_bytes=200_000)
+    camera = registry.get("test")
+
+    camera.normalized_lut()  # ~ 100 kB
+    camera.undistort_maps()  # ~ 1.8 MB, larger than the whole cache
+
+    assert registry.cache.nbytes <= 200_000
+    camera.normalized_lut()
+    registry.get("test", (320, 240)).normalized_lut()
+    assert registry.cache.nbytes <= 200_000
+
+
+def test_byte_lru_evicts_least_recently_used() -> None:
+    cache = ByteLRUCache(max_bytes=250)
+    cache.put("a", (np.zeros(100, np.uint8),))
+    cache.put("b", (np.zeros(100, np.uint8),))
+    cache.get("a")
+    cache.put("c", (np.zeros(100, np.uint8),))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.nbytes == 200
+
+
+def test_load_npz(tmp_path) -> None:
+    path = tmp_path / "camera.npz"
+    np.savez(path, camMatrix=CAMERA_MATRIX, distCoef=DIST_COEFFS)
+    registry = CameraRegistry()
+    registry.load("file", str(path))
+
+    assert registry.get("file").resolution == RESOLUTION
+
+
+def test_unknown_camera() -> None:
+    with pytest.raises(KeyError):
+        CameraRegistry().get("missing")
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from jemdzem.cancellation import Deadline, RequestCancelled, run_cancellable
+from jemdzem.metrics import metrics
+
+
+class FakeRequest:
+    """Minimal stand-in for ``starlette.requests.Request``."""
+
+    def __init__(self, disconnect_after: float | None = None) -> None:
+        self.disconnect_after = disconnect_after
+        self.started = asyncio.get_running_loop().time()
+
+    async def is_disconnected(self) -> bool:
+        if self.disconnect_after is None:
+            return False
+        elapsed = asyncio.get_running_loop().time() - self.started
+        return elapsed >= self.disconnect_after
+
+
+async def fan_out(calls: list[str], n: int, delay: float) -> list[int]:
+    """Simulate ``n`` sequential model calls recording each started call."""
+    results = []
+    for i in range(n):
+        calls.append(f"start {i}")
+        await asyncio.sleep(delay)
+        calls.append(f"done {i}")
+        results.append(i)
+    return results
+
+
+def test_deadline_remaining() -> None:
+    assert Deadline().remaining() is None
+    assert not Deadline().expired
+    assert Deadline(10).remaining() > 9
+    assert Deadline(0).expired
+
+
+def test_completes_within_deadline() -> None:
+    async def main() -> list[int]:
+        calls: list[str] = []
+        return await run_cancellable(
+            FakeRequest(), Deadline(1.0), fan_out(calls, 3, 0.001)
+        )
+
+    assert asyncio.run(main()) == [0, 1, 2]
+
+
+@pytest.mark.parametrize(
+    "deadline, disconnect_after, reason",
+    [(0.05, None, "deadline"), (None, 0.05, "disconnect")],
+)
+def test_cancellation_stops_fan_out(
+    deadline: float | None, disconnect_after: float | None, reason: str
+) -> None:
+    metrics.reset()
+    calls: list[str] = []
+
+    async def main() -> None:
+        await run_cancellable(
+            FakeRequest(disconnect_after),
+            Deadline(deadline),
+            fan_out(calls, 100, 0.02),
+            "/single-detect",
+            poll_interval=0.005,
+        )
+
+    with pytest.raises(RequestCancelled) as excinfo:
+        asyncio.run(main())
+
+    assert excinfo.value.reason == reason
+    # Only a handful of calls started and the in-flight one never finished.
+    assert len(calls) < 20
+    assert calls[-1].startswith("start")
+    assert (
+        metrics.counter("requests_cancelled", reason=reason, endpoint="/single-detect")
+        == 1
+    )
+
+
+def test_work_errors_propagate() -> None:
+    async def failing() -> None:
+        raise ValueError("model error")
+
+    async def main() -> None:
+        await run_cancellable(FakeRequest(), Deadline(1.0), failing())
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
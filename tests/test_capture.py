@@ -0,0 +1,149 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from modules.capture import LatestFrameGrabber
+
+FRAMES = 20
+
+
+@pytest.fixture
+def video(tmp_path) -> str:
+    """MJPG file whose frame ``i`` is filled with the value ``10 * i``."""
+
+    path = str(tmp_path / "stream.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 50, (64, 48))
+    for i in range(FRAMES):
+        writer.write(np.full((48, 64, 3), 10 * i, np.uint8))
+    writer.release()
+    return path
+
+
+def frame_index(frame: np.ndarray) -> int:
+    return round(float(frame.mean()) / 10)
+
+
+def test_read_returns_newest_frames_in_order(video) -> None:
+    with LatestFrameGrabber(video, pace=True) as grabber:
+        indices = []
+        timestamps = []
+        for _ in range(5):
+            frame, timestamp = grabber.read(timeout=2.0)
+            indices.append(frame_index(frame))
+            timestamps.append(timestamp)
+        stats = grabber.stats()
+
+    assert frame.shape == (48, 64, 3)
+    assert indices == sorted(indices)
+    assert len(set(indices)) == 5
+    assert timestamps == sorted(timestamps)
+    assert stats.connected
+    assert stats.frames_read == 5
+    assert stats.frame_age < 1.0
+
+
+def test_slow_consumer_gets_latest_frame_and_drops_are_counted(video) -> None:
+    with LatestFrameGrabber(video, pace=True) as grabber:
+        grabber.read(timeout=2.0)
+        time.sleep(0.2)
+        frame, timestamp = grabber.read(timeout=2.0)
+        stats = grabber.stats()
+
+    # At 50 fps about 10 frames were decoded during the sleep; the reader
+    # skips straight to one of the last ones.
+    assert frame_index(frame) >= 5
+    assert time.time() - timestamp < 0.2
+    assert stats.frames_dropped >= 5
+    assert 0 < stats.drop_rate < 1
+    assert stats.frames_decoded >= stats.frames_read + stats.frames_dropped
+
+
+def test_end_of_file_reconnects(video) -> None:
+    with LatestFrameGrabber(video, reconnect_delay=0.01) as grabber:
+        deadline = time.monotonic() + 5.0
+        while grabber.stats().reconnects < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    stats = grabber.stats()
+
+    assert stats.reconnects >= 2
+    assert stats.frames_decoded > FRAMES
+    # Stopping releases the source.
+    assert not stats.connected
+
+
+def test_read_without_fresh_frame_times_out(video) -> None:
+    with LatestFrameGrabber(video) as grabber:
+        grabber.read(timeout=2.0)
+        grabber.stop()
+        frame, _ = grabber.read(timeout=0.1, fresh=False)
+        assert frame is not None
+        with pytest.raises(TimeoutError):
+            grabber.read(timeout=0.1)
+
+
+def test_unavailable_source(tmp_path) -> None:
+    opened = []
+
+    def factory(source):
+        opened.append(source)
+        return cv2.VideoCapture(source)
+
+    missing = str(tmp_path / "missing.avi")
+    with LatestFrameGrabber(
+        missing, reconnect_delay=0.01, max_reconnect_delay=0.02, capture_factory=factory
+    ) as grabber:
+        with pytest.raises(TimeoutError):
+            grabber.read(timeout=0.2)
+        stats = grabber.stats()
+
+    assert len(opened) > 1
+    assert not stats.connected
+    assert stats.frames_decoded == 0
+    assert stats.frame_age == float("inf")
+    assert stats.reconnects == 0
+
+
+class SilentCapture:
+    """Source that opens but never delivers a frame."""
+
+    def isOpened(self) -> bool:
+        return True
+
+    def set(self, prop, value) -> bool:
+        return True
+
+    def get(self, prop) -> float:
+        return 0.0
+
+    def read(self):
+        return False, None
+
+    def release(self) -> None:
+        pass
+
+
+def test_failed_reads_back_off() -> None:
+    opened = []
+
+    def factory(source):
+        opened.append(time.monotonic())
+        return SilentCapture()
+
+    with LatestFrameGrabber(
+        "rtsp://silent",
+        reconnect_delay=0.02,
+        max_reconnect_delay=0.08,
+        capture_factory=factory,
+    ) as grabber:
+        time.sleep(0.4)
+        stats = grabber.stats()
+
+    # 0.02 + 0.04 + 0.08 + 0.08 + ... instead of reopening at once.
+    assert 3 <= len(opened) <= 8
+    gaps = np.diff(opened)
+    assert gaps[0] >= 0.02
+    assert gaps[-1] >= 0.08
+    assert stats.reconnects == len(opened) - 1
+    assert stats.frames_decoded == 0
@@ -0,0 +1,167 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from jemdzem.client import JemdzemClient, JemdzemError
+from jemdzem.request_formats import parse_image_request
+
+IMAGE = np.zeros((30, 40, 3), np.uint8)
+
+
+def make_app(failures: int = 0, status_code: int = 503, delay: float = 0.0):
+    """Echo the parsed request after ``failures`` error responses."""
+
+    app = FastAPI()
+    state = {"calls": 0, "in_flight": 0, "max_in_flight": 0}
+    app.state.calls = state
+
+    async def echo(request: Request):
+        state["calls"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(delay)
+            if state["calls"] <= failures:
+                return JSONResponse({"detail": "busy"}, status_code=status_code)
+            payload = await parse_image_request(request)
+            return {
+                "path": request.url.path,
+                "shape": list(payload.image.shape),
+                "refs": sorted(payload.refs),
+                "params": payload.params,
+                "query": dict(request.query_params),
+                "headers": {
+                    name: request.headers.get(name)
+                    for name in ("x-api-key", "x-priority", "x-request-timeout")
+                },
+            }
+        finally:
+            state["in_flight"] -= 1
+
+    for path in ("/multi-detect", "/single-detect"):
+        app.post(path)(echo)
+
+    @app.post("/qa")
+    async def qa(request: Request):
+        result = await echo(request)
+        if isinstance(result, JSONResponse):
+            return result
+        return {"answer": result["params"]["question"]}
+
+    return app
+
+
+def client_for(app, **kwargs) -> JemdzemClient:
+    return JemdzemClient(
+        base_url="http://test",
+        api_key="key",
+        model_name="model",
+        backoff=0.001,
+        transport=httpx.ASGITransport(app=app),
+        **kwargs,
+    )
+
+
+def test_typed_calls_build_requests_the_server_parses() -> None:
+    async def main():
+        async with client_for(make_app(), priority="emergency") as client:
+            detections = await client.multi_detect(
+                IMAGE, ["pipe"], ["orange pipes"], timeout=5
+            )
+            single = await client.single_detect(
+                IMAGE, ["pipe", "barrel"], ["a", "b"], refs={"pipe": IMAGE}
+            )
+            answer = await client.qa(IMAGE, "why?", model_name="other")
+            return detections, single, answer
+
+    detections, single, answer = asyncio.run(main())
+    assert detections["path"] == "/multi-detect"
+    assert detections["shape"] == [30, 40, 3]
+    assert detections["params"] == {
+        "labels": ["pipe"],
+        "descriptions": ["orange pipes"],
+    }
+    assert detections["query"] == {"model_name": "model"}
+    assert detections["headers"] == {
+        "x-api-key": "key",
+        "x-priority": "emergency",
+        "x-request-timeout": "5",
+    }
+    assert single["refs"] == ["pipe"]
+    assert answer == "why?"
+
+
+def test_overload_is_retried() -> None:
+    app = make_app(failures=2)
+
+    async def main():
+        async with client_for(app) as client:
+            await client.multi_detect(IMAGE, ["pipe"], ["d"])
+            return client.timings, client.timing_summary()
+
+    timings, summary = asyncio.run(main())
+    assert app.state.calls["calls"] == 3
+    assert timings[0].attempts == 3
+    assert timings[0].status_code == 200
+    assert summary["/multi-detect"]["calls"] == 1
+    assert summary["/multi-detect"]["retries"] == 2
+
+
+def test_errors_are_raised_after_retries() -> None:
+    async def call(app, **kwargs):
+        async with client_for(app, **kwargs) as client:
+            await client.qa(IMAGE, "why?")
+
+    app = make_app(failures=10)
+    with pytest.raises(JemdzemError) as error:
+        asyncio.run(call(app, retries=1))
+    assert error.value.status_code == 503
+    assert error.value.detail == "busy"
+    assert app.state.calls["calls"] == 2
+
+    # Client errors are not retried.
+    app = make_app(failures=10, status_code=422)
+    with pytest.raises(JemdzemError):
+        asyncio.run(call(app))
+    assert app.state.calls["calls"] == 1
+
+
+def test_concurrency_is_capped() -> None:
+    app = make_app(delay=0.02)
+
+    async def main():
+        async with client_for(app, max_concurrency=3) as client:
+            await asyncio.gather(
+                *(client.multi_detect(IMAGE, ["pipe"], ["d"]) for _ in range(9))
+            )
+            return client.timings
+
+    timings = asyncio.run(main())
+    assert app.state.calls["max_in_flight"] == 3
+    assert len(timings) == 9
+    assert max(timing.queued for timing in timings) > 0.03
+
+
+def test_connection_errors_are_retried() -> None:
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        raise httpx.ConnectError("refused", request=request)
+
+    async def main():
+        async with JemdzemClient(
+            base_url="http://test",
+            retries=2,
+            backoff=0.001,
+            transport=httpx.MockTransport(handler),
+        ) as client:
+            await client.ocr(b"not decoded by the mock")
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(main())
+    assert len(attempts) == 3
@@ -0,0 +1,100 @@
+import math
+
+import numpy as np
+import pytest
+
+from modules.fusion import ObjectMap
+from modules.get_coordinates import calculate_new_coordinates_batch
+
+ORIGIN = (50.272639, 18.670972)
+
+
+def offsets_to_wgs84(offsets) -> tuple[np.ndarray, np.ndarray]:
+    coordinates = calculate_new_coordinates_batch(
+        *ORIGIN, np.asarray(offsets, dtype=np.float64), mode="fast"
+    )
+    return coordinates[:, 0], coordinates[:, 1]
+
+
+def test_repeated_passes_do_not_duplicate_objects() -> None:
+    rng = np.random.default_rng(0)
+    truth = rng.uniform(-200, 200, (50, 2))
+    fusion = ObjectMap(radius=3.0)
+
+    first = fusion.update(*offsets_to_wgs84(truth), ["barrell"] * 50)
+    assert len(first) == 50
+    for timestamp in range(1, 6):
+        noisy = truth + rng.normal(0, 0.5, truth.shape)
+        fusion.update(*offsets_to_wgs84(noisy), ["barrell"] * 50, timestamp=timestamp)
+
+    assert len(fusion) == 50
+    assert sorted(fusion.last_ids.tolist()) == list(range(50))
+    assert all(obj.observations == 6 for obj in fusion.objects)
+    assert all(obj.last_seen == 5 for obj in fusion.objects)
+    assert all(obj.confidence == pytest.approx(1 - 0.5**6) for obj in fusion.objects)
+
+
+def test_position_is_running_weighted_mean() -> None:
+    fusion = ObjectMap(radius=5.0)
+    fusion.update(*offsets_to_wgs84([[0.0, 0.0]]), ["pipe"], scores=[0.5])
+    fusion.update(*offsets_to_wgs84([[3.0, 0.0]]), ["pipe"], scores=[1.0])
+
+    (obj,) = fusion.objects
+    (lat,), (lng,) = offsets_to_wgs84([[2.0, 0.0]])
+    assert obj.lat == pytest.approx(lat, abs=1e-9)
+    assert obj.lng == pytest.approx(lng, abs=1e-9)
+    assert obj.confidence == pytest.approx(1.0)
+
+
+def test_labels_and_same_frame_detections_are_kept_apart() -> None:
+    fusion = ObjectMap(radius=3.0)
+    changed = fusion.update(
+        *offsets_to_wgs84([[0.0, 0.0], [0.5, 0.0], [0.0, 0.5]]),
+        ["barrell", "barrell", "palette"],
+    )
+    assert len(changed) == 3
+    assert sorted(fusion.last_ids.tolist()) == [0, 1, 2]
+    assert sorted(obj.label for obj in fusion.objects) == [
+        "barrell",
+        "barrell",
+        "palette",
+    ]
+
+
+def test_only_new_or_changed_objects_are_returned() -> None:
+    fusion = ObjectMap(radius=3.0, min_move=0.5, min_confidence_change=0.1)
+    fusion.update(*offsets_to_wgs84([[0.0, 0.0], [50.0, 0.0]]), ["car", "car"])
+
+    # Confidence 0.5 -> 0.75 is reported, the tiny shift alone would not be.
+    changed = fusion.update(*offsets_to_wgs84([[0.1, 0.0]]), ["car"])
+    assert [obj.object_id for obj in changed] == [0]
+
+    changed = fusion.update(*offsets_to_wgs84([[0.1, 0.0]]), ["car"], scores=[0.01])
+    assert changed == []
+
+    changed = fusion.update(
+        *offsets_to_wgs84([[52.0, 0.0], [100.0, 0.0]]), ["car", "car"], scores=[1, 1]
+    )
+    assert [obj.object_id for obj in changed] == [1, 2]
+
+
+def test_save_and_load_round_trip(tmp_path) -> None:
+    fusion = ObjectMap(radius=4.0)
+    fusion.update(*offsets_to_wgs84([[0.0, 0.0], [20.0, 5.0]]), ["pipe", "car"])
+    fusion.update(*offsets_to_wgs84([[1.0, 0.0]]), ["pipe"], timestamp=3.0)
+    fusion.save(tmp_path / "map.json")
+
+    loaded = ObjectMap.load(tmp_path / "map.json")
+    assert loaded.radius == 4.0
+    assert loaded.objects == fusion.objects
+
+    changed = loaded.update(*offsets_to_wgs84([[20.5, 5.0]]), ["car"])
+    assert [obj.label for obj in changed] == ["car"]
+    assert len(loaded) == 2
+    assert math.isclose(changed[0].confidence, 0.75)
+
+
+def test_empty_update() -> None:
+    fusion = ObjectMap()
+    assert fusion.update([], [], []) == []
+    assert fusion.origin is None
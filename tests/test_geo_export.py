@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from modules.geo_export import (
+    CSVExporter,
+    GeoJSONExporter,
+    export_points,
+    format_dms,
+    open_exporter,
+)
+
+LAT = np.array([50.272639, -33.5, 0.0])
+LNG = np.array([18.670972, -70.25, 0.0])
+RECORDS = [
+    {"label": "barrell", "time": 1.5},
+    {"label": "person", "time": 2.0},
+    {"label": "<car & co>", "time": 3.0},
+]
+
+
+def test_format_dms() -> None:
+    assert format_dms(LAT, "N", "S") == [
+        "50°16'21.500400\"N",
+        "33°30'00.000000\"S",
+        "0°00'00.000000\"N",
+    ]
+
+
+def test_geojson_in_batches(tmp_path) -> None:
+    path = tmp_path / "points.geojson"
+    with open_exporter(str(path)) as exporter:
+        exporter.write(LAT[:2], LNG[:2], RECORDS[:2])
+        exporter.write([], [], [])
+        exporter.write(LAT[2:], LNG[2:], RECORDS[2:])
+    assert exporter.count == 3
+
+    data = json.loads(path.read_text())
+    assert data["type"] == "FeatureCollection"
+    assert [f["geometry"]["coordinates"] for f in data["features"]] == np.column_stack(
+        (LNG, LAT)
+    ).tolist()
+    assert [f["properties"] for f in data["features"]] == RECORDS
+
+
+def test_empty_geojson_is_valid() -> None:
+    buffer = io.StringIO()
+    GeoJSONExporter(buffer).close()
+    assert json.loads(buffer.getvalue()) == {
+        "type": "FeatureCollection",
+        "features": [],
+    }
+
+
+def test_kml(tmp_path) -> None:
+    path = tmp_path / "points.kml"
+    assert export_points(str(path), LAT, LNG, iter(RECORDS), batch_size=2) == 3
+
+    ns = {"kml": "http://www.opengis.net/kml/2.2"}
+    placemarks = ET.parse(path).getroot().findall(".//kml:Placemark", ns)
+    assert [p.find("kml:name", ns).text for p in placemarks] == [
+        r["label"] for r in RECORDS
+    ]
+    coordinates = placemarks[1].find(".//kml:coordinates", ns).text
+    assert coordinates == "-70.25,-33.5"
+
+
+def test_csv(tmp_path) -> None:
+    path = tmp_path / "points.csv"
+    export_points(str(path), LAT, LNG, RECORDS, batch_size=1)
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["label"] for row in rows] == [r["label"] for r in RECORDS]
+    assert rows[1]["lat_dms"] == "33°30'00.000000\"S"
+    assert rows[1]["lng_dms"] == "70°15'00.000000\"W"
+    assert float(rows[0]["lat"]) == LAT[0]
+
+
+def test_csv_fieldnames_and_header_without_points() -> None:
+    buffer = io.StringIO()
+    with CSVExporter(buffer, fieldnames=["label"]) as exporter:
+        exporter.write(LAT[:1], LNG[:1], RECORDS[:1])
+    assert buffer.getvalue().splitlines()[0] == "lat,lng,lat_dms,lng_dms,label"
+
+    buffer = io.StringIO()
+    CSVExporter(buffer, fieldnames=["label"]).close()
+    assert buffer.getvalue().strip() == "lat,lng,lat_dms,lng_dms,label"
+
+
+def test_errors(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        open_exporter(str(tmp_path / "points.shp"))
+    with (
+        pytest.raises(ValueError),
+        open_exporter(str(tmp_path / "points.csv")) as exporter,
+    ):
+        exporter.write(LAT, LNG, RECORDS[:1])
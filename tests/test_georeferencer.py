@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+import pytest
+
+from modules import get_coordinates
+from modules.georeferencer import FrameTelemetry, GeoReferencer
+from modules.projection import GroundProjector, TerrainGrid
+
+CAMERA_MATRIX = np.array([[400.0, 0, 320.0], [0, 400.0, 240.0], [0, 0, 1]])
+DIST_COEFFS = np.array([-0.024, -0.063, -0.010, -0.011, 0.205])
+TELEMETRY = FrameTelemetry(lat=50.2726, lng=18.6710, altitude=40.0, heading=25.0)
+
+
+def make_pixels(n: int = 100) -> np.ndarray:
+    return np.random.default_rng(0).random((n, 2)) * [640.0, 480.0]
+
+
+def test_nadir_matches_translate_and_exact_geodesic() -> None:
+    pixels = make_pixels()
+    frame = GeoReferencer(CAMERA_MATRIX, DIST_COEFFS).frame(TELEMETRY)
+
+    offsets = get_coordinates.translate_batch(
+        pixels, 40.0, CAMERA_MATRIX, DIST_COEFFS, math.radians(25.0)
+    )
+    expected = get_coordinates.calculate_new_coordinates_batch(
+        TELEMETRY.lat, TELEMETRY.lng, offsets
+    )
+
+    # The tangent-plane approximation is within millimetres at this range.
+    np.testing.assert_allclose(frame.to_wgs84(pixels), expected, rtol=0, atol=1e-8)
+
+
+def test_pitched_matches_projector() -> None:
+    telemetry = FrameTelemetry(50.0, 19.0, 60.0, heading=-40.0, pitch=-50.0, roll=3.0)
+    pixels = make_pixels()
+    frame = GeoReferencer(CAMERA_MATRIX, DIST_COEFFS).frame(telemetry)
+
+    offsets = GroundProjector(CAMERA_MATRIX, DIST_COEFFS).project(
+        pixels, 60.0, math.radians(-40.0), math.radians(-50.0), math.radians(3.0)
+    )
+    expected = get_coordinates.calculate_new_coordinates_batch(
+        50.0, 19.0, offsets, mode="fast"
+    )
+
+    np.testing.assert_allclose(frame.to_wgs84(pixels), expected, rtol=0, atol=1e-11)
+
+
+def test_rays_above_horizon_are_nan() -> None:
+    telemetry = FrameTelemetry(50.0, 19.0, 60.0, pitch=-5.0)
+    frame = GeoReferencer(CAMERA_MATRIX, np.zeros(5)).frame(telemetry)
+
+    coords = frame.to_wgs84([[320.0, 0.0], [320.0, 479.0]])
+
+    assert np.isnan(coords[0]).all()
+    assert np.isfinite(coords[1]).all()
+
+
+def test_centres_and_corners() -> None:
+    frame = GeoReferencer(CAMERA_MATRIX, DIST_COEFFS).frame(TELEMETRY)
+    boxes = np.array([[100.0, 50.0, 40.0, 20.0], [0.0, 0.0, 640.0, 480.0]])
+
+    centres = frame.centres(boxes)
+    corners = frame.corners(boxes)
+
+    np.testing.assert_allclose(centres, frame.to_wgs84([[120, 60], [320, 240]]))
+    np.testing.assert_allclose(
+        corners[0], frame.to_wgs84([[100, 50], [140, 50], [140, 70], [100, 70]])
+    )
+    assert corners.shape == (2, 4, 2)
+    # The image centre of a nadir camera is right below the drone.
+    np.testing.assert_allclose(centres[1], [TELEMETRY.lat, TELEMETRY.lng], atol=1e-6)
+
+
+def test_empty_batch() -> None:
+    frame = GeoReferencer(CAMERA_MATRIX, DIST_COEFFS).frame(TELEMETRY)
+    assert frame.to_wgs84(np.empty((0, 2))).shape == (0, 2)
+    assert frame.corners(np.empty((0, 4))).shape == (0, 4, 2)
+
+
+def test_flat_terrain_matches_plane() -> None:
+    terrain = TerrainGrid(np.full((10, 10), 100.0), (50.28, 18.66), (2e-3, 2e-3))
+    raised = FrameTelemetry(TELEMETRY.lat, TELEMETRY.lng, 140.0, TELEMETRY.heading)
+    pixels = make_pixels()
+
+    with_terrain = GeoReferencer(CAMERA_MATRIX, DIST_COEFFS, terrain).frame(raised)
+    plane = GeoReferencer(CAMERA_MATRIX, DIST_COEFFS).frame(TELEMETRY)
+
+    np.testing.assert_allclose(
+        with_terrain.to_wgs84(pixels), plane.to_wgs84(pixels), rtol=0, atol=1e-11
+    )
+
+
+@pytest.mark.parametrize("heading", [0.0, 90.0])
+def test_heading_orientation(heading: float) -> None:
+    frame = GeoReferencer(CAMERA_MATRIX, np.zeros(5)).frame(
+        FrameTelemetry(50.0, 19.0, 100.0, heading=heading)
+    )
+
+    lat, lng = frame.to_wgs84([[320.0, 0.0]])[0]
+
+    # The top edge of the image points along the heading.
+    if heading == 0.0:
+        assert lat > 50.0 and math.isclose(lng, 19.0)
+    else:
+        assert lng > 19.0 and math.isclose(lat, 50.0)
@@ -46,6 +46,34 @@ def test_under_one_degree(deg: float, expected: Tuple[int, int, int, int]) -> No
     assert math.isclose(back, deg, rel_tol=0, abs_tol=1e-6)
 
 
+def test_dms_batch_matches_scalar() -> None:
+    rng = np.random.default_rng(0)
+    # Random values plus values whose seconds sit exactly on a rounding half
+    # and values that carry into the next minute or degree.
+    halves = (
+        rng.integers(-180, 180, 2000)
+        + (rng.integers(0, 3600 * 10**6, 2000) + 0.5) / 3.6e9
+    )
+    degrees = np.concatenate(
+        (
+            rng.uniform(-180.0, 180.0, 2000),
+            halves,
+            [0, -0.0, -15.5, 0.5, -0.75, 179.9999999999, 12.99999999999, -1e-12],
+        )
+    )
+
+    sign, d, m, s = get_coordinates.degrees_to_d_m_s_batch(degrees)
+    for i, deg in enumerate(degrees.tolist()):
+        expected = get_coordinates.degrees_to_d_m_s(deg)
+        assert (sign[i], d[i], m[i], s[i]) == expected
+        assert get_coordinates.d_m_s_to_degrees_batch(
+            sign[i], d[i], m[i], s[i]
+        ) == get_coordinates.d_m_s_to_degrees(*expected)
+
+    back = get_coordinates.d_m_s_to_degrees_batch(sign, d, m, s)
+    np.testing.assert_allclose(back, degrees, rtol=0, atol=1e-6)
+
+
 def make_camera() -> Tuple[np.ndarray, np.ndarray, Tuple[float, float]]:
     """Return camera intrinsics used by the translate tests.
 
@@ -232,3 +260,91 @@ def test_pixels_to_meters_basic(pixels: int, expected: float) -> None:
         rel_tol=0,
         abs_tol=1e-6,
     )
+
+
+@pytest.mark.parametrize("angle", [0.0, math.radians(30), math.radians(-135)])
+def test_translate_batch_matches_translate(angle: float) -> None:
+    camera_matrix, _, _ = make_camera()
+    dist_coeffs = np.array([-0.024, -0.063, -0.010, -0.011, 0.205])
+    altitude = 100.0
+    rng = np.random.default_rng(0)
+    pixels = rng.random((50, 2)) * [5472.0, 3648.0]
+
+    batch = get_coordinates.translate_batch(
+        pixels, altitude, camera_matrix, dist_coeffs, angle
+    )
+
+    assert batch.shape == (50, 2)
+    for (x, y), (dx, dy) in zip(pixels, batch):
+        expected = get_coordinates.translate(
+            x, y, altitude, camera_matrix, dist_coeffs, angle
+        )
+        # ``translate`` works in float32, the batch version in float64.
+        assert math.isclose(dx, expected[0], rel_tol=0, abs_tol=1e-4)
+        assert math.isclose(dy, expected[1], rel_tol=0, abs_tol=1e-4)
+
+
+def test_translate_batch_empty() -> None:
+    camera_matrix, dist_coeffs, _ = make_camera()
+    result = get_coordinates.translate_batch(
+        np.empty((0, 2)), 100.0, camera_matrix, dist_coeffs
+    )
+    assert result.shape == (0, 2)
+
+
+def test_calculate_new_coordinates_batch_exact() -> None:
+    deltas = np.array([[0.0, 0.0], [30.0, 40.0], [-10.0, 5.0]])
+    result = get_coordinates.calculate_new_coordinates_batch(LAT, LNG, deltas)
+
+    assert result.shape == (3, 2)
+    for (dx, dy), (new_lat, new_lng) in zip(deltas, result):
+        assert (new_lat, new_lng) == get_coordinates.calculate_new_coordinates(
+            LAT, LNG, dx, dy
+        )
+
+
+@pytest.mark.parametrize("lat", [-80.0, -45.0, 0.0, 30.0, 50.0, 70.0, 80.0])
+def test_calculate_new_coordinates_batch_fast_error_bound(lat: float) -> None:
+    rng = np.random.default_rng(0)
+    deltas = rng.uniform(-100.0, 100.0, (200, 2))
+
+    fast = get_coordinates.calculate_new_coordinates_batch(
+        lat, LNG, deltas, mode="fast"
+    )
+    exact = get_coordinates.calculate_new_coordinates_batch(lat, LNG, deltas)
+
+    distances = np.hypot(deltas[:, 0], deltas[:, 1])
+    bounds = distances**2 * (1 + abs(math.tan(math.radians(lat)))) / 6378137.0
+    for (f_lat, f_lng), (e_lat, e_lng), bound in zip(fast, exact, bounds):
+        error = Geodesic.WGS84.Inverse(f_lat, f_lng, e_lat, e_lng)["s12"]
+        assert error <= bound + 1e-9
+
+
+def test_calculate_new_coordinates_batch_per_point_origin() -> None:
+    lats = np.array([10.0, 50.0])
+    lngs = np.array([19.0, -120.0])
+    deltas = np.array([[10.0, 0.0], [0.0, -10.0]])
+    for mode in ("exact", "fast"):
+        result = get_coordinates.calculate_new_coordinates_batch(
+            lats, lngs, deltas, mode=mode
+        )
+        assert result[0, 1] > lngs[0]
+        assert result[1, 0] < lats[1]
+
+
+def test_calculate_new_coordinates_batch_unknown_mode() -> None:
+    with pytest.raises(ValueError):
+        get_coordinates.calculate_new_coordinates_batch(
+            LAT, LNG, np.zeros((1, 2)), mode="approximate"
+        )
+
+
+def test_wgs84_to_local_inverts_fast_mode() -> None:
+    deltas = np.random.default_rng(0).uniform(-300.0, 300.0, (20, 2))
+    coords = get_coordinates.calculate_new_coordinates_batch(
+        50.27, 18.67, deltas, mode="fast"
+    )
+
+    local = get_coordinates.wgs84_to_local(coords[:, 0], coords[:, 1], 50.27, 18.67)
+
+    np.testing.assert_allclose(local, deltas, atol=1e-6)
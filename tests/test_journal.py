@@ -0,0 +1,212 @@
+import threading
+import time
+
+import pytest
+
+from inspekcja.raporting.journal import ReportJournal
+from inspekcja.raporting.publisher import InMemoryReference, PointPublisher
+
+
+class Uplink:
+    """Database reference whose updates fail while ``down`` is set."""
+
+    def __init__(self, data=None) -> None:
+        self.root = InMemoryReference(data)
+        self.down = False
+        self.updates = []
+
+    def child(self, path):
+        if self.down:
+            raise ConnectionError("no uplink")
+        return self.root.child(path)
+
+    def update(self, value):
+        if self.down:
+            raise ConnectionError("no uplink")
+        self.updates.append(dict(value))
+        self.root.update(value)
+
+
+def point(i: int) -> dict:
+    return {"type": "pipe", "gps_coords": [50.0, 18.0 + i * 1e-5]}
+
+
+def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_entries_are_sent_in_order_in_batches(tmp_path) -> None:
+    uplink = Uplink()
+    journal = ReportJournal(str(tmp_path / "journal.sqlite3"), PointPublisher(uplink))
+    journal.record_point(point(0))
+    journal.record_update({"missing/barrel": "Missing 1 barrel(s)"})
+    journal.record_point(point(1))
+    journal.record_clear()
+    journal.record_point(point(2))
+    journal.record_update({"generate": True})
+    assert journal.backlog() == 6
+
+    assert journal.flush() == 6
+    # Points before the clear, the clear alone, then the rest
+    assert len(uplink.updates) == 3
+    assert uplink.updates[1] == {"points": None}
+    assert uplink.root.get() == {
+        "points": [point(2)],
+        "missing": {"barrel": "Missing 1 barrel(s)"},
+        "generate": True,
+    }
+    assert journal.stats()["backlog"] == 0
+    assert journal.stats()["sent"] == 6
+
+
+def test_idempotency_keys_deduplicate_records(tmp_path) -> None:
+    uplink = Uplink()
+    journal = ReportJournal(str(tmp_path / "journal.sqlite3"), PointPublisher(uplink))
+    assert journal.record_point(point(0), key="barrel-7") == "barrel-7"
+    journal.record_point(point(0), key="barrel-7")
+    assert journal.backlog() == 1
+    journal.flush()
+    journal.record_point(point(0), key="barrel-7")
+    assert journal.backlog() == 0
+    assert uplink.root.child("points").get() == [point(0)]
+
+
+def test_failed_batches_stay_in_the_journal_and_keep_their_paths(tmp_path) -> None:
+    uplink = Uplink({"points": [point(0)]})
+    journal = ReportJournal(str(tmp_path / "journal.sqlite3"), PointPublisher(uplink))
+    journal.record_point(point(1))
+    journal.record_point(point(2))
+    journal.flush()
+    assert uplink.root.child("points").get() == [point(0), point(1), point(2)]
+
+    # The update is applied but its acknowledgement is lost
+    applied = uplink.update
+
+    def lost_ack(value):
+        applied(value)
+        raise TimeoutError("no acknowledgement")
+
+    uplink.update = lost_ack
+    journal.record_point(point(3))
+    with pytest.raises(TimeoutError):
+        journal.flush()
+    assert journal.backlog() == 1
+
+    uplink.update = applied
+    journal.flush()
+    assert uplink.root.child("points").get() == [point(i) for i in range(4)]
+
+
+def test_a_restarted_journal_resends_without_duplicates(tmp_path) -> None:
+    path = str(tmp_path / "journal.sqlite3")
+    uplink = Uplink()
+    first = ReportJournal(path, PointPublisher(uplink))
+    first.record_point(point(0))
+    first.record_point(point(1))
+    first.flush()
+    first.record_point(point(2))
+    first.record_point(point(3))
+    # Paths 2 and 3 are reserved, then the uplink drops before the update
+    applied = uplink.update
+
+    def drop(value):
+        raise ConnectionError("no uplink")
+
+    uplink.update = drop
+    with pytest.raises(ConnectionError):
+        first.flush()
+    assert first.close(timeout=0) == 2
+
+    # The next run starts with points of its own in the queue
+    uplink.update = applied
+    second = ReportJournal(path, PointPublisher(uplink))
+    second.record_point(point(4))
+    assert second.flush() == 3
+    assert uplink.root.child("points").get() == [point(i) for i in range(5)]
+
+
+def test_background_flusher_retries_with_backoff(tmp_path) -> None:
+    uplink = Uplink()
+    uplink.down = True
+    journal = ReportJournal(
+        str(tmp_path / "journal.sqlite3"),
+        PointPublisher(uplink),
+        interval=0.01,
+        backoff=0.01,
+        max_backoff=0.02,
+    )
+    with journal:
+        start = time.perf_counter()
+        for i in range(20):
+            journal.record_point(point(i))
+        # Recording does not wait for the uplink
+        assert time.perf_counter() - start < 0.5
+        wait_for(lambda: journal.failures >= 3)
+        assert journal.stats()["backlog"] == 20
+        assert "no uplink" in journal.stats()["last_error"]
+
+        uplink.down = False
+        wait_for(lambda: journal.backlog() == 0)
+    assert uplink.root.child("points").get() == [point(i) for i in range(20)]
+
+
+def test_batch_holds_the_flusher_back(tmp_path) -> None:
+    uplink = Uplink()
+    journal = ReportJournal(
+        str(tmp_path / "journal.sqlite3"), PointPublisher(uplink), interval=10.0
+    )
+    with journal:
+        journal.record_update({"answer": "no"})
+        wait_for(lambda: journal.backlog() == 0)
+        with journal.batch():
+            for i in range(5):
+                journal.record_point(point(i))
+            time.sleep(0.05)
+            assert journal.backlog() == 5
+        wait_for(lambda: journal.backlog() == 0)
+    assert len(uplink.updates) == 2
+
+
+def test_close_keeps_the_backlog_when_offline(tmp_path) -> None:
+    uplink = Uplink()
+    uplink.down = True
+    journal = ReportJournal(str(tmp_path / "journal.sqlite3"), PointPublisher(uplink))
+    journal.start()
+    journal.record_point(point(0))
+    start = time.perf_counter()
+    assert journal.close(timeout=0.1) == 1
+    assert time.perf_counter() - start < 1.0
+    assert journal.close() == 0
+
+
+def test_close_lets_a_blocked_send_finish(tmp_path) -> None:
+    path = str(tmp_path / "journal.sqlite3")
+    uplink = Uplink()
+    release = threading.Event()
+    sending = threading.Event()
+    update = uplink.update
+
+    def slow_update(value):
+        sending.set()
+        release.wait()
+        update(value)
+
+    uplink.update = slow_update
+    journal = ReportJournal(path, PointPublisher(uplink)).start()
+    journal.record_point(point(0))
+    assert sending.wait(2.0)
+    thread = journal._thread
+    assert journal.close(timeout=0.0) == 1
+    assert thread.is_alive()
+
+    # The send completes after close() and is still recorded as sent.
+    release.set()
+    thread.join(2.0)
+    assert not thread.is_alive()
+    assert uplink.root.get() == {"points": [point(0)]}
+    reopened = ReportJournal(path, PointPublisher(Uplink()))
+    assert reopened.backlog() == 0
+    reopened.close()
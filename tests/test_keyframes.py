@@ -0,0 +1,81 @@
+import cv2
+import numpy as np
+import pytest
+
+from modules.capture import LatestFrameGrabber
+from modules.keyframes import KeyframeSelector, iter_keyframes
+
+
+@pytest.fixture(scope="module")
+def world() -> np.ndarray:
+    """Textured ground larger than a frame."""
+
+    rng = np.random.default_rng(0)
+    noise = (rng.random((900, 2400)) * 255).astype(np.uint8)
+    return cv2.cvtColor(cv2.GaussianBlur(noise, (0, 0), 2), cv2.COLOR_GRAY2BGR)
+
+
+def view(world: np.ndarray, x: int, y: int = 50) -> np.ndarray:
+    return world[y : y + 720, x : x + 1280]
+
+
+def test_overlap_from_shift(world) -> None:
+    selector = KeyframeSelector(max_overlap=0.6)
+    assert selector.consider(view(world, 0)).selected
+
+    score = selector.consider(view(world, 128, 86))
+    assert score.reason == "overlap"
+    assert score.shift == pytest.approx((-128, -36), abs=4)
+    assert score.overlap == pytest.approx(0.9 * 0.95, abs=0.02)
+
+    # Far enough from the previous keyframe: new ground.
+    assert selector.consider(view(world, 640)).selected
+    assert selector.consider(view(world, 700)).reason == "overlap"
+
+
+def test_blur_and_exposure_are_rejected(world) -> None:
+    selector = KeyframeSelector()
+    frame = view(world, 0)
+
+    assert selector.consider(frame).selected
+    # Blurred relative to the frames before it.
+    blurred = cv2.blur(view(world, 1000), (31, 1))
+    assert selector.consider(blurred).reason == "blur"
+    # Below the absolute floor even as the first frame.
+    flat = cv2.GaussianBlur(frame, (0, 0), 15)
+    assert KeyframeSelector().consider(flat).reason == "blur"
+
+    dark = cv2.convertScaleAbs(frame, alpha=0.2)
+    assert KeyframeSelector(min_sharpness=0).consider(dark).reason == "exposure"
+    bright = cv2.convertScaleAbs(frame, alpha=1.0, beta=200)
+    assert KeyframeSelector(min_sharpness=0).consider(bright).reason == "exposure"
+
+
+def test_budget_and_report(world) -> None:
+    selector = KeyframeSelector(max_overlap=1.0, max_fraction=0.25)
+    reasons = [selector.consider(view(world, x)).reason for x in range(0, 800, 100)]
+
+    assert reasons.count("selected") == 2
+    assert reasons.count("budget") == 6
+    report = selector.report()
+    assert report["considered"] == 8
+    assert report["selected_fraction"] == 0.25
+    assert report["counts"]["budget"] == 6
+    assert report["thresholds"]["max_fraction"] == 0.25
+
+
+def test_iter_keyframes(tmp_path, world) -> None:
+    path = str(tmp_path / "flight.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 50, (640, 360))
+    for x in range(0, 1000, 20):
+        writer.write(cv2.resize(view(world, x), (640, 360)))
+    writer.release()
+
+    selector = KeyframeSelector(max_overlap=0.5)
+    with LatestFrameGrabber(path, pace=True) as grabber:
+        keyframes = list(iter_keyframes(grabber, selector, duration=0.8))
+
+    assert 1 < len(keyframes) < selector.considered
+    frame, _, score = keyframes[-1]
+    assert frame.shape == (360, 640, 3)
+    assert score.selected
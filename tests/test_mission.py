@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from jemdzem.mission import MissionRunner, MissionTask
+
+IMAGE = np.zeros((30, 40, 3), np.uint8)
+
+
+def sleeper(delay: float, value, log: list | None = None):
+    async def run(context):
+        await asyncio.sleep(delay)
+        if log is not None:
+            log.append(value)
+        return value
+
+    return run
+
+
+def test_tasks_run_concurrently_and_commit_in_arrival_order() -> None:
+    committed = []
+
+    def commit(context, result):
+        committed.append(result)
+        context.canvas[0, 0] = 255
+
+    tasks = [
+        MissionTask("slow", sleeper(0.15, "slow"), commit),
+        MissionTask("fast", sleeper(0.05, "fast"), commit),
+        MissionTask("medium", sleeper(0.1, "medium"), commit),
+    ]
+    report = asyncio.run(MissionRunner().run(IMAGE, tasks))
+
+    assert committed == ["fast", "medium", "slow"]
+    assert report.results == {"slow": "slow", "fast": "fast", "medium": "medium"}
+    assert report.elapsed < 0.25
+    assert [task.name for task in report.tasks] == ["slow", "fast", "medium"]
+    assert all(task.committed >= task.finished for task in report.tasks)
+    assert report.failed == []
+    # Commits draw on a copy; run steps keep reading the captured frame.
+    assert IMAGE[0, 0, 0] == 0
+    assert report.context.canvas[0, 0, 0] == 255
+
+
+def test_concurrency_cap() -> None:
+    running = []
+    peak = []
+
+    async def run(context):
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.pop()
+
+    tasks = [MissionTask(f"task{i}", run) for i in range(6)]
+    asyncio.run(MissionRunner(max_concurrency=2).run(IMAGE, tasks))
+    assert max(peak) == 2
+
+
+def test_plain_functions_run_in_threads() -> None:
+    def run(context):
+        time.sleep(0.05)
+        return threading.current_thread() is threading.main_thread()
+
+    tasks = [MissionTask(f"cpu{i}", run) for i in range(3)]
+    report = asyncio.run(MissionRunner().run(IMAGE, tasks))
+    assert set(report.results.values()) == {False}
+    assert report.elapsed < 0.14
+
+
+def test_failures_are_recorded_without_stopping_other_tasks(tmp_path) -> None:
+    committed = []
+
+    async def fail(context):
+        raise RuntimeError("no connection")
+
+    def bad_commit(context, result):
+        raise ValueError("bad result")
+
+    tasks = [
+        MissionTask("fails", fail, committed.append),
+        MissionTask("bad commit", sleeper(0.01, 1), bad_commit),
+        MissionTask("works", sleeper(0.02, 2), lambda context, r: committed.append(r)),
+    ]
+    report = asyncio.run(MissionRunner().run(IMAGE, tasks))
+
+    assert committed == [2]
+    assert report.failed == ["fails", "bad commit"]
+    assert "no connection" in report.tasks[0].error
+    assert report.tasks[0].committed is None
+
+    log = tmp_path / "missions.jsonl"
+    report.append_to(str(log))
+    report.append_to(str(log))
+    lines = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["failed"] == ["fails", "bad commit"]
+    assert lines[0]["tasks"][2]["elapsed"] > 0
+
+
+def test_shared_artefacts_are_prepared_once() -> None:
+    seen = []
+
+    async def run(context):
+        seen.append((context.encoded, context.refs))
+
+    tasks = [MissionTask(f"task{i}", run) for i in range(3)]
+    ref = np.full((5, 6, 3), 7, np.uint8)
+    asyncio.run(MissionRunner().run(IMAGE, tasks, refs={"pipe": ref, "raw": b"png"}))
+
+    assert all(encoded is seen[0][0] for encoded, _ in seen)
+    assert seen[0][0].startswith(b"\x89PNG")
+    assert seen[0][1]["raw"] == b"png"
+    assert seen[0][1]["pipe"].startswith(b"\x89PNG")
+
+
+def test_task_names_must_be_unique() -> None:
+    tasks = [MissionTask("a", sleeper(0, 1)), MissionTask("a", sleeper(0, 2))]
+    with pytest.raises(ValueError):
+        asyncio.run(MissionRunner().run(IMAGE, tasks))
@@ -0,0 +1,144 @@
+import json
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from modules.georeferencer import FrameTelemetry
+from modules.mosaic import MosaicGrid, build_mosaic, read_frame_index
+
+# 160x120 frames seen from 10 m with f = 100 px: 0.1 m per pixel.
+CAMERA_MATRIX = np.array([[100.0, 0, 80.0], [0, 100.0, 60.0], [0, 0, 1]])
+DIST_COEFFS = np.zeros(5)
+RESOLUTION = (160, 120)
+GRID = MosaicGrid(50.0, 19.0, gsd=0.1, tile_size=64)
+
+
+def write_frame(tmp_path, name: str, image: np.ndarray) -> str:
+    path = str(tmp_path / name)
+    cv2.imwrite(path, image)
+    return path
+
+
+def gradient_frame() -> np.ndarray:
+    row = np.linspace(0, 255, 160).astype(np.uint8)
+    return np.repeat(np.tile(row, (120, 1))[..., None], 3, axis=2)
+
+
+def mosaic_image(out_dir: str) -> np.ndarray:
+    """Stitch the PNG tiles of ``out_dir`` into one BGRA array."""
+
+    with open(os.path.join(out_dir, "mosaic.json")) as f:
+        index = json.load(f)
+    size = index["tile_size"]
+    xs = [t["x"] for t in index["tiles"]]
+    ys = [t["y"] for t in index["tiles"]]
+    image = np.zeros(
+        ((max(ys) - min(ys) + 1) * size, (max(xs) - min(xs) + 1) * size, 4), np.uint8
+    )
+    for tile in index["tiles"]:
+        row, col = (tile["y"] - min(ys)) * size, (tile["x"] - min(xs)) * size
+        image[row : row + size, col : col + size] = cv2.imread(
+            os.path.join(out_dir, tile["file"]), cv2.IMREAD_UNCHANGED
+        )
+    return image
+
+
+def run(frames, out_dir, workers=0):
+    return build_mosaic(
+        frames,
+        str(out_dir),
+        CAMERA_MATRIX,
+        DIST_COEFFS,
+        RESOLUTION,
+        gsd=GRID.gsd,
+        tile_size=GRID.tile_size,
+        workers=workers,
+        origin=(GRID.origin_lat, GRID.origin_lng),
+    )
+
+
+def test_grid_round_trip() -> None:
+    lat, lng = GRID.to_wgs84(12.5, -40.0)
+    east, north = GRID.to_metres(lat, lng)
+    assert east == pytest.approx(12.5)
+    assert north == pytest.approx(-40.0)
+
+
+def test_nadir_frame_footprint_and_orientation(tmp_path) -> None:
+    path = write_frame(tmp_path, "a.png", gradient_frame())
+    frames = [(path, FrameTelemetry(GRID.origin_lat, GRID.origin_lng, 10.0))]
+
+    index = run(frames, tmp_path / "out")
+    image = mosaic_image(str(tmp_path / "out"))
+    covered = image[..., 3] > 0
+
+    # Same ground sampling as the frame: one mosaic pixel per frame pixel.
+    assert covered.sum() == pytest.approx(160 * 120, rel=0.05)
+    # 160 x 120 px centred on the origin spans 4 x 2 tiles of 64 px.
+    assert len(index["tiles"]) == 8
+    rows, cols = np.nonzero(covered)
+    middle = (rows.min() + rows.max()) // 2
+    line = image[middle, cols.min() + 2 : cols.max() - 2, 0].astype(int)
+    # Heading 0: the left of the image lies west.
+    assert line[0] < 20 and line[-1] > 235
+    assert (np.diff(line) >= -1).all()
+
+
+def test_heading_rotates_frame(tmp_path) -> None:
+    path = write_frame(tmp_path, "a.png", gradient_frame())
+    frames = [(path, FrameTelemetry(GRID.origin_lat, GRID.origin_lng, 10.0, 180.0))]
+
+    run(frames, tmp_path / "out")
+    image = mosaic_image(str(tmp_path / "out"))
+
+    rows, cols = np.nonzero(image[..., 3])
+    middle = (rows.min() + rows.max()) // 2
+    assert image[middle, cols.min() + 2, 0] > 235
+    assert image[middle, cols.max() - 2, 0] < 20
+
+
+def test_overlapping_frames_blend(tmp_path) -> None:
+    dark = write_frame(tmp_path, "dark.png", np.full((120, 160, 3), 100, np.uint8))
+    bright = write_frame(tmp_path, "bright.png", np.full((120, 160, 3), 200, np.uint8))
+    lat, lng = GRID.to_wgs84(8.0, 0.0)
+    frames = [
+        (dark, FrameTelemetry(GRID.origin_lat, GRID.origin_lng, 10.0)),
+        (bright, FrameTelemetry(lat, lng, 10.0)),
+    ]
+
+    run(frames, tmp_path / "out")
+    image = mosaic_image(str(tmp_path / "out"))
+
+    values = image[..., 0][image[..., 3] > 0]
+    assert values.min() >= 99 and values.max() <= 201
+    assert ((values > 110) & (values < 190)).any()
+    # Accumulators are removed once the tiles are written.
+    assert not [f for f in os.listdir(tmp_path / "out") if f.endswith(".npy")]
+
+
+def test_process_pool_matches_serial(tmp_path) -> None:
+    path = write_frame(tmp_path, "a.png", gradient_frame())
+    frames = [
+        (path, FrameTelemetry(*GRID.to_wgs84(5.0 * i, 2.0 * i), 10.0, 30.0 * i))
+        for i in range(4)
+    ]
+
+    run(frames, tmp_path / "serial", workers=0)
+    run(frames, tmp_path / "pool", workers=2)
+
+    np.testing.assert_allclose(
+        mosaic_image(str(tmp_path / "serial")).astype(int),
+        mosaic_image(str(tmp_path / "pool")).astype(int),
+        atol=1,
+    )
+
+
+def test_read_frame_index(tmp_path) -> None:
+    (tmp_path / "frames.csv").write_text("file,time\na.jpg,1.5\nb.jpg,2\n")
+
+    assert read_frame_index("frames", str(tmp_path / "frames.csv")) == [
+        (os.path.join("frames", "a.jpg"), 1.5),
+        (os.path.join("frames", "b.jpg"), 2.0),
+    ]
@@ -0,0 +1,129 @@
+import cv2
+import numpy as np
+import pytest
+
+from jemdzem import near_duplicate
+from jemdzem.metrics import metrics
+from jemdzem.near_duplicate import (
+    NearDuplicateCache,
+    dhash,
+    image_hashes,
+    phash,
+    request_key,
+)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+@pytest.fixture(scope="module")
+def scene() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    noise = (rng.random((270, 480)) * 255).astype(np.uint8)
+    blobs = cv2.GaussianBlur(noise, (0, 0), 12)
+    blobs = cv2.normalize(blobs, None, 0, 255, cv2.NORM_MINMAX)
+    frame = cv2.resize(blobs, (1920, 1080), interpolation=cv2.INTER_CUBIC)
+    return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+
+def jpeg_noise(image: np.ndarray, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    noisy = np.clip(image + rng.normal(0, 6, image.shape), 0, 255).astype(np.uint8)
+    _, encoded = cv2.imencode(".jpg", noisy, [cv2.IMWRITE_JPEG_QUALITY, 70])
+    return cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+
+
+def test_hashes_tolerate_noise_but_not_new_scenes(scene) -> None:
+    hashes = image_hashes(scene)
+    noisy = image_hashes(jpeg_noise(scene, 1))
+    other = image_hashes(np.ascontiguousarray(scene[:, ::-1]))
+
+    assert all(hamming(a, b) <= 4 for a, b in zip(hashes, noisy))
+    assert all(hamming(a, b) > 16 for a, b in zip(hashes, other))
+
+
+def test_hash_functions_are_64_bit(scene) -> None:
+    for h in (dhash(scene), phash(scene), *image_hashes(scene)):
+        assert 0 <= h < 2**64
+    gray = cv2.cvtColor(scene, cv2.COLOR_BGR2GRAY)
+    assert dhash(gray) == dhash(scene)
+
+
+def test_request_key() -> None:
+    ref = np.zeros((4, 4, 3), np.uint8)
+    key = request_key("/qa", "m", {"question": "a"}, {})
+    assert key == request_key("/qa", "m", {"question": "a"}, {})
+    assert key != request_key("/qa", "m", {"question": "b"}, {})
+    assert key != request_key("/qa", "other", {"question": "a"}, {})
+    with_ref = request_key("/qa", "m", {"question": "a"}, {"pipe": ref})
+    assert with_ref != key
+    assert with_ref != request_key("/qa", "m", {"question": "a"}, {"pipe": ref + 1})
+    assert key != request_key("/qa", "m", {"question": "a"}, {}, "other-client")
+
+
+def test_cache_reuses_near_duplicates(scene) -> None:
+    metrics.reset()
+    cache = NearDuplicateCache(max_distance=4)
+    key = request_key("/single-detect", "m", {"labels": ["pipe"]}, {})
+    result = [{"label": "pipe", "x": 0.1, "y": 0.2, "width": 0.1, "height": 0.1}]
+
+    assert cache.lookup(key, image_hashes(scene), "/single-detect") == (False, None)
+    cache.store(key, image_hashes(scene), result)
+
+    hit, reused = cache.lookup(
+        key, image_hashes(jpeg_noise(scene, 2)), "/single-detect"
+    )
+    assert hit and reused is result
+    other_key = request_key("/single-detect", "m", {"labels": ["car"]}, {})
+    assert not cache.lookup(other_key, image_hashes(scene))[0]
+    flipped = np.ascontiguousarray(scene[::-1])
+    assert not cache.lookup(key, image_hashes(flipped))[0]
+
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 3,
+        "hit_rate": 0.25,
+        "saved_calls": 1,
+        "keys": 1,
+    }
+    assert metrics.counter("near_duplicate_hits", endpoint="/single-detect") == 1
+    assert metrics.counter("near_duplicate_misses", endpoint="/single-detect") == 1
+
+
+def test_closest_entry_wins_and_falsy_results_are_reused() -> None:
+    cache = NearDuplicateCache(max_distance=4)
+    cache.store("k", (0b0000, 0), "far")
+    cache.store("k", (0b0111, 0), "close")
+    assert cache.lookup("k", (0b0110, 0)) == (True, "close")
+
+    cache.store("k", (2**63, 0), None)
+    assert cache.lookup("k", (2**63, 0)) == (True, None)
+
+
+def test_ttl_limits_and_disabled(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(near_duplicate.time, "monotonic", lambda: now[0])
+    first, second, third = (0, 0), (0xFFFF, 0xFFFF), (0xFFFF0000, 0xFFFF0000)
+    cache = NearDuplicateCache(ttl=10.0, max_entries=2, max_keys=2)
+    cache.store("a", first, "first")
+    now[0] += 11
+    assert not cache.lookup("a", first)[0]
+
+    cache.store("a", second, "second")
+    cache.store("a", third, "third")
+    # Only the two newest results of a key are kept.
+    assert cache.lookup("a", second) == (True, "second")
+    cache.store("a", first, "again")
+    assert not cache.lookup("a", second)[0]
+
+    # Only the two most recently used keys are kept.
+    cache.store("b", first, "b")
+    cache.store("c", first, "c")
+    assert cache.stats()["keys"] == 2
+    assert not cache.lookup("a", first)[0]
+
+    disabled = NearDuplicateCache(max_distance=-1)
+    disabled.store("a", first, "x")
+    assert disabled.lookup("a", first) == (False, None)
+    assert disabled.stats()["misses"] == 0
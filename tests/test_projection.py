@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+import pytest
+
+from modules import get_coordinates
+from modules.projection import GroundProjector, TerrainGrid, camera_rotation
+
+CAMERA_MATRIX = np.array([[400.0, 0, 320.0], [0, 400.0, 240.0], [0, 0, 1]])
+DIST_COEFFS = np.array([-0.024, -0.063, -0.010, -0.011, 0.205])
+CENTRE = np.array([[320.0, 240.0]])
+
+
+def make_pixels(n: int = 100) -> np.ndarray:
+    return np.random.default_rng(0).random((n, 2)) * [640.0, 480.0]
+
+
+def test_rotation_is_orthonormal() -> None:
+    rotation = camera_rotation(0.3, -1.1, 0.2)
+    np.testing.assert_allclose(rotation @ rotation.T, np.eye(3), atol=1e-12)
+    assert math.isclose(np.linalg.det(rotation), 1.0)
+
+
+@pytest.mark.parametrize("yaw", [0.0, math.radians(30), math.radians(-135)])
+def test_nadir_matches_translate_batch(yaw: float) -> None:
+    pixels = make_pixels()
+    projector = GroundProjector(CAMERA_MATRIX, DIST_COEFFS)
+
+    expected = get_coordinates.translate_batch(
+        pixels, 80.0, CAMERA_MATRIX, DIST_COEFFS, yaw
+    )
+
+    np.testing.assert_allclose(
+        projector.project(pixels, 80.0, yaw), expected, atol=1e-6
+    )
+
+
+@pytest.mark.parametrize(
+    "yaw, expected",
+    [(0.0, (0.0, 100.0)), (math.pi / 2, (100.0, 0.0)), (math.pi, (0.0, -100.0))],
+)
+def test_pitched_centre_lands_ahead(yaw: float, expected: tuple) -> None:
+    projector = GroundProjector(CAMERA_MATRIX, np.zeros(5))
+
+    offset = projector.project(CENTRE, 100.0, yaw, pitch=-math.pi / 4)
+
+    np.testing.assert_allclose(offset[0], expected, atol=1e-6)
+
+
+def test_roll_moves_centre_sideways() -> None:
+    projector = GroundProjector(CAMERA_MATRIX, np.zeros(5))
+
+    # Rolling a nadir camera by 45 degrees about its optical axis does not
+    # move the centre; the equivalent tilt is expressed with pitch.
+    np.testing.assert_allclose(
+        projector.project(CENTRE, 50.0, roll=math.pi / 4), [[0.0, 0.0]], atol=1e-9
+    )
+    # Looking north at the horizon and rolling keeps the centre at the horizon.
+    assert np.isnan(projector.project(CENTRE, 50.0, pitch=0.0, roll=0.3)).all()
+
+
+def test_rays_above_horizon_are_nan() -> None:
+    projector = GroundProjector(CAMERA_MATRIX, np.zeros(5))
+    pixels = np.array([[320.0, 0.0], [320.0, 479.0]])
+
+    offsets = projector.project(pixels, 100.0, pitch=-0.1)
+
+    assert np.isnan(offsets[0]).all()
+    assert np.isfinite(offsets[1]).all()
+
+
+def test_empty_batch() -> None:
+    projector = GroundProjector(CAMERA_MATRIX, DIST_COEFFS)
+    assert projector.project(np.empty((0, 2)), 10.0).shape == (0, 2)
+
+
+def make_terrain(elevation: np.ndarray) -> TerrainGrid:
+    return TerrainGrid(elevation, origin=(50.01, 18.99), resolution=(1e-4, 1e-4))
+
+
+def test_terrain_sample_bilinear() -> None:
+    terrain = make_terrain(np.array([[0.0, 10.0], [20.0, 30.0]]))
+
+    assert terrain.sample(50.01, 18.99) == 0.0
+    assert math.isclose(terrain.sample(50.01 - 5e-5, 18.99 + 5e-5), 15.0)
+    # Outside the grid the nearest edge is used.
+    assert math.isclose(terrain.sample(60.0, 18.99 + 5e-5), 5.0)
+
+
+def test_flat_terrain_matches_plane() -> None:
+    pixels = make_pixels()
+    terrain = make_terrain(np.full((200, 200), 230.0))
+    projector = GroundProjector(CAMERA_MATRIX, DIST_COEFFS, terrain)
+    plane = GroundProjector(CAMERA_MATRIX, DIST_COEFFS)
+
+    offsets = projector.project(pixels, 330.0, 0.4, -1.2, 0.0, lat=50.0, lng=19.0)
+
+    np.testing.assert_allclose(offsets, plane.project(pixels, 100.0, 0.4, -1.2))
+
+
+def test_sloped_terrain_intersection() -> None:
+    # Terrain rising towards the east by 0.2 m per metre.
+    cols = np.arange(200) * 1e-4
+    metres_per_degree = 111_320 * math.cos(math.radians(50.0))
+    row = 0.2 * (cols - 0.01) * metres_per_degree
+    terrain = make_terrain(np.tile(row, (200, 1)))
+    projector = GroundProjector(CAMERA_MATRIX, DIST_COEFFS, terrain, iterations=50)
+    pixels = make_pixels(20)
+
+    offsets = projector.project(pixels, 100.0, 0.0, -1.3, lat=50.0, lng=19.0)
+
+    coords = get_coordinates.calculate_new_coordinates_batch(
+        50.0, 19.0, offsets, mode="fast"
+    )
+    ground = terrain.sample(coords[:, 0], coords[:, 1])
+    rays = projector.rays(pixels, 0.0, -1.3)
+    # The intersection lies on the ray and on the terrain.
+    distance = np.linalg.norm(offsets, axis=1) / np.linalg.norm(rays[:, :2], axis=1)
+    np.testing.assert_allclose(100.0 + rays[:, 2] * distance, ground, atol=0.05)
+
+
+def test_terrain_requires_position() -> None:
+    projector = GroundProjector(
+        CAMERA_MATRIX, DIST_COEFFS, make_terrain(np.zeros((2, 2)))
+    )
+    with pytest.raises(ValueError):
+        projector.project(CENTRE, 10.0)
+
+
+def test_terrain_load(tmp_path) -> None:
+    path = tmp_path / "terrain.npz"
+    np.savez(
+        path, elevation=np.ones((3, 4)), origin=[50.0, 19.0], resolution=[1e-4, 2e-4]
+    )
+
+    terrain = TerrainGrid.load(str(path))
+
+    assert terrain.elevation.shape == (3, 4)
+    assert terrain.origin == (50.0, 19.0)
+    assert terrain.resolution == (1e-4, 2e-4)
@@ -0,0 +1,128 @@
+import threading
+
+import pytest
+
+from inspekcja.raporting.publisher import InMemoryReference, PointPublisher
+
+
+def point(i: int) -> dict:
+    return {"type": "pipe", "gps_coords": [50.0 + i * 1e-5, 18.0], "image": "x" * 100}
+
+
+def test_in_memory_reference_behaves_like_the_database() -> None:
+    root = InMemoryReference({"points": [point(0), point(1)], "generate": False})
+    assert root.child("points").get() == [point(0), point(1)]
+    assert root.child("points").get(shallow=True) == {"0": True, "1": True}
+    assert root.child("points/1/type").get() == "pipe"
+
+    root.update({"points/2": point(2), "missing/barrel": "Missing 1 barrel(s)"})
+    assert len(root.get()["points"]) == 3
+    assert root.child("missing").get() == {"barrel": "Missing 1 barrel(s)"}
+
+    root.update({"points": []})
+    assert "points" not in root.get()
+    with pytest.raises(ValueError):
+        root.update({"points": None, "points/0": point(0)})
+    assert root.requests == 8
+
+
+def test_appends_do_not_read_or_resend_existing_points() -> None:
+    root = InMemoryReference()
+    publisher = PointPublisher(root)
+    sizes = []
+    for i in range(50):
+        before = root.transferred
+        assert publisher.append(point(i)) == f"points/{i}"
+        sizes.append(root.transferred - before)
+
+    assert root.child("points").get() == [point(i) for i in range(50)]
+    # One shallow read of the keys, then one small update per point
+    assert root.requests == 1 + 50 + 1
+    assert max(sizes[1:]) < min(sizes[1:]) + 5
+
+
+def test_numbering_continues_after_existing_points() -> None:
+    root = InMemoryReference({"points": [point(0), point(1)]})
+    publisher = PointPublisher(root)
+    assert publisher.append(point(2)) == "points/2"
+    assert root.child("points").get() == [point(0), point(1), point(2)]
+
+
+def test_batch_sends_one_update_with_points_and_fields() -> None:
+    root = InMemoryReference({"points": [point(0)]})
+    publisher = PointPublisher(root)
+    with publisher.batch():
+        with publisher.batch():
+            publisher.append(point(1))
+        publisher.update({"missing/barrel": "Missing 2 barrel(s)"})
+        publisher.append(point(2))
+        assert root.requests == 1
+        assert publisher.pending == 3
+    assert root.requests == 2
+    assert publisher.pending == 0
+    data = root.get()
+    assert data["points"] == [point(0), point(1), point(2)]
+    assert data["missing"] == {"barrel": "Missing 2 barrel(s)"}
+
+
+def test_large_batches_flush_early() -> None:
+    root = InMemoryReference()
+    publisher = PointPublisher(root, max_batch=10)
+    with publisher.batch():
+        for i in range(25):
+            publisher.append(point(i))
+    # Shallow read, two full batches and the rest on exit
+    assert root.requests == 4
+    assert len(root.child("points").get()) == 25
+
+
+def test_clear_drops_queued_points_and_restarts_numbering() -> None:
+    root = InMemoryReference({"points": [point(0), point(1)], "generate": True})
+    publisher = PointPublisher(root)
+    with publisher.batch():
+        publisher.append(point(2))
+        publisher.update({"answer": "yes"})
+        publisher.clear()
+        publisher.append(point(3))
+    assert root.get() == {"points": [point(3)], "generate": True, "answer": "yes"}
+
+
+def test_failed_update_is_retried_with_the_same_keys() -> None:
+    root = InMemoryReference()
+
+    class Flaky:
+        fail = True
+
+        def child(self, path):
+            return root.child(path)
+
+        def update(self, value):
+            if self.fail:
+                self.fail = False
+                raise ConnectionError("offline")
+            root.update(value)
+
+    publisher = PointPublisher(Flaky())
+    with pytest.raises(ConnectionError):
+        publisher.append(point(0))
+    assert publisher.pending == 1
+    publisher.append(point(1))
+    assert root.child("points").get() == [point(0), point(1)]
+
+
+def test_concurrent_appends_get_unique_keys() -> None:
+    root = InMemoryReference()
+    publisher = PointPublisher(root)
+    keys = []
+
+    def worker(offset: int) -> None:
+        for i in range(20):
+            keys.append(publisher.append(point(offset + i)))
+
+    threads = [threading.Thread(target=worker, args=(i * 100,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(keys) == sorted(f"points/{i}" for i in range(80))
+    assert len(root.child("points").get()) == 80
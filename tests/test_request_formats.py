@@ -0,0 +1,135 @@
+import base64
+import json
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from jemdzem.request_formats import parse_image_request
+
+app = FastAPI()
+
+
+@app.post("/parse")
+async def parse(request: Request):
+    payload = await parse_image_request(request)
+    return {
+        "shape": list(payload.image.shape),
+        "refs": {label: list(ref.shape) for label, ref in payload.refs.items()},
+        "params": payload.params,
+    }
+
+
+client = TestClient(app)
+
+IMAGE = cv2.imencode(".jpg", np.zeros((30, 40, 3), np.uint8))[1].tobytes()
+REF = cv2.imencode(".png", np.zeros((5, 6, 3), np.uint8))[1].tobytes()
+
+
+def test_multipart() -> None:
+    response = client.post(
+        "/parse",
+        files=[
+            ("file", ("image.jpg", IMAGE, "image/jpeg")),
+            ("ref_file", ("pipe.png", REF, "image/png")),
+        ],
+        data={"labels": json.dumps(["pipe"]), "descriptions": json.dumps(["d"])},
+    )
+    assert response.json() == {
+        "shape": [30, 40, 3],
+        "refs": {"pipe": [5, 6, 3]},
+        "params": {"labels": ["pipe"], "descriptions": ["d"]},
+    }
+
+
+@pytest.mark.parametrize("content_type", ["image/jpeg", "application/octet-stream"])
+def test_raw_body_with_query_params(content_type: str) -> None:
+    response = client.post(
+        "/parse?labels=pipe&labels=barrel&question=why",
+        headers={"Content-Type": content_type},
+        content=IMAGE,
+    )
+    assert response.json() == {
+        "shape": [30, 40, 3],
+        "refs": {},
+        "params": {"labels": ["pipe", "barrel"], "question": "why"},
+    }
+
+
+def test_raw_body_with_header_params() -> None:
+    response = client.post(
+        "/parse",
+        headers={"Content-Type": "image/jpeg", "X-Labels": '["pipe"]'},
+        content=IMAGE,
+    )
+    assert response.json()["params"] == {"labels": ["pipe"]}
+
+
+def test_json_body() -> None:
+    response = client.post(
+        "/parse",
+        json={
+            "image": base64.b64encode(IMAGE).decode(),
+            "refs": {"pipe": base64.b64encode(REF).decode()},
+            "labels": ["pipe"],
+        },
+    )
+    assert response.json() == {
+        "shape": [30, 40, 3],
+        "refs": {"pipe": [5, 6, 3]},
+        "params": {"labels": ["pipe"]},
+    }
+
+
+def test_msgpack_body() -> None:
+    msgpack = pytest.importorskip("msgpack")
+    response = client.post(
+        "/parse",
+        headers={"Content-Type": "application/msgpack"},
+        content=msgpack.packb({"image": IMAGE, "refs": {"pipe": REF}, "question": "?"}),
+    )
+    assert response.json() == {
+        "shape": [30, 40, 3],
+        "refs": {"pipe": [5, 6, 3]},
+        "params": {"question": "?"},
+    }
+
+
+@pytest.mark.parametrize(
+    "headers, content, status",
+    [
+        ({"Content-Type": "text/plain"}, b"x", 415),
+        ({"Content-Type": "application/json"}, b"{", 400),
+        ({"Content-Type": "application/json"}, b'{"labels": []}', 422),
+        ({"Content-Type": "image/jpeg"}, b"not an image", 400),
+    ],
+)
+def test_rejected_bodies(headers: dict, content: bytes, status: int) -> None:
+    assert client.post("/parse", headers=headers, content=content).status_code == status
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"refs": ["x"]},
+        {"refs": {"pipe": 5}},
+        {"labels": 5},
+        {"labels": "pipe"},
+        {"labels": ["pipe", 5]},
+        {"descriptions": {"pipe": "d"}},
+        {"question": ["?"]},
+    ],
+)
+def test_mistyped_document_fields(fields: dict) -> None:
+    document = {"image": base64.b64encode(IMAGE).decode(), **fields}
+    assert client.post("/parse", json=document).status_code == 422
+
+
+@pytest.mark.parametrize(
+    "data", [{"labels": "5"}, {"labels": '"pipe"'}, {"descriptions": '["d", 1]'}]
+)
+def test_mistyped_form_fields(data: dict) -> None:
+    files = {"file": ("image.jpg", IMAGE, "image/jpeg")}
+    assert client.post("/parse", files=files, data=data).status_code == 422
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from jemdzem.responses import (
+    COLUMNAR_JSON,
+    COLUMNAR_MSGPACK,
+    detections_response,
+    negotiate,
+    to_columnar,
+)
+
+DETECTIONS = [
+    {"label": "pipe", "x": 0.1, "y": 0.2, "width": 0.3, "height": 0.4},
+    {"label": "barrel", "x": 0.5, "y": 0.5, "width": 0.1, "height": 0.1},
+    {"label": "pipe", "x": 0.0, "y": 0.0, "width": 1.0, "height": 1.0},
+]
+
+COLUMNAR = {
+    "labels": ["pipe", "barrel"],
+    "label": [0, 1, 0],
+    "x": [0.1, 0.5, 0.0],
+    "y": [0.2, 0.5, 0.0],
+    "width": [0.3, 0.1, 1.0],
+    "height": [0.4, 0.1, 1.0],
+}
+
+app = FastAPI()
+
+
+@app.get("/detections")
+async def detections(request: Request):
+    return detections_response(request, DETECTIONS)
+
+
+client = TestClient(app)
+
+
+def test_to_columnar() -> None:
+    assert to_columnar(DETECTIONS) == COLUMNAR
+
+
+def test_to_columnar_empty() -> None:
+    assert to_columnar([]) == {
+        "labels": [],
+        "label": [],
+        "x": [],
+        "y": [],
+        "width": [],
+        "height": [],
+    }
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        ("", None),
+        ("application/json", None),
+        ("*/*", None),
+        (COLUMNAR_JSON, COLUMNAR_JSON),
+        (f"text/html, {COLUMNAR_JSON};q=0.9", COLUMNAR_JSON),
+    ],
+)
+def test_negotiate(accept: str, expected: str | None) -> None:
+    assert negotiate(accept) == expected
+
+
+def test_default_format_unchanged() -> None:
+    response = client.get("/detections")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == DETECTIONS
+
+
+def test_columnar_json() -> None:
+    response = client.get("/detections", headers={"Accept": COLUMNAR_JSON})
+    assert response.headers["content-type"] == COLUMNAR_JSON
+    assert json.loads(response.content) == COLUMNAR
+
+
+def test_columnar_msgpack() -> None:
+    msgpack = pytest.importorskip("msgpack")
+    response = client.get("/detections", headers={"Accept": COLUMNAR_MSGPACK})
+    assert response.headers["content-type"] == COLUMNAR_MSGPACK
+    assert msgpack.unpackb(response.content) == COLUMNAR
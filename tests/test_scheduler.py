@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from jemdzem.metrics import metrics
+from jemdzem.scheduler import PriorityScheduler
+
+
+async def run_jobs(
+    scheduler: PriorityScheduler, jobs: list[tuple[str, str, str]]
+) -> list[str]:
+    """Queue ``(name, priority, api_key)`` jobs behind a blocker and return the
+    order in which they were granted a slot."""
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def blocker() -> None:
+        async with scheduler.slot("routine", "blocker"):
+            await release.wait()
+
+    async def job(name: str, priority: str, api_key: str) -> None:
+        async with scheduler.slot(priority, api_key):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    blocking = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(job(*j)) for j in jobs]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(blocking, *tasks)
+    return order
+
+
+def test_strict_priority_serves_emergency_first() -> None:
+    scheduler = PriorityScheduler(max_concurrency=1)
+    jobs = [
+        ("r1", "routine", "a"),
+        ("r2", "routine", "a"),
+        ("e1", "emergency", "b"),
+        ("e2", "emergency", "b"),
+    ]
+    order = asyncio.run(run_jobs(scheduler, jobs))
+    assert order == ["e1", "e2", "r1", "r2"]
+
+
+def test_weighted_priority_shares_slots() -> None:
+    scheduler = PriorityScheduler(
+        max_concurrency=1, policy="weighted", weights={"emergency": 2, "routine": 1}
+    )
+    jobs = [(f"r{i}", "routine", "a") for i in range(3)]
+    jobs += [(f"e{i}", "emergency", "b") for i in range(6)]
+    order = asyncio.run(run_jobs(scheduler, jobs))
+    # Routine requests are not starved while emergencies are waiting.
+    assert order[:6] == ["e0", "r0", "e1", "e2", "r1", "e3"]
+
+
+def test_fair_sharing_between_api_keys() -> None:
+    scheduler = PriorityScheduler(max_concurrency=1)
+    jobs = [("a1", "routine", "a"), ("a2", "routine", "a"), ("a3", "routine", "a")]
+    jobs += [("b1", "routine", "b"), ("b2", "routine", "b")]
+    order = asyncio.run(run_jobs(scheduler, jobs))
+    assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_routine_in_flight_limit() -> None:
+    scheduler = PriorityScheduler(max_concurrency=4, class_limits={"routine": 2})
+    peak = {"routine": 0, "emergency": 0}
+
+    async def job(priority: str) -> None:
+        async with scheduler.slot(priority, "key"):
+            peak[priority] = max(
+                peak[priority], scheduler.stats()[priority]["in_flight"]
+            )
+            await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        await asyncio.gather(
+            *(job("routine") for _ in range(6)), *(job("emergency") for _ in range(3))
+        )
+
+    asyncio.run(main())
+    assert peak == {"routine": 2, "emergency": 2}
+
+
+def test_cancelled_waiter_does_not_leak_slot() -> None:
+    scheduler = PriorityScheduler(max_concurrency=1)
+
+    async def main() -> None:
+        async with scheduler.slot("routine", "a"):
+            waiting = asyncio.create_task(
+                scheduler.run("routine", "b", asyncio.sleep, 0)
+            )
+            await asyncio.sleep(0)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+        await asyncio.wait_for(scheduler.run("emergency", "c", asyncio.sleep, 0), 1)
+
+    asyncio.run(main())
+    assert scheduler.stats()["routine"] == {"queued": 0, "in_flight": 0}
+
+
+def test_queue_wait_reported_per_class() -> None:
+    metrics.reset()
+    scheduler = PriorityScheduler(max_concurrency=1)
+    asyncio.run(run_jobs(scheduler, [("e", "emergency", "a")]))
+    timings = metrics.snapshot()["timings"]
+    assert timings["queue_wait_seconds{priority=emergency}"]["count"] == 1
+    assert timings["queue_wait_seconds{priority=routine}"]["count"] == 1
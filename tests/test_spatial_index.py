@@ -0,0 +1,110 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from modules import spatial_index
+from modules.spatial_index import GridIndex, _hungarian, match
+
+
+def brute_force_radius(points: np.ndarray, point, radius: float) -> set:
+    return set(np.nonzero(np.linalg.norm(points - point, axis=1) <= radius)[0])
+
+
+def test_query_radius_matches_brute_force() -> None:
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-100, 100, (500, 2))
+    index = GridIndex(cell_size=10.0)
+    index.insert(points[:200])
+    index.insert(points[200:])
+
+    for radius in (3.0, 10.0, 25.0):
+        for point in rng.uniform(-100, 100, (20, 2)):
+            found = set(index.query_radius(point, radius).tolist())
+            assert found == brute_force_radius(points, point, radius)
+
+
+def test_nearest() -> None:
+    index = GridIndex(cell_size=5.0)
+    index.insert([[0.0, 0.0], [10.0, 0.0], [3.0, 4.0]])
+
+    ids, distances = index.nearest([[9.0, 0.0], [2.0, 2.0], [50.0, 50.0]], 6.0)
+
+    assert ids.tolist() == [1, 2, -1]
+    np.testing.assert_allclose(distances[:2], [1.0, np.hypot(1, 2)])
+    assert distances[2] == np.inf
+
+
+def test_move() -> None:
+    index = GridIndex(cell_size=1.0)
+    (point_id,) = index.insert([[0.0, 0.0]])
+
+    index.move(point_id, (20.0, 20.0))
+
+    assert len(index.query_radius((0.0, 0.0), 2.0)) == 0
+    assert index.query_radius((20.5, 20.0), 1.0).tolist() == [point_id]
+    np.testing.assert_allclose(index.points, [[20.0, 20.0]])
+
+
+@pytest.mark.parametrize("shape", [(4, 4), (3, 6), (6, 3), (1, 5)])
+def test_hungarian_is_optimal(shape) -> None:
+    cost = np.random.default_rng(sum(shape)).random(shape)
+    rows, cols = _hungarian(cost)
+
+    n, m = shape
+    best = min(
+        sum(cost[r, c] for r, c in zip(range(n), perm))
+        if n <= m
+        else sum(cost[r, c] for r, c in zip(perm, range(m)))
+        for perm in itertools.permutations(range(max(n, m)), min(n, m))
+    )
+    assert len(rows) == min(shape)
+    assert len(set(rows.tolist())) == len(set(cols.tolist())) == len(rows)
+    assert cost[rows, cols].sum() == pytest.approx(best)
+
+
+@pytest.mark.parametrize("method", ["hungarian", "greedy"])
+def test_match_reference_points(method: str) -> None:
+    expected = np.array([[170, 140], [210, 580], [830, 180]])
+    detections = np.array([[835, 175], [500, 500], [172, 150]])
+
+    pairs, unmatched, missing = match(detections, expected, 70, method)
+
+    assert sorted(map(tuple, pairs.tolist())) == [(0, 2), (2, 0)]
+    assert unmatched.tolist() == [1]
+    assert missing.tolist() == [1]
+
+
+def test_hungarian_beats_greedy() -> None:
+    # Greedy takes the closest pair (0, 0) and leaves detection 1 unmatched.
+    expected = np.array([[0.0, 0.0], [10.0, 0.0]])
+    detections = np.array([[4.0, 0.0], [-4.0, 0.0]])
+
+    greedy, _, _ = match(detections, expected, 6.5, "greedy")
+    optimal, _, missing = match(detections, expected, 6.5, "hungarian")
+
+    assert len(greedy) == 1
+    assert sorted(map(tuple, optimal.tolist())) == [(0, 1), (1, 0)]
+    assert len(missing) == 0
+
+
+def test_match_without_scipy(monkeypatch) -> None:
+    monkeypatch.setattr(spatial_index, "linear_sum_assignment", None)
+    rng = np.random.default_rng(1)
+    expected = rng.uniform(0, 100, (30, 2))
+    detections = expected + rng.normal(0, 1, expected.shape)
+
+    pairs, unmatched, missing = match(detections, expected, 5.0)
+
+    assert (pairs[:, 0] == pairs[:, 1]).all()
+    assert len(unmatched) == len(missing) == 0
+
+
+def test_match_empty_and_unknown_method() -> None:
+    pairs, unmatched, missing = match(np.empty((0, 2)), [[0, 0]], 1.0)
+    assert pairs.shape == (0, 2)
+    assert unmatched.tolist() == []
+    assert missing.tolist() == [0]
+
+    with pytest.raises(ValueError):
+        match([[0, 0]], [[0, 0]], 1.0, "nearest")
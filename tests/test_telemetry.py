@@ -0,0 +1,167 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from modules.georeferencer import FrameTelemetry
+from modules.telemetry import TelemetryLog
+
+
+def make_log() -> TelemetryLog:
+    return TelemetryLog(
+        time=[0.0, 1.0, 2.0],
+        lat=[50.0, 50.001, 50.002],
+        lng=[19.0, 19.0, 19.002],
+        altitude=[30.0, 40.0, 40.0],
+        heading=[350.0, 10.0, 30.0],
+    )
+
+
+def test_interpolate_batch() -> None:
+    sample = make_log().interpolate([0.5, 1.5])
+
+    np.testing.assert_allclose(sample["lat"], [50.0005, 50.0015])
+    np.testing.assert_allclose(sample["lng"], [19.0, 19.001])
+    np.testing.assert_allclose(sample["altitude"], [35.0, 40.0])
+
+
+def test_heading_crosses_north() -> None:
+    sample = make_log().interpolate([0.5, 0.75])
+
+    np.testing.assert_allclose(sample["heading"], [0.0, 5.0], atol=1e-9)
+
+
+def test_timestamps_outside_log_are_clamped() -> None:
+    sample = make_log().interpolate([-5.0, 7.0])
+
+    np.testing.assert_allclose(sample["lat"], [50.0, 50.002])
+
+
+def test_unsorted_input_and_exact_samples() -> None:
+    log = TelemetryLog(
+        time=[2.0, 0.0, 1.0], lat=[3.0, 1.0, 2.0], lng=[0, 0, 0], altitude=[0, 0, 0]
+    )
+
+    np.testing.assert_allclose(log.interpolate([0.0, 1.0, 2.0])["lat"], [1, 2, 3])
+
+
+def test_single_sample() -> None:
+    log = TelemetryLog(time=[5.0], lat=[50.0], lng=[19.0], altitude=[30.0])
+
+    np.testing.assert_allclose(log.interpolate([0.0, 10.0])["lat"], [50.0, 50.0])
+
+
+def test_frame() -> None:
+    frame = make_log().frame(0.5)
+
+    assert isinstance(frame, FrameTelemetry)
+    assert math.isclose(frame.altitude, 35.0)
+    assert frame.pitch == -90.0
+
+
+def test_missing_columns() -> None:
+    with pytest.raises(ValueError):
+        TelemetryLog(time=[0.0], lat=[50.0], lng=[19.0])
+
+
+def test_from_csv_with_aliases(tmp_path) -> None:
+    path = tmp_path / "log.csv"
+    path.write_text(
+        "timestamp,latitude,longitude,alt,yaw,gimbal_pitch,battery\n"
+        "2024-05-01T10:00:00+00:00,50.0,19.0,30,0,-90,99\n"
+        "2024-05-01T10:00:02+00:00,50.002,19.0,30,90,-60,98\n"
+    )
+
+    log = TelemetryLog.load(str(path))
+    start = log.time[0]
+    sample = log.interpolate([start + 1.0])
+
+    assert len(log) == 2
+    np.testing.assert_allclose(sample["lat"], [50.001])
+    np.testing.assert_allclose(sample["heading"], [45.0])
+    np.testing.assert_allclose(sample["pitch"], [-75.0])
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [
+            {"t": 0, "lat": 50.0, "lon": 19.0, "altitude": 30},
+            {"t": 1, "lat": 50.1, "lon": 19.1, "altitude": 50},
+        ],
+        {"time": [0, 1], "lat": [50.0, 50.1], "lng": [19.0, 19.1], "alt": [30, 50]},
+    ],
+)
+def test_from_json(tmp_path, data) -> None:
+    path = tmp_path / "log.json"
+    path.write_text(json.dumps(data))
+
+    sample = TelemetryLog.load(str(path)).interpolate([0.5])
+
+    np.testing.assert_allclose(sample["lng"], [19.05])
+    np.testing.assert_allclose(sample["altitude"], [40.0])
+
+
+def test_from_mavlink(tmp_path) -> None:
+    def position(ms, lat, hdg):
+        return {
+            "mavpackettype": "GLOBAL_POSITION_INT",
+            "time_boot_ms": ms,
+            "lat": int(lat * 1e7),
+            "lon": 190000000,
+            "relative_alt": 30000,
+            "hdg": hdg,
+        }
+
+    messages = [
+        position(0, 50.0, 65535),
+        {
+            "mavpackettype": "ATTITUDE",
+            "time_boot_ms": 0,
+            "yaw": math.pi / 2,
+            "pitch": 0.1,
+            "roll": 0.1,
+        },
+        {
+            "meta": {"type": "MOUNT_ORIENTATION"},
+            "data": {"time_boot_ms": 0, "pitch": -90, "roll": 0, "yaw": 0},
+        },
+        {"mavpackettype": "HEARTBEAT"},
+        position(1000, 50.001, 9000),
+        {
+            "mavpackettype": "ATTITUDE",
+            "time_boot_ms": 1000,
+            "yaw": math.pi / 2,
+            "pitch": 0.1,
+            "roll": 0.1,
+        },
+        {
+            "meta": {"type": "MOUNT_ORIENTATION"},
+            "data": {"time_boot_ms": 1000, "pitch": -70, "roll": 2, "yaw": 0},
+        },
+    ]
+    path = tmp_path / "flight.jsonl"
+    path.write_text("\n".join(json.dumps(m) for m in messages) + "\n")
+
+    frame = TelemetryLog.load(str(path)).frame(0.5)
+
+    assert math.isclose(frame.lat, 50.0005)
+    assert math.isclose(frame.lng, 19.0)
+    assert math.isclose(frame.altitude, 30.0)
+    assert math.isclose(frame.heading, 90.0)
+    assert math.isclose(frame.pitch, -80.0)
+    assert math.isclose(frame.roll, 1.0)
+
+
+def test_hour_long_log_batch_query() -> None:
+    n = 3600 * 50
+    time = np.arange(n) / 50.0
+    log = TelemetryLog(
+        time, lat=np.linspace(50, 51, n), lng=np.full(n, 19.0), altitude=np.ones(n)
+    )
+
+    frames = np.linspace(0, time[-1], 90_000)
+    lat = log.interpolate(frames, fields=("lat",))["lat"]
+
+    np.testing.assert_allclose(lat, 50 + frames / time[-1], atol=1e-9)
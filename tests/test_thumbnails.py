@@ -0,0 +1,87 @@
+import base64
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from inspekcja.raporting.thumbnails import (
+    ThumbnailPool,
+    crop_boxes,
+    decode_crop,
+    thumbnail,
+)
+
+rng = np.random.default_rng(0)
+FRAME = (rng.random((480, 640, 3)) * 255).astype(np.uint8)
+
+
+def decode(image_b64: str) -> np.ndarray:
+    data = np.frombuffer(base64.b64decode(image_b64), np.uint8)
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+def test_thumbnail_matches_the_disk_round_trip(tmp_path) -> None:
+    crop = FRAME[100:260, 50:250]
+    path = str(tmp_path / "crop.png")
+    cv2.imwrite(path, crop)
+    resized = cv2.resize(cv2.imread(path), (128, 128))
+    encoded = cv2.imencode(".jpg", resized, [int(cv2.IMWRITE_JPEG_QUALITY), 65])[1]
+
+    assert thumbnail(crop) == base64.b64encode(encoded.tobytes()).decode()
+    assert decode(thumbnail(crop)).shape == (128, 128, 3)
+    png = cv2.imencode(".png", crop)[1].tobytes()
+    assert thumbnail(png) == thumbnail(crop)
+
+
+def test_bad_crops_raise() -> None:
+    with pytest.raises(ValueError):
+        decode_crop(b"not an image")
+    with pytest.raises(ValueError):
+        thumbnail(FRAME[10:10, 5:50])
+
+
+def test_crop_boxes_clips_to_the_frame() -> None:
+    crops = crop_boxes(
+        FRAME,
+        [(10, 20, 30, 40), (600, 460, 100, 100), (-5, -5, 10, 10), (700, 0, 5, 5)],
+    )
+    assert crops[0].shape == (40, 30, 3)
+    assert np.shares_memory(crops[0], FRAME)
+    assert crops[1].shape == (20, 40, 3)
+    assert crops[2].shape == (5, 5, 3)
+    assert crops[3].size == 0
+
+
+def test_pool_makes_a_batch_in_order_and_skips_bad_crops() -> None:
+    crops = [FRAME[:50, :50], FRAME[:0], FRAME[200:400, 300:500], b"junk"]
+    with ThumbnailPool(max_workers=2) as pool:
+        thumbnails = pool.thumbnails(crops)
+        assert pool.thumbnails([]) == []
+    assert thumbnails[0] == thumbnail(crops[0])
+    assert thumbnails[1] is None
+    assert thumbnails[2] == thumbnail(crops[2])
+    assert thumbnails[3] is None
+
+
+def test_writes_run_in_the_background_on_copies(tmp_path) -> None:
+    frame = FRAME.copy()
+    release = threading.Event()
+    with ThumbnailPool(max_workers=1) as pool:
+        pool._executor.submit(release.wait)
+        pending = pool.save(str(tmp_path / "crops" / "a.png"), frame[:20, :30])
+        pool.save(str(tmp_path / "crops" / "b.png"), b"raw bytes")
+        frame[:] = 0
+        assert not pending.done()
+        release.set()
+    assert np.array_equal(
+        cv2.imread(str(tmp_path / "crops" / "a.png")), FRAME[:20, :30]
+    )
+    assert (tmp_path / "crops" / "b.png").read_bytes() == b"raw bytes"
+
+
+def test_flush_raises_write_errors(tmp_path) -> None:
+    pool = ThumbnailPool()
+    pool.save(str(tmp_path / "crop.unknown-extension"), FRAME[:5, :5])
+    with pytest.raises((OSError, cv2.error)):
+        pool.close()
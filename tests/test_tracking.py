@@ -0,0 +1,127 @@
+import cv2
+import numpy as np
+import pytest
+
+from modules.tracking import BoxTracker, iou, track_frames
+
+SIZE = (240, 320)
+
+
+@pytest.fixture(scope="module")
+def world() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    noise = (rng.random((600, 800)) * 255).astype(np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 1.5)
+
+
+def view(world: np.ndarray, dx: int, dy: int) -> np.ndarray:
+    """Camera frame panned by ``(dx, dy)`` pixels; the scene moves the other way."""
+
+    return np.ascontiguousarray(
+        world[100 + dy : 100 + dy + SIZE[0], 100 + dx : 100 + dx + SIZE[1]]
+    )
+
+
+def box(x: float, y: float, label: str = "barrell") -> dict:
+    return {"label": label, "x": x, "y": y, "width": 0.2, "height": 0.2}
+
+
+def test_box_follows_the_scene(world) -> None:
+    tracker = BoxTracker()
+    tracker.seed(view(world, 0, 0), [box(0.4, 0.4)])
+    for step in range(1, 6):
+        tracks = tracker.update(view(world, 4 * step, 2 * step))
+
+    (track,) = tracks
+    x, y, width, height = track.box
+    assert x == pytest.approx(0.4 - 20 / SIZE[1], abs=2e-3)
+    assert y == pytest.approx(0.4 - 10 / SIZE[0], abs=2e-3)
+    assert width == pytest.approx(0.2, abs=2e-3)
+    assert height == pytest.approx(0.2, abs=2e-3)
+    assert track.confidence > 0.9
+    assert track.age == 5
+    assert not tracker.needs_detection
+
+
+def test_detection_is_due_after_max_age(world) -> None:
+    tracker = BoxTracker(max_age=3)
+    assert tracker.needs_detection
+    tracker.seed(view(world, 0, 0), [box(0.4, 0.4)])
+    for step in range(1, 3):
+        tracker.update(view(world, step, 0))
+        assert not tracker.needs_detection
+    tracker.update(view(world, 3, 0))
+    assert tracker.needs_detection
+
+
+def test_jump_to_other_ground_requests_detection(world) -> None:
+    tracker = BoxTracker()
+    tracker.seed(view(world, 0, 0), [box(0.4, 0.4), box(0.05, 0.05, "palette")])
+    tracks = tracker.update(np.ascontiguousarray(world[350:590, 450:770]))
+    assert all(track.confidence < tracker.min_confidence for track in tracks)
+    assert tracker.needs_detection
+
+
+def test_changed_frame_size_loses_tracks(world) -> None:
+    tracker = BoxTracker()
+    tracker.seed(view(world, 0, 0), [box(0.4, 0.4)])
+    assert tracker.update(world[:200, :200]) == []
+    assert tracker.needs_detection
+
+
+def test_reseeding_keeps_track_ids(world) -> None:
+    tracker = BoxTracker()
+    (first,) = tracker.seed(view(world, 0, 0), [box(0.4, 0.4)])
+    tracker.update(view(world, 4, 0))
+    tracks = tracker.seed(
+        view(world, 4, 0), [box(0.39, 0.4), box(0.7, 0.7), box(0.4, 0.4, "palette")]
+    )
+    assert tracks[0].track_id == first.track_id
+    assert len({track.track_id for track in tracks}) == 3
+    assert tracks[0].to_detection()["label"] == "barrell"
+
+
+def test_late_detection_catches_up_with_the_stream(world) -> None:
+    tracker = BoxTracker()
+    (first,) = tracker.seed(view(world, 0, 0), [box(0.4, 0.4)])
+    detected_on = view(world, 2, 0)
+    for step in range(1, 6):
+        tracker.update(view(world, 2 * step, 0))
+
+    # The detection of the frame panned by 2 px arrives with the one panned by 12.
+    (track,) = tracker.seed(detected_on, [box(0.41, 0.4)], view(world, 12, 0))
+    assert track.track_id == first.track_id
+    assert track.box[0] == pytest.approx(0.41 - 10 / SIZE[1], abs=2e-3)
+    assert track.age == 1
+    assert tracker.frames == 7
+    assert tracker.detections == 2
+    assert not tracker.needs_detection
+
+
+def test_untextured_boxes_are_dropped() -> None:
+    tracker = BoxTracker()
+    assert tracker.seed(np.full((*SIZE, 3), 128, np.uint8), [box(0.4, 0.4)]) == []
+    assert not tracker.needs_detection
+
+
+def test_track_frames_calls_model_on_schedule(world) -> None:
+    calls = []
+
+    def detect(frame):
+        calls.append(frame)
+        return [box(0.4, 0.4)]
+
+    frames = (view(world, step, 0) for step in range(20))
+    tracker = BoxTracker(max_age=5)
+    results = list(track_frames(frames, detect, tracker))
+
+    assert [detected for _, _, detected in results].count(True) == 4
+    assert len(calls) == 4
+    assert tracker.detection_fraction == pytest.approx(0.2)
+    assert all(len(tracks) == 1 for _, tracks, _ in results)
+
+
+def test_iou() -> None:
+    assert iou((0, 0, 1, 1), (0, 0, 1, 1)) == 1.0
+    assert iou((0, 0, 1, 1), (2, 2, 1, 1)) == 0.0
+    assert iou((0, 0, 2, 1), (1, 0, 2, 1)) == pytest.approx(1 / 3)